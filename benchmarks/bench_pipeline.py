@@ -0,0 +1,250 @@
+"""SkillBridge – latency / throughput / overhead benchmarks on the fake backend.
+
+Runs the graph with the deterministic fake LLM (agent.fake_llm), so the
+numbers reflect our own orchestration, parsing and JSON handling plus any
+artificial latency requested — never network or model time.
+
+Measured per profile size (number of competences) and mode:
+  - per-node latency (median / p95) and end-to-end latency
+  - CPU time and peak Python memory per run
+  - throughput (runs/s) for a batch at a given concurrency
+  - blueprint parsing and Agent 5 merge micro-benchmarks
+
+Usage
+-----
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 5 50 --latency-ms 200 --concurrency 16
+    python benchmarks/bench_pipeline.py --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Configure the backend before anything builds the client registry, and keep
+# runs independent of (and away from) the on-disk caches and stores.
+os.environ.setdefault("SKILLBRIDGE_LLM_BACKEND", "fake")
+os.environ.setdefault("SKILLBRIDGE_LLM_CACHE", "0")
+os.environ.setdefault("SKILLBRIDGE_QUESTION_BANK", "0")
+os.environ.setdefault("SKILLBRIDGE_SESSIONS", "0")
+os.environ.setdefault("SKILLBRIDGE_JOBS", "0")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from agent.batch import run_batch  # noqa: E402
+from agent.blueprint import parse_blueprint  # noqa: E402
+from agent.graph import graph  # noqa: E402
+from agent.nodes.agent5_json_output_controller import merge_validated  # noqa: E402
+
+MODES = ("simulate", "generate_tests", "evaluate")
+
+
+def make_profile(n: int) -> Dict[str, Any]:
+    """Build a synthetic employee profile with ``n`` competences."""
+    return {
+        "employee_id": f"EMP_BENCH_{n}",
+        "employee_name": "Bench Employee",
+        "department": "R&D",
+        "poste": "Développeur C++",
+        "anciennete_mois": 36,
+        "evaluation_date": "2025-11-26",
+        "competences": [
+            {
+                "competence_id": f"COMP_{i:03d}",
+                "type": "coding" if i % 2 else "soft",
+                "titre": f"Compétence {i}",
+                "detail": "Description détaillée de la compétence " * 3,
+                "experience_employee": "Utilisée sur plusieurs projets " * (i % 3),
+                "niveau_estime": i % 5,
+                "niveau_attendu_6m": min(5, i % 5 + 1),
+                "niveau_attendu_12m": min(5, i % 5 + 1),
+                "niveau_attendu_24m": min(5, i % 5 + 2),
+            }
+            for i in range(n)
+        ],
+        "projets_recents": [f"Projet {i} (2024)" for i in range(10)],
+        "projets_futurs": [f"Projet futur {i} (2026)" for i in range(5)],
+        "objectifs_carriere": "Devenir expert technique",
+        "formations_suivies": [f"Formation {i}" for i in range(10)],
+    }
+
+
+def graph_input(profile: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Return the graph input for ``mode``."""
+    scores = {}
+    if mode == "evaluate":
+        scores = {
+            c["competence_id"]: (i * 7) % 21
+            for i, c in enumerate(profile["competences"])
+        }
+    return {
+        "employee_json": json.dumps(profile, ensure_ascii=False),
+        "mode": mode,
+        "test_scores": scores,
+    }
+
+
+def _p95(values: List[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+
+async def timed_run(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the graph once, timing every node and CPU."""
+    nodes: Dict[str, float] = {}
+    started: Dict[str, float] = {}
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    async for chunk in graph.astream(item, stream_mode="tasks"):
+        if "input" in chunk:
+            started[chunk["id"]] = time.perf_counter()
+        else:
+            nodes[chunk["name"]] = time.perf_counter() - started.pop(chunk["id"])
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+    return {"nodes": nodes, "wall": wall, "cpu": cpu}
+
+
+async def peak_memory(item: Dict[str, Any]) -> int:
+    """Return peak traced Python memory (bytes) for one run.
+
+    Kept separate from the timed runs because tracemalloc slows them down.
+    """
+    tracemalloc.start()
+    try:
+        await graph.ainvoke(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def bench_latency(size: int, mode: str, repeat: int) -> Dict[str, Any]:
+    """Return per-node and end-to-end latency stats for one size / mode."""
+    item = graph_input(make_profile(size), mode)
+    runs = [await timed_run(item) for _ in range(repeat)]
+    per_node: Dict[str, List[float]] = {}
+    for run in runs:
+        for name, elapsed in run["nodes"].items():
+            per_node.setdefault(name, []).append(elapsed)
+    walls = [r["wall"] for r in runs]
+    return {
+        "size": size,
+        "mode": mode,
+        "nodes_ms": {
+            name: {
+                "median": statistics.median(v) * 1000,
+                "p95": _p95(v) * 1000,
+            }
+            for name, v in per_node.items()
+        },
+        "e2e_ms": {
+            "median": statistics.median(walls) * 1000,
+            "p95": _p95(walls) * 1000,
+        },
+        "cpu_ms": statistics.median(r["cpu"] for r in runs) * 1000,
+        "peak_mib": await peak_memory(item) / 2**20,
+    }
+
+
+async def bench_throughput(size: int, mode: str, runs: int, concurrency: int) -> float:
+    """Return graph runs per second for a batch at ``concurrency``."""
+    item = graph_input(make_profile(size), mode)
+    start = time.perf_counter()
+    async for result in run_batch((item for _ in range(runs)), concurrency=concurrency):
+        if not result.ok:
+            raise RuntimeError(result.error)
+    return runs / (time.perf_counter() - start)
+
+
+def bench_parsing(size: int, repeat: int) -> Dict[str, float]:
+    """Micro-benchmark blueprint parsing and the Agent 5 merge."""
+    from agent.fake_llm import fake_reply
+
+    profile = make_profile(size)
+    blueprint = fake_reply(
+        "You are Agent 2", f"Employee profile:\n{json.dumps(profile)}"
+    )
+    validated = json.loads(
+        fake_reply("You are Agent 3", f"Employee profile:\n{json.dumps(profile)}")
+    )
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse_blueprint(blueprint)
+    parse = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        merge_validated(profile, validated)
+    merge = (time.perf_counter() - start) / repeat
+    return {"parse_blueprint_ms": parse * 1000, "merge_ms": merge * 1000}
+
+
+def _write(line: str = "") -> None:
+    sys.stdout.write(line + "\n")
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every benchmark and print a summary table."""
+    report: Dict[str, Any] = {"latency": [], "throughput": [], "parsing": []}
+    for size in args.sizes:
+        for mode in args.modes:
+            stats = await bench_latency(size, mode, args.repeat)
+            report["latency"].append(stats)
+            _write(
+                f"[latency] n={size:<4} {mode:<15} e2e median "
+                f"{stats['e2e_ms']['median']:8.1f} ms  p95 {stats['e2e_ms']['p95']:8.1f} ms"
+                f"  cpu {stats['cpu_ms']:7.1f} ms  peak {stats['peak_mib']:6.1f} MiB"
+            )
+            for name, node in stats["nodes_ms"].items():
+                _write(
+                    f"          {name:<28} median {node['median']:8.1f} ms"
+                    f"  p95 {node['p95']:8.1f} ms"
+                )
+            rps = await bench_throughput(size, mode, args.runs, args.concurrency)
+            report["throughput"].append(
+                {
+                    "size": size,
+                    "mode": mode,
+                    "concurrency": args.concurrency,
+                    "rps": rps,
+                }
+            )
+            _write(
+                f"[throughput] n={size:<4} {mode:<15} "
+                f"{rps:8.2f} runs/s @ concurrency {args.concurrency}"
+            )
+        parsing = {"size": size, **bench_parsing(size, args.repeat)}
+        report["parsing"].append(parsing)
+        _write(
+            f"[parsing] n={size:<4} blueprint parse {parsing['parse_blueprint_ms']:.3f} ms"
+            f"  agent5 merge {parsing['merge_ms']:.3f} ms"
+        )
+        _write()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per latency sample")
+    parser.add_argument(
+        "--runs", type=int, default=20, help="runs per throughput batch"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency-ms", type=float, default=None, help="fake LLM latency per call"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="write report here")
+    cli_args = parser.parse_args()
+    if cli_args.latency_ms is not None:
+        os.environ["SKILLBRIDGE_FAKE_LATENCY_MS"] = str(cli_args.latency_ms)
+    result = asyncio.run(main(cli_args))
+    if cli_args.json:
+        cli_args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
@@ -4,6 +4,8 @@ interface EvaluateRequest {
   employee_json: string;
   mode: 'simulate' | 'generate_tests' | 'evaluate';
   test_scores?: Record<string, number>;
+  /** Resume the analysis / questions of a previous call */
+  session_id?: string;
 }
 
 interface EvaluateResponse {
@@ -12,6 +14,19 @@ interface EvaluateResponse {
   analysis?: string;
   /** Employee JSON enriched with question/question_type per competence (generate_tests mode) */
   enriched_employee_json?: string;
+  /** Pass back to /api/grade or a follow-up evaluate call */
+  session_id?: string;
+}
+
+interface GradeRequest {
+  employee_json: string;
+  session_id: string;
+  /** Selected option letter per competence_id */
+  answers: Record<string, string>;
+}
+
+interface GradeResponse extends EvaluateResponse {
+  test_scores?: Record<string, number>;
 }
 
 export async function evaluateEmployee(req: EvaluateRequest): Promise<EvaluateResponse> {
@@ -34,6 +49,21 @@ export async function evaluateEmployee(req: EvaluateRequest): Promise<EvaluateRe
   return data;
 }
 
+/** Grade the selected options on the server (answer key never leaves it) and evaluate. */
+export async function gradeAnswers(req: GradeRequest): Promise<GradeResponse> {
+  const res = await fetch(`${BASE_URL}/api/grade`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(req),
+  });
+
+  if (!res.ok) {
+    throw new Error(`Erreur serveur: ${res.status}`);
+  }
+
+  return res.json();
+}
+
 export async function recommendFormations(finalOutputJson: string): Promise<{ formations: any[] }> {
   const res = await fetch(`${BASE_URL}/api/recommend`, {
     method: 'POST',
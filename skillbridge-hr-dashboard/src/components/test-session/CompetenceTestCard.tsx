@@ -3,7 +3,6 @@ import { CheckCircle } from 'lucide-react';
 interface Props {
   question: string;
   options: string[];
-  correctAnswer: string;   // "A" | "B" | "C" | "D"
   selectedOption: string;  // "" if none selected
   onSelect: (opt: string) => void;
   competenceId: string;
@@ -46,7 +45,7 @@ function QuestionContent({ text }: { text: string }) {
 }
 
 export default function CompetenceTestCard({
-  question, options, correctAnswer, selectedOption,
+  question, options, selectedOption,
   onSelect, competenceId, competenceName, onNext, isLast,
 }: Props) {
   return (
@@ -16,7 +16,7 @@ export default function Evaluation() {
   const {
     employeeJson, setEmployeeJson, setMode,
     setFinalOutput, finalOutput,
-    setTestBlueprint, addEmployee,
+    setTestBlueprint, setSessionId, addEmployee,
     setLoadingPopup,
 
     recommendedFormations,
@@ -53,6 +53,7 @@ export default function Evaluation() {
       });
 
       setTestBlueprint(response.test_blueprint || '');
+      setSessionId(response.session_id || '');
       if (response.enriched_employee_json) {
         setEmployeeJson(response.enriched_employee_json);
       }
@@ -7,7 +7,7 @@ import CompetenceTestCard from '@/components/test-session/CompetenceTestCard';
 import SubmitBar from '@/components/test-session/SubmitBar';
 import ConfirmModal from '@/components/test-session/ConfirmModal';
 import { useSkillBridgeStore, normalizeToEmployee } from '@/store/useSkillBridgeStore';
-import { evaluateEmployee, recommendFormations } from '@/api/evaluate';
+import { gradeAnswers, recommendFormations } from '@/api/evaluate';
 
 interface TestData {
   selectedOption: string; // "A" | "B" | "C" | "D" | ""
@@ -18,7 +18,7 @@ const getCid = (c: any): string => c.competence_id || c.id || '';
 
 export default function TestSession() {
   const navigate = useNavigate();
-  const { employeeJson, setFinalOutput, setMode,
+  const { employeeJson, sessionId, setFinalOutput, setMode,
           addEmployee,
           setLoadingPopup, setRecommendedFormations } = useSkillBridgeStore();
 
@@ -52,22 +52,21 @@ export default function TestSession() {
     setConfirmOpen(false);
     setMode('evaluate');
 
-    const scores: Record<string, number> = {};
+    // Grading happens on the server: the answer key is never sent to the browser.
+    const answers: Record<string, string> = {};
     competences.forEach((c: any) => {
       const cid = getCid(c);
-      const selected = testData[cid]?.selectedOption || '';
-      const correct = (c.correct_answer || '').toUpperCase();
-      scores[cid] = selected && correct && selected === correct ? 20 : 0;
+      answers[cid] = testData[cid]?.selectedOption || '';
     });
 
     try {
       setLoadingPopup('evaluating'); // stays open until real API response
       navigate('/evaluation');
 
-      const response = await evaluateEmployee({
+      const response = await gradeAnswers({
         employee_json: employeeJson,
-        mode: 'evaluate',
-        test_scores: scores,
+        session_id: sessionId,
+        answers,
       });
 
       if (response.final_output) {
@@ -164,7 +163,6 @@ export default function TestSession() {
               key={cid}
               question={comp.question || 'Aucune question générée'}
               options={comp.options || []}
-              correctAnswer={(comp.correct_answer || '').toUpperCase()}
               selectedOption={testData[cid]?.selectedOption || ''}
               onSelect={(opt) =>
                 setTestData((prev) => ({
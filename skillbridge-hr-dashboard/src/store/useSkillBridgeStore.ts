@@ -17,7 +17,6 @@ export interface Competence {
   question?: string;
   question_type?: string;
   options?: string[];
-  correct_answer?: string;
 }
 
 export interface Formation {
@@ -55,6 +54,7 @@ type Mode = 'simulate' | 'generate_tests' | 'evaluate';
 interface SkillBridgeState {
   employeeJson: string;
   testBlueprint: string;
+  sessionId: string;
   finalOutput: any | null;
   mode: Mode;
   agentStep: number;
@@ -66,6 +66,7 @@ interface SkillBridgeState {
 
   setEmployeeJson: (json: string) => void;
   setTestBlueprint: (bp: string) => void;
+  setSessionId: (id: string) => void;
   setFinalOutput: (out: any) => void;
   setMode: (mode: Mode) => void;
   setAgentStep: (step: number) => void;
@@ -126,6 +127,7 @@ const getStoredEmployees = (): Employee[] => {
 export const useSkillBridgeStore = create<SkillBridgeState>((set, get) => ({
   employeeJson: '',
   testBlueprint: '',
+  sessionId: '',
   finalOutput: null,
   mode: 'simulate',
   agentStep: 0,
@@ -137,6 +139,7 @@ export const useSkillBridgeStore = create<SkillBridgeState>((set, get) => ({
 
   setEmployeeJson: (json) => set({ employeeJson: json }),
   setTestBlueprint: (bp) => set({ testBlueprint: bp }),
+  setSessionId: (id) => set({ sessionId: id }),
   setFinalOutput: (out) => set({ finalOutput: out }),
   setMode: (mode) => set({ mode }),
   setAgentStep: (step) => set({ agentStep: step }),
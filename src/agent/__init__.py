@@ -3,6 +3,7 @@
 This module defines a custom graph.
 """
 
+from agent.batch import BatchResult, BatchRunner, run_batch
 from agent.graph import graph
 
-__all__ = ["graph"]
+__all__ = ["graph", "run_batch", "BatchRunner", "BatchResult"]
@@ -0,0 +1,137 @@
+"""SkillBridge – batch evaluation with bounded concurrency.
+
+Runs many graph inputs (``{"employee_json", "mode", "test_scores"}``) through
+``agent.graph.graph`` and yields one ``BatchResult`` per item as soon as it
+completes. A ``BatchRunner`` owns a semaphore, so every batch sharing the same
+runner (e.g. all ``/api/evaluate/batch`` calls of one server) respects a
+single global cap on concurrent graph runs.
+
+Inputs are pulled lazily: at most ``concurrency`` items are in flight per
+batch, so arbitrarily long iterables are never materialised in memory.
+
+Items can be given their own time budget (``timeouts``, seconds per item
+index); it runs from the moment the item starts, as for queued jobs, and an
+item out of time fails alone with a ``DeadlineExceeded`` error.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_BATCH_CONCURRENCY : Default global cap on concurrent runs (default 4).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, Union
+
+from agent import deadlines
+from agent.graph import graph
+
+GraphInput = Dict[str, Any]
+Inputs = Union[Iterable[GraphInput], AsyncIterable[GraphInput]]
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch item (``result`` on success, ``error`` otherwise)."""
+
+    index: int
+    employee_id: str
+    result: Dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the graph run succeeded."""
+        return self.error is None
+
+
+def default_concurrency() -> int:
+    """Return the configured global concurrency cap."""
+    return max(1, int(os.getenv("SKILLBRIDGE_BATCH_CONCURRENCY", "4")))
+
+
+def _employee_id(item: GraphInput) -> str:
+    try:
+        return str(json.loads(item.get("employee_json", "")).get("employee_id", ""))
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        return ""
+
+
+async def _aiter(items: Inputs) -> AsyncIterator[GraphInput]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class BatchRunner:
+    """Run graph inputs under a shared cap on concurrent graph runs."""
+
+    def __init__(self, concurrency: int | None = None) -> None:
+        """Create a runner allowing ``concurrency`` simultaneous graph runs."""
+        self.concurrency = concurrency or default_concurrency()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _run_one(
+        self, index: int, item: GraphInput, timeout: float | None
+    ) -> BatchResult:
+        employee_id = _employee_id(item)
+        async with self._semaphore:
+            try:
+                with deadlines.deadline(timeout):
+                    result = await deadlines.wait_until(
+                        graph.ainvoke(item),  # type: ignore[call-overload]
+                        "batch item",
+                    )
+            except Exception as exc:
+                return BatchResult(index, employee_id, error=str(exc))
+        return BatchResult(index, employee_id, result=dict(result))
+
+    async def run(
+        self, items: Inputs, timeouts: Sequence[float | None] = ()
+    ) -> AsyncIterator[BatchResult]:
+        """Yield a ``BatchResult`` per item, in completion order.
+
+        ``timeouts[i]`` (seconds, None for no bound) limits the run of item i.
+        """
+        pending: set[asyncio.Task[BatchResult]] = set()
+        source = _aiter(items)
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.concurrency:
+                    try:
+                        item = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    timeout = timeouts[index] if index < len(timeouts) else None
+                    pending.add(
+                        asyncio.create_task(self._run_one(index, item, timeout))
+                    )
+                    index += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=lambda t: t.result().index):
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def run_batch(
+    items: Inputs, *, concurrency: int | None = None
+) -> AsyncIterator[BatchResult]:
+    """Run ``items`` through the graph with at most ``concurrency`` in flight."""
+    async for result in BatchRunner(concurrency).run(items):
+        yield result
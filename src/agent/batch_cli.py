@@ -0,0 +1,165 @@
+"""SkillBridge – offline JSONL batch runner.
+
+Streams a JSONL file of employee profiles through ``agent.graph.graph`` with
+N concurrent workers and appends one result line per employee to an output
+JSONL as soon as it completes.
+
+Each input line is either an employee profile object, or a request object
+``{"employee_json": <profile or string>, "mode": ..., "test_scores": {...}}``
+whose fields override the command-line defaults.
+
+Completed employee IDs are appended to a checkpoint file; re-running the same
+command skips them, so an interrupted run resumes where it stopped without
+re-spending LLM calls. Failed items are not checkpointed and are retried.
+
+Usage
+-----
+    python -m agent.batch_cli profiles.jsonl results.jsonl --mode simulate --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Dict, List, Set, TextIO
+
+from agent.batch import run_batch
+
+logger = logging.getLogger(__name__)
+
+MODES = ("simulate", "generate_tests", "evaluate")
+
+
+def _load_done(checkpoint: Path) -> Set[str]:
+    if not checkpoint.exists():
+        return set()
+    with checkpoint.open(encoding="utf-8") as fh:
+        return {line.strip() for line in fh if line.strip()}
+
+
+def _to_graph_input(record: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    if "employee_json" not in record:
+        return {"employee_json": json.dumps(record, ensure_ascii=False), "mode": mode}
+    employee_json = record["employee_json"]
+    if not isinstance(employee_json, str):
+        employee_json = json.dumps(employee_json, ensure_ascii=False)
+    return {
+        "employee_json": employee_json,
+        "mode": record.get("mode", mode),
+        "test_scores": record.get("test_scores", {}),
+    }
+
+
+def _read_inputs(
+    fh: TextIO, mode: str, done: Set[str], keys: Dict[int, str]
+) -> Iterator[Dict[str, Any]]:
+    """Yield graph inputs lazily, skipping checkpointed employees.
+
+    ``keys`` maps the batch index of each yielded input to its checkpoint key
+    (employee_id, or ``#<line number>`` when the profile has none).
+    """
+    index = 0
+    for lineno, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("line %d: invalid JSON, skipped", lineno)
+            continue
+        item = _to_graph_input(record, mode)
+        try:
+            employee_id = json.loads(item["employee_json"]).get("employee_id")
+        except (json.JSONDecodeError, AttributeError):
+            employee_id = None
+        key = str(employee_id) if employee_id else f"#{lineno}"
+        if key in done:
+            continue
+        keys[index] = key
+        index += 1
+        yield item
+
+
+async def run_file(
+    input_path: Path,
+    output_path: Path,
+    *,
+    mode: str = "simulate",
+    workers: int = 4,
+    checkpoint_path: Path | None = None,
+) -> Dict[str, int]:
+    """Process ``input_path`` into ``output_path``; return ok / failed counts."""
+    checkpoint_path = checkpoint_path or output_path.with_name(
+        output_path.name + ".done"
+    )
+    done = _load_done(checkpoint_path)
+    keys: Dict[int, str] = {}
+    counts = {"ok": 0, "failed": 0, "skipped": len(done)}
+
+    with (
+        input_path.open(encoding="utf-8") as src,
+        output_path.open("a", encoding="utf-8") as out,
+        checkpoint_path.open("a", encoding="utf-8") as ckpt,
+    ):
+        inputs = _read_inputs(src, mode, done, keys)
+        async for item in run_batch(inputs, concurrency=workers):
+            key = keys.pop(item.index)
+            result = item.result or {}
+            record = {
+                "employee_id": item.employee_id or key,
+                "ok": item.ok,
+                "error": item.error,
+                "final_output": result.get("final_output", ""),
+                "test_blueprint": result.get("test_blueprint", ""),
+                "analysis": result.get("analysis", ""),
+            }
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if item.ok:
+                ckpt.write(key + "\n")
+                ckpt.flush()
+                counts["ok"] += 1
+            else:
+                counts["failed"] += 1
+                logger.warning("%s failed: %s", key, item.error)
+    return counts
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run SkillBridge over a JSONL file of employee profiles."
+    )
+    parser.add_argument("input", type=Path, help="input JSONL (one profile per line)")
+    parser.add_argument("output", type=Path, help="output JSONL (appended to)")
+    parser.add_argument("--mode", choices=MODES, default="simulate")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent graph runs")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="completed-ID file (default: <output>.done)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    counts = asyncio.run(
+        run_file(
+            args.input,
+            args.output,
+            mode=args.mode,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+        )
+    )
+    logger.info(
+        "done: %(ok)d ok, %(failed)d failed, %(skipped)d already completed", counts
+    )
+
+
+if __name__ == "__main__":
+    main()
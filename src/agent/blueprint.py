@@ -0,0 +1,364 @@
+"""SkillBridge – Agent 2 blueprint format.
+
+Agent 2 emits one plain-text block per competence::
+
+    COMPETENCE_ID: <id>
+    TYPE: MCQ
+    QUESTION: <text, may span several lines / code blocks>
+    OPTION_A: ... OPTION_D: ...
+    CORRECT_ANSWER: <A-D>
+    DIFFICULTY: <1-5>
+    ---
+
+``parse_blueprint`` turns that text into per-competence question dicts (used
+by the server to enrich the employee JSON and by the question bank to store
+generated questions); ``format_block`` renders a stored question back into
+the same format. A value line that would read as a ``---`` separator or as
+a key (a YAML document marker in a code block, say) is written with one more
+leading backslash than it has, and ``parse_blueprint`` removes it again, so
+questions round-trip intact.
+
+The CORRECT_ANSWER lines are the answer key: they stay on the server
+(``redact_answers`` strips them from anything sent to the browser) and
+``grade`` scores the selected options against them.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from agent.rules import SCORE_MAX, SCORE_MIN, parse_json
+
+_KEYS = frozenset(
+    (
+        "COMPETENCE_ID",
+        "TYPE",
+        "QUESTION",
+        "OPTION_A",
+        "OPTION_B",
+        "OPTION_C",
+        "OPTION_D",
+        "CORRECT_ANSWER",
+        "DIFFICULTY",
+    )
+)
+OPTION_KEYS = ("OPTION_A", "OPTION_B", "OPTION_C", "OPTION_D")
+ANSWERS = ("A", "B", "C", "D")
+_DECODER = json.JSONDecoder()
+_ANSWER_LINE = re.compile(r"^CORRECT_ANSWER\s*:.*(?:\n|$)", re.MULTILINE)
+_RESERVED = r"---|(?:" + "|".join(sorted(_KEYS)) + r")\s*:"
+_RESERVED_LINE = re.compile(rf"^(?=\\*(?:{_RESERVED}))", re.MULTILINE)
+_ESCAPED_LINE = re.compile(rf"^\\(?=\\*(?:{_RESERVED}))", re.MULTILINE)
+
+# JSON-schema response mode for Agent 2: one object per competence.
+QUESTIONS_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "competence_id": {"type": "string"},
+            "question": {"type": "string"},
+            "options": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 4,
+                "maxItems": 4,
+            },
+            "correct_answer": {"type": "string", "enum": list(ANSWERS)},
+            "difficulty": {"type": "integer", "minimum": 1, "maximum": 5},
+        },
+        "required": [
+            "competence_id",
+            "question",
+            "options",
+            "correct_answer",
+            "difficulty",
+        ],
+    },
+}
+
+
+def _escape(value: str) -> str:
+    return _RESERVED_LINE.sub("\\\\", value)
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPED_LINE.sub("", value)
+
+
+def _difficulty(raw: Any) -> int | None:
+    if isinstance(raw, int):
+        return raw
+    match = re.match(r"\d+", str(raw).strip())
+    return int(match.group(0)) if match else None
+
+
+def _question(entry: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "question": entry.get("QUESTION", ""),
+        "question_type": "mcq",
+        "options": [entry[k] for k in OPTION_KEYS if entry.get(k)],
+        "correct_answer": entry.get("CORRECT_ANSWER", "").strip().upper(),
+        "difficulty": _difficulty(entry.get("DIFFICULTY", "")),
+    }
+
+
+def parse_blueprint(blueprint: str) -> Dict[str, Dict[str, Any]]:
+    """Parse an Agent 2 blueprint into ``{competence_id: question}``.
+
+    Each question has ``question``, ``question_type``, ``options``,
+    ``correct_answer`` and ``difficulty`` (None when missing).
+
+    One pass over the lines: a block ends at a ``---`` line or at the next
+    ``COMPETENCE_ID:`` line; values may span several lines (code blocks in
+    QUESTION).
+    """
+    questions: Dict[str, Dict[str, Any]] = {}
+    entry: Dict[str, str] = {}
+    key: str | None = None
+    buffer: list[str] = []
+
+    def flush_key() -> None:
+        if key is not None:
+            entry[key] = _unescape("\n".join(buffer).strip())
+
+    def flush_block() -> None:
+        flush_key()
+        if entry.get("COMPETENCE_ID"):
+            questions[entry["COMPETENCE_ID"]] = _question(entry)
+
+    for line in blueprint.splitlines():
+        if line.startswith("---"):
+            flush_block()
+            entry, key, buffer = {}, None, []
+            continue
+        head, sep, rest = line.partition(":")
+        if sep and head.rstrip() in _KEYS:
+            # A new recognised key closes the previous value
+            if head.rstrip() == "COMPETENCE_ID":
+                flush_block()
+                entry = {}
+            else:
+                flush_key()
+            key, buffer = head.rstrip(), [rest.lstrip()]
+        elif key is not None:
+            buffer.append(line)
+    flush_block()
+    return questions
+
+
+def valid_question(question: Dict[str, Any] | None) -> bool:
+    """Return True for a complete MCQ: text, four options and an A–D answer."""
+    return (
+        question is not None
+        and bool(question.get("question"))
+        and len(question.get("options", [])) == 4
+        and question.get("correct_answer") in ANSWERS
+    )
+
+
+def _from_json(item: Dict[str, Any]) -> Dict[str, Any]:
+    options = item.get("options")
+    return {
+        "question": str(item.get("question", "")).strip(),
+        "question_type": "mcq",
+        "options": [str(o).strip() for o in options]
+        if isinstance(options, list)
+        else [],
+        "correct_answer": str(item.get("correct_answer", "")).strip().upper(),
+        "difficulty": _difficulty(item.get("difficulty", "")),
+    }
+
+
+class QuestionStreamParser:
+    """Incremental parser for a streamed Agent 2 reply.
+
+    Feed it the reply chunk by chunk; every call returns the
+    ``(competence_id, question)`` pairs whose block (text format) or array
+    element (JSON format) completed with that chunk. The format is detected
+    from the first characters of the reply. Questions are not validated
+    here; see ``valid_question``.
+    """
+
+    def __init__(self) -> None:
+        """Create a parser for one reply."""
+        self.text = ""
+        self._pos = 0
+        self._json: bool | None = None
+        self._lines: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume ``chunk`` and return the questions it completed."""
+        self.text += chunk
+        return self._drain(final=False)
+
+    def close(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Flush the end of the reply and return its last questions."""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> List[Tuple[str, Dict[str, Any]]]:
+        if self._json is None and not self._detect(final):
+            return []
+        return self._drain_json() if self._json else self._drain_text(final)
+
+    def _detect(self, final: bool) -> bool:
+        start = len(self.text) - len(self.text.lstrip())
+        if not final and "```".startswith(self.text[start:]):
+            return False  # may still become a fence
+        if self.text.startswith("```", start):
+            newline = self.text.find("\n", start)
+            if newline < 0:
+                return False
+            start = newline + 1
+            start += len(self.text[start:]) - len(self.text[start:].lstrip())
+        if start >= len(self.text) and not final:
+            return False
+        self._json = self.text.startswith("[", start)
+        self._pos = start + 1 if self._json else start
+        return True
+
+    def _drain_json(self) -> List[Tuple[str, Dict[str, Any]]]:
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        while True:
+            rest = self.text[self._pos :]
+            skipped = len(rest) - len(rest.lstrip(" \t\r\n,"))
+            self._pos += skipped
+            if self._pos >= len(self.text) or self.text[self._pos] == "]":
+                return out
+            try:
+                item, end = _DECODER.raw_decode(self.text, self._pos)
+            except json.JSONDecodeError:
+                return out  # element not complete yet
+            self._pos = end
+            if isinstance(item, dict) and item.get("competence_id"):
+                out.append((str(item["competence_id"]), _from_json(item)))
+
+    def _drain_text(self, final: bool) -> List[Tuple[str, Dict[str, Any]]]:
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        while True:
+            newline = self.text.find("\n", self._pos)
+            if newline < 0:
+                break
+            line = self.text[self._pos : newline]
+            self._pos = newline + 1
+            self._text_line(line, out)
+        if final:
+            if self._pos < len(self.text):
+                self._text_line(self.text[self._pos :], out)
+                self._pos = len(self.text)
+            self._close_block(out)
+        return out
+
+    def _text_line(self, line: str, out: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if line.startswith("---"):
+            self._close_block(out)
+            return
+        head, sep, _rest = line.partition(":")
+        if sep and head.rstrip() == "COMPETENCE_ID":
+            self._close_block(out)
+        self._lines.append(line)
+
+    def _close_block(self, out: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if self._lines:
+            out.extend(parse_blueprint("\n".join(self._lines)).items())
+            self._lines = []
+
+
+def parse_questions(
+    reply: str, competence_ids: Iterable[str]
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Parse a complete Agent 2 reply and validate it against the expected ids.
+
+    Uses ``QuestionStreamParser`` and ``valid_question`` exactly as the
+    streaming path does, so both accept the same replies. Returns
+    ``(questions, missing)``: the first valid question per expected id, and
+    the ids with none, so that only those need to be regenerated.
+    """
+    parser = QuestionStreamParser()
+    found: Dict[str, Dict[str, Any]] = {}
+    for cid, question in parser.feed(reply) + parser.close():
+        if cid not in found and valid_question(question):
+            found[cid] = question
+    questions: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for cid in competence_ids:
+        if cid in found:
+            questions[cid] = found[cid]
+        else:
+            missing.append(cid)
+    return questions, missing
+
+
+def public_question(question: Dict[str, Any]) -> Dict[str, Any]:
+    """Return ``question`` without its answer, as it may be shown to the employee."""
+    return {k: v for k, v in question.items() if k != "correct_answer"}
+
+
+def format_block(competence_id: str, question: Dict[str, Any]) -> str:
+    """Render one question back into an Agent 2 blueprint block."""
+    lines = [
+        f"COMPETENCE_ID: {competence_id}",
+        "TYPE: MCQ",
+        f"QUESTION: {_escape(question['question'])}",
+    ]
+    lines += [f"{k}: {_escape(o)}" for k, o in zip(OPTION_KEYS, question["options"])]
+    lines.append(f"CORRECT_ANSWER: {question['correct_answer']}")
+    if question.get("difficulty") is not None:
+        lines.append(f"DIFFICULTY: {question['difficulty']}")
+    lines.append("---")
+    return "\n".join(lines)
+
+
+def blueprint_excerpt(blueprint: str, competence_ids: Iterable[str]) -> str:
+    """Return the blueprint blocks for ``competence_ids`` only ("" if none)."""
+    parsed = parse_blueprint(blueprint) if blueprint else {}
+    return "\n".join(
+        format_block(cid, parsed[cid]) for cid in competence_ids if cid in parsed
+    )
+
+
+def to_blueprint(reply: str) -> str:
+    """Return an Agent 2 reply in the text blueprint format.
+
+    JSON replies are rendered block by block; text replies are returned as is.
+    """
+    data = parse_json(reply)
+    if not isinstance(data, list):
+        return reply
+    return "\n".join(
+        format_block(str(item["competence_id"]), _from_json(item))
+        for item in data
+        if isinstance(item, dict) and item.get("competence_id")
+    )
+
+
+def redact_answers(blueprint: str) -> str:
+    """Return ``blueprint`` without its CORRECT_ANSWER lines."""
+    return _ANSWER_LINE.sub("", blueprint)
+
+
+def answer_key(blueprint: str) -> Dict[str, str]:
+    """Return ``{competence_id: correct option letter}`` for ``blueprint``."""
+    return {
+        cid: q["correct_answer"]
+        for cid, q in parse_blueprint(blueprint).items()
+        if q["correct_answer"]
+    }
+
+
+def grade(
+    key: Dict[str, str], answers: Dict[str, str], competence_ids: Iterable[str]
+) -> Dict[str, int]:
+    """Score one MCQ per competence: SCORE_MAX if correct, SCORE_MIN otherwise.
+
+    Unanswered competences and competences without a question score
+    SCORE_MIN, as they always did on the client.
+    """
+    return {
+        cid: SCORE_MAX
+        if cid in key and answers.get(cid, "").strip().upper() == key[cid]
+        else SCORE_MIN
+        for cid in competence_ids
+    }
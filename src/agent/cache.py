@@ -0,0 +1,202 @@
+"""SkillBridge – content-addressed on-disk response cache.
+
+A small SQLite-backed key/value store with a TTL and size-bounded LRU
+eviction. Keys are SHA-256 hashes of the request content (see ``cache_key``),
+so identical LLM requests re-use the stored answer across processes and
+server restarts.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_LLM_CACHE             : "0" disables the LLM cache (default "1").
+SKILLBRIDGE_LLM_CACHE_PATH        : SQLite file (default .skillbridge_cache/llm.sqlite).
+SKILLBRIDGE_LLM_CACHE_TTL         : Entry lifetime in seconds (default 86400).
+SKILLBRIDGE_LLM_CACHE_MAX_ENTRIES : LRU bound on stored entries (default 1000).
+
+SKILLBRIDGE_FORMATION_CACHE             : "0" disables the Agent 6 cache (default "1").
+SKILLBRIDGE_FORMATION_CACHE_PATH        : SQLite file (default .skillbridge_cache/formations.sqlite).
+SKILLBRIDGE_FORMATION_CACHE_TTL         : Entry lifetime in seconds (default 604800).
+SKILLBRIDGE_FORMATION_CACHE_MAX_ENTRIES : LRU bound on stored entries (default 5000).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+# Hits keep their access time in memory; it is written back in one statement
+# every _TOUCH_BATCH hits and before any eviction.
+_TOUCH_BATCH = 64
+
+
+def connect(path: str | Path) -> sqlite3.Connection:
+    """Open the SQLite file at ``path`` for one of the on-disk stores.
+
+    WAL journaling with ``synchronous=NORMAL`` turns a commit into an append
+    to the log rather than an fsync of the database, and lets readers run
+    while another thread writes. Callers on the event loop still run the
+    store methods through ``asyncio.to_thread``.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def cache_key(*parts: Any) -> str:
+    """Return a stable SHA-256 hex digest of ``parts``."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed string cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, path: str | Path, ttl_seconds: float, max_entries: int) -> None:
+        """Open (or create) the cache file at ``path``."""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for ``key``, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at >= self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touches()
+                self._conn.commit()
+            self.hits += 1
+            return str(value)
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` and evict least-recently-used overflow."""
+        now = time.time()
+        with self._lock:
+            # Eviction below must see the current LRU order.
+            self._flush_touches()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.evictions += max(cursor.rowcount, 0)
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit / miss / eviction counters and the current entry count."""
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": int(size),
+        }
+
+    def close(self) -> None:
+        """Write back pending access times and close the SQLite connection."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+_llm_cache: ResponseCache | None = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> ResponseCache | None:
+    """Return the process-wide LLM response cache, or None when disabled."""
+    global _llm_cache
+    if os.getenv("SKILLBRIDGE_LLM_CACHE", "1") == "0":
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = ResponseCache(
+                os.getenv(
+                    "SKILLBRIDGE_LLM_CACHE_PATH", ".skillbridge_cache/llm.sqlite"
+                ),
+                ttl_seconds=float(os.getenv("SKILLBRIDGE_LLM_CACHE_TTL", "86400")),
+                max_entries=int(os.getenv("SKILLBRIDGE_LLM_CACHE_MAX_ENTRIES", "1000")),
+            )
+        return _llm_cache
+
+
+_formation_cache: ResponseCache | None = None
+
+
+def get_formation_cache() -> ResponseCache | None:
+    """Return the Agent 6 recommendation cache, or None when disabled.
+
+    Entries are keyed by gap signature (see agent6_formation_recommender),
+    not by prompt, so employees with the same role and gaps share them.
+    """
+    global _formation_cache
+    if os.getenv("SKILLBRIDGE_FORMATION_CACHE", "1") == "0":
+        return None
+    with _llm_cache_lock:
+        if _formation_cache is None:
+            _formation_cache = ResponseCache(
+                os.getenv(
+                    "SKILLBRIDGE_FORMATION_CACHE_PATH",
+                    ".skillbridge_cache/formations.sqlite",
+                ),
+                ttl_seconds=float(
+                    os.getenv("SKILLBRIDGE_FORMATION_CACHE_TTL", "604800")
+                ),
+                max_entries=int(
+                    os.getenv("SKILLBRIDGE_FORMATION_CACHE_MAX_ENTRIES", "5000")
+                ),
+            )
+        return _formation_cache
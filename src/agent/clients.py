@@ -0,0 +1,144 @@
+"""SkillBridge – process-wide Gemini client registry.
+
+Building a ``ChatGoogleGenerativeAI`` or ``genai.Client`` creates a fresh HTTP
+transport (and TLS session) every time. The registry builds each client once
+per process, shares its keep-alive connection pool between all agents, and is
+opened / closed by the FastAPI lifespan (see agent.server).
+
+Outside the server (LangGraph dev server, scripts, tests) the registry is
+created lazily on first use.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_LLM_BACKEND            : "gemini" (default) or "fake" — the
+                                     deterministic offline backend of
+                                     agent.fake_llm, for tests and benchmarks.
+SKILLBRIDGE_HTTP_MAX_CONNECTIONS   : Max concurrent connections (default 100).
+SKILLBRIDGE_HTTP_MAX_KEEPALIVE     : Max idle keep-alive connections (default 20).
+SKILLBRIDGE_HTTP_KEEPALIVE_EXPIRY  : Idle connection lifetime in seconds (default 30).
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import httpx
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from agent.fake_llm import FakeChatModel, FakeGenAIClient
+
+load_dotenv()
+
+MODEL = "gemini-3-pro-preview"
+TEMPERATURE = 0.2
+
+
+def backend() -> str:
+    """Return the configured LLM backend name ("gemini" or "fake")."""
+    return os.getenv("SKILLBRIDGE_LLM_BACKEND", "gemini").lower()
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """HTTP connection pool limits shared by all Gemini clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> PoolLimits:
+        """Read pool limits from the environment."""
+        return cls(
+            max_connections=int(os.getenv("SKILLBRIDGE_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(
+                os.getenv("SKILLBRIDGE_HTTP_MAX_KEEPALIVE", "20")
+            ),
+            keepalive_expiry=float(
+                os.getenv("SKILLBRIDGE_HTTP_KEEPALIVE_EXPIRY", "30")
+            ),
+        )
+
+    def client_args(self) -> Dict[str, Any]:
+        """Return httpx client kwargs enforcing these limits."""
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+        }
+
+
+class ClientRegistry:
+    """Lazily built, shared Gemini clients with a managed lifecycle."""
+
+    def __init__(self, limits: PoolLimits | None = None) -> None:
+        """Create an empty registry; clients are built on first use."""
+        self.limits = limits or PoolLimits.from_env()
+        self.backend = backend()
+        self._chat: Any = None
+        self._genai: Any = None
+
+    def chat(self) -> ChatGoogleGenerativeAI:
+        """Return the shared LangChain chat model used by Agents 1–5."""
+        if self._chat is None and self.backend == "fake":
+            self._chat = FakeChatModel()
+        if self._chat is None:
+            self._chat = ChatGoogleGenerativeAI(
+                model=MODEL,
+                google_api_key=os.getenv("GOOGLE_API_KEY", ""),
+                temperature=TEMPERATURE,
+                client_args=self.limits.client_args(),
+                # Retries are owned by agent.llm's LatencyPolicy (1 = no retry).
+                max_retries=1,
+            )
+        return self._chat  # type: ignore[no-any-return]
+
+    def genai(self) -> genai.Client:
+        """Return the shared google-genai client used by Agent 6."""
+        if self._genai is None and self.backend == "fake":
+            self._genai = FakeGenAIClient()
+        if self._genai is None:
+            args = self.limits.client_args()
+            self._genai = genai.Client(
+                api_key=os.getenv("GOOGLE_API_KEY", ""),
+                http_options=types.HttpOptions(
+                    client_args=args, async_client_args=args
+                ),
+            )
+        return self._genai  # type: ignore[no-any-return]
+
+    async def aclose(self) -> None:
+        """Close every client that was built and release its connections."""
+        if self._chat is not None:
+            await self._chat.aclose()
+            self._chat = None
+        if self._genai is not None:
+            await self._genai.aio.aclose()
+            self._genai.close()
+            self._genai = None
+
+
+_registry: ClientRegistry | None = None
+
+
+def get_registry() -> ClientRegistry:
+    """Return the process-wide registry, creating it if needed."""
+    global _registry
+    if _registry is None:
+        _registry = ClientRegistry()
+    return _registry
+
+
+async def close_registry() -> None:
+    """Close and drop the process-wide registry (server shutdown)."""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
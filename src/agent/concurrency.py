@@ -0,0 +1,39 @@
+"""SkillBridge – small asyncio concurrency helpers shared by the agents."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections.abc import Awaitable, Iterable
+from typing import List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_limited(aws: Iterable[Awaitable[T]], limit: int) -> List[T]:
+    """Await ``aws`` with at most ``limit`` running at once; keep input order.
+
+    Fails fast: on the first exception (or if the caller is cancelled) the
+    remaining awaitables are cancelled rather than left making LLM calls
+    whose results would be thrown away.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(aw: Awaitable[T]) -> T:
+        try:
+            async with semaphore:
+                return await aw
+        finally:
+            if inspect.iscoroutine(aw):
+                # Cancelled before it started: avoid "never awaited" warnings.
+                aw.close()
+
+    tasks = [asyncio.ensure_future(_run(aw)) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        # Let the cancelled tasks unwind before the exception propagates.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
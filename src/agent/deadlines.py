@@ -0,0 +1,104 @@
+"""SkillBridge – request deadlines propagated into the graph.
+
+The server accepts a client-supplied time budget (``deadline_ms``) and opens
+a ``deadline`` scope around the run. The absolute deadline lives in a context
+variable, so it follows the run into every graph node and LLM call without
+being threaded through the state:
+
+- ``agent.metrics.instrument_node`` checks it before a node starts;
+- ``agent.llm`` checks it before every attempt and never waits past it;
+- Agent 6 checks it before its search and bounds the search by it.
+- ``agent.singleflight`` starts shared calls without it and bounds each
+  caller's wait by that caller's own deadline.
+
+Running out of time raises ``DeadlineExceeded`` (a ``TimeoutError`` that the
+LLM retry policy does not retry).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed."""
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Bound the enclosed work to ``seconds`` from now (None: no bound).
+
+    Nested scopes keep the earlier of the two deadlines.
+    """
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def unbounded() -> Iterator[None]:
+    """Lift the deadline for the enclosed scope (e.g. to start shared work)."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Return the seconds left before the deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def check(what: str) -> None:
+    """Raise ``DeadlineExceeded`` if the deadline has passed before ``what``."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded before {what}")
+
+
+async def wait_until(aw: Awaitable[T], what: str) -> T:
+    """Await ``aw``, bounded by the deadline only (if there is one).
+
+    Raises:
+        DeadlineExceeded: the request deadline ran out first.
+    """
+    left = remaining()
+    if left is None:
+        return await aw
+    return await wait_for(aw, left, what)
+
+
+async def wait_for(aw: Awaitable[T], timeout: float, what: str) -> T:
+    """``asyncio.wait_for`` with ``timeout`` capped by the deadline.
+
+    Raises:
+        DeadlineExceeded: the request deadline, not ``timeout``, ran out.
+        asyncio.TimeoutError: ``timeout`` ran out first.
+    """
+    left = remaining()
+    if left is None or left > timeout:
+        return await asyncio.wait_for(aw, timeout)
+    try:
+        return await asyncio.wait_for(aw, max(0.0, left))
+    except asyncio.TimeoutError as exc:
+        raise DeadlineExceeded(f"Request deadline exceeded during {what}") from exc
@@ -0,0 +1,379 @@
+"""SkillBridge – deterministic fake LLM backend.
+
+Drop-in stand-ins for the Gemini clients, selected with
+``SKILLBRIDGE_LLM_BACKEND=fake`` (see agent.clients). They return canned,
+schema-correct replies for every agent — derived from the prompt content, so
+the same input always yields the same output — after an artificial delay.
+This lets the graph, the FastAPI server and Agent 6 run without network access
+for tests and benchmarks.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_FAKE_LATENCY_MS  : Delay per call in milliseconds (default 0).
+SKILLBRIDGE_FAKE_JITTER      : Relative random jitter on that delay, 0–1 (default 0).
+SKILLBRIDGE_FAKE_STALL_MS    : Delay of a "stalled" chat call in ms (default 0).
+SKILLBRIDGE_FAKE_STALL_EVERY : Stall chat calls 1, N+1, 2N+1, … (default 0: never).
+
+Stalls are deterministic so tail-latency handling (timeouts, retries, hedged
+requests; see agent.llm) can be exercised reproducibly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from agent.rules import (
+    apply_evaluation,
+    as_level,
+    clamp_jump,
+    competence_id,
+    score_to_levels,
+)
+
+_DECODER = json.JSONDecoder()
+# Characters per streamed chunk (FakeChatModel.astream).
+_STREAM_PIECE = 64
+_JSON_START = re.compile(r"^[\[{]", re.MULTILINE)
+
+
+def _env_latency() -> float:
+    return float(os.getenv("SKILLBRIDGE_FAKE_LATENCY_MS", "0")) / 1000
+
+
+def _env_jitter() -> float:
+    return float(os.getenv("SKILLBRIDGE_FAKE_JITTER", "0"))
+
+
+def _env_stall() -> float:
+    return float(os.getenv("SKILLBRIDGE_FAKE_STALL_MS", "0")) / 1000
+
+
+def _env_stall_every() -> int:
+    return int(os.getenv("SKILLBRIDGE_FAKE_STALL_EVERY", "0"))
+
+
+def _stable_int(*parts: str) -> int:
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16)
+
+
+def _json_values(text: str) -> List[Any]:
+    """Return every JSON object / array that starts a line of ``text``."""
+    values: List[Any] = []
+    pos = 0
+    while pos < len(text):
+        match = _JSON_START.search(text, pos)
+        if match is None:
+            break
+        try:
+            value, end = _DECODER.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            pos = match.start() + 1
+            continue
+        values.append(value)
+        pos = end
+    return values
+
+
+def _profile(values: List[Any]) -> Dict[str, Any]:
+    for value in values:
+        if isinstance(value, dict) and isinstance(value.get("competences"), list):
+            return value
+    return {"competences": []}
+
+
+def _scores(values: List[Any]) -> Dict[str, int]:
+    for value in values:
+        if (
+            isinstance(value, dict)
+            and value
+            and all(isinstance(v, int) for v in value.values())
+        ):
+            return value
+    return {}
+
+
+def _arrays(values: List[Any]) -> List[List[Any]]:
+    return [v for v in values if isinstance(v, list)]
+
+
+def _fake_analysis(human: str) -> str:
+    profile = _profile(_json_values(human))
+    lines = [f"Fake analysis of {profile.get('employee_id', 'employee')}."]
+    for comp in profile["competences"]:
+        gap = as_level(comp.get("niveau_attendu_12m")) - as_level(
+            comp.get("niveau_estime")
+        )
+        lines.append(f"- {competence_id(comp)}: gap {gap}, difficulty {1 + gap % 5}")
+    return "\n".join(lines)
+
+
+def _fake_questions(human: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "competence_id": (cid := competence_id(comp)),
+            "question": f"Which statement about {comp.get('titre', cid)} is correct?",
+            "options": [f"Option {o} for {cid}" for o in "ABCD"],
+            "correct_answer": "ABCD"[_stable_int(cid, "answer") % 4],
+            "difficulty": 1 + _stable_int(cid, "difficulty") % 5,
+        }
+        for comp in _profile(_json_values(human))["competences"]
+    ]
+
+
+def _fake_blueprint(human: str) -> str:
+    blocks = []
+    for q in _fake_questions(human):
+        blocks.append(
+            f"COMPETENCE_ID: {q['competence_id']}\n"
+            "TYPE: MCQ\n"
+            f"QUESTION: {q['question']}\n"
+            + "".join(
+                f"OPTION_{letter}: {option}\n"
+                for letter, option in zip("ABCD", q["options"])
+            )
+            + f"CORRECT_ANSWER: {q['correct_answer']}\n"
+            f"DIFFICULTY: {q['difficulty']}\n"
+            "---"
+        )
+    return "\n".join(blocks)
+
+
+def _fake_scoring(human: str) -> str:
+    values = _json_values(human)
+    profile = _profile(values)
+    scores = _scores(values)
+    date_test = str(profile.get("evaluation_date", ""))
+    out = []
+    for comp in profile["competences"]:
+        cid = competence_id(comp)
+        score = scores.get(cid, _stable_int(cid, "score") % 21)
+        before = as_level(comp.get("niveau_estime"))
+        level = clamp_jump(score_to_levels(score)[0], before)
+        out.append(apply_evaluation(comp, level, score, date_test, before))
+    return json.dumps(out, ensure_ascii=False)
+
+
+def _fake_validation(human: str) -> str:
+    arrays = _arrays(_json_values(human))
+    return json.dumps(arrays[-1] if arrays else [], ensure_ascii=False)
+
+
+def _fake_output(human: str) -> str:
+    from agent.nodes.agent5_json_output_controller import merge_validated
+
+    values = _json_values(human)
+    arrays = _arrays(values)
+    merged = merge_validated(_profile(values), arrays[-1] if arrays else [])
+    return json.dumps(merged, ensure_ascii=False)
+
+
+def _fake_formations(prompt: str) -> str:
+    ids = re.findall(r"\(ID: ([^)]+)\)", prompt) or ["GENERAL"]
+    return json.dumps(
+        [
+            {
+                "name": f"Course for {cid}",
+                "platform": "Udemy",
+                "url": f"https://courses.invalid/{cid.lower()}",
+                "description": f"Canned course covering {cid}.",
+                "priority": "Prioritaire" if i == 0 else "Important",
+                "competences_cibles": [cid],
+                "importance": max(1, 10 - i),
+            }
+            for i, cid in enumerate(ids)
+        ],
+        ensure_ascii=False,
+    )
+
+
+_RESPONDERS = {
+    "Agent 1": _fake_analysis,
+    "Agent 2": _fake_blueprint,
+    "Agent 3": _fake_scoring,
+    "Agent 4": _fake_validation,
+    "Agent 5": _fake_output,
+}
+
+
+def fake_reply(system: str, human: str, json_mode: bool = False) -> str:
+    """Return the canned reply for the agent identified by ``system``.
+
+    ``json_mode`` mirrors a structured-output request (application/json):
+    Agent 2 then answers with its JSON question array.
+    """
+    if json_mode and "You are Agent 2" in system:
+        return json.dumps(_fake_questions(human), ensure_ascii=False)
+    for marker, responder in _RESPONDERS.items():
+        if f"You are {marker}" in system:
+            return responder(human)
+    return ""
+
+
+def _delay(latency: float, jitter: float) -> float:
+    if latency <= 0:
+        return 0.0
+    return max(0.0, latency * (1 + random.uniform(-jitter, jitter)))
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering every SkillBridge agent with canned output."""
+
+    model: str = "fake-skillbridge"
+    temperature: float = 0.0
+    latency: float = Field(default_factory=_env_latency)
+    jitter: float = Field(default_factory=_env_jitter)
+    stall: float = Field(default_factory=_env_stall)
+    stall_every: int = Field(default_factory=_env_stall_every)
+    # Calls started (including ones cancelled before they replied)
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-skillbridge"
+
+    def _start_call(self) -> float:
+        """Count a new call and return its delay in seconds."""
+        self.calls += 1
+        if self.stall_every > 0 and (self.calls - 1) % self.stall_every == 0:
+            return self.stall
+        return _delay(self.latency, self.jitter)
+
+    def _reply(self, messages: List[BaseMessage], **kwargs: Any) -> ChatResult:
+        system = "\n".join(str(m.content) for m in messages if m.type == "system")
+        human = "\n".join(str(m.content) for m in messages if m.type == "human")
+        json_mode = kwargs.get("response_mime_type") == "application/json"
+        text = fake_reply(system, human, json_mode)
+        usage = {
+            "input_tokens": (len(system) + len(human)) // 4,
+            "output_tokens": len(text) // 4,
+            "total_tokens": (len(system) + len(human) + len(text)) // 4,
+        }
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._start_call())
+        return self._reply(messages, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._start_call())
+        return self._reply(messages, **kwargs)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # Stream the canned reply in small pieces, spreading the delay over
+        # them, so incremental consumers see partial output early.
+        total = self._start_call()
+        message = self._reply(messages, **kwargs).generations[0].message
+        text = str(message.content)
+        usage = message.usage_metadata if isinstance(message, AIMessage) else None
+        pieces = [
+            text[i : i + _STREAM_PIECE] for i in range(0, len(text), _STREAM_PIECE)
+        ]
+        pieces = pieces or [""]
+        delay = total / len(pieces)
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            last = i == len(pieces) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=piece,
+                    usage_metadata=usage if last else None,
+                )
+            )
+
+    async def aclose(self) -> None:
+        """Match ChatGoogleGenerativeAI.aclose (nothing to release)."""
+
+
+@dataclass
+class _FakeResponse:
+    text: str
+    candidates: List[Any] = field(default_factory=list)
+
+
+class _FakeModels:
+    def __init__(self, latency: float, jitter: float) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def _respond(self, contents: Any) -> _FakeResponse:
+        self.calls += 1
+        return _FakeResponse(text=_fake_formations(str(contents)))
+
+    def generate_content(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> _FakeResponse:
+        time.sleep(_delay(self.latency, self.jitter))
+        return self._respond(contents)
+
+
+class _FakeAsyncModels:
+    def __init__(self, models: _FakeModels) -> None:
+        self._models = models
+
+    async def generate_content(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> _FakeResponse:
+        await asyncio.sleep(_delay(self._models.latency, self._models.jitter))
+        return self._models._respond(contents)
+
+
+class _FakeAio:
+    def __init__(self, models: _FakeModels) -> None:
+        self.models = _FakeAsyncModels(models)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class FakeGenAIClient:
+    """Stand-in for ``google.genai.Client`` used by Agent 6."""
+
+    def __init__(self, latency: float | None = None, jitter: float | None = None):
+        """Create a fake client with the given (or configured) latency."""
+        self.models = _FakeModels(
+            _env_latency() if latency is None else latency,
+            _env_jitter() if jitter is None else jitter,
+        )
+        self.aio = _FakeAio(self.models)
+
+    def close(self) -> None:
+        """Match genai.Client.close (nothing to release)."""
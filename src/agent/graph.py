@@ -2,18 +2,29 @@
 
 This module is the single entry point for LangGraph (referenced in langgraph.json).
 It only assembles the graph — all agent logic lives in the nodes/ package.
+Every node is wrapped with agent.metrics.instrument_node for per-agent metrics.
 
 Modes
 -----
 simulate       : Run all 5 agents end-to-end (default, no frontend).
 generate_tests : Run Agent 1 + Agent 2 only — returns test blueprint.
 evaluate       : Run Agent 1 + Agents 3-5 — uses real scores from test_scores.
+
+When the input state already carries an ``analysis`` (a resumed session, see
+agent.sessions), Agent 1 is skipped and the run starts at the node Agent 1
+would have routed to.
+
+An evaluate run given a ``previous_output`` only re-scores the competences
+whose inputs changed (see agent.incremental); when none did, it goes straight
+to Agent 5, which merges the previous results back.
 """
 
 from __future__ import annotations
 
 from langgraph.graph import StateGraph
 
+from agent.incremental import plan
+from agent.metrics import instrument_node
 from agent.state import State
 from agent.nodes import (
     skill_context_analyzer,
@@ -28,6 +39,19 @@ from agent.nodes import (
 # Routers
 # ---------------------------------------------------------------------------
 
+def _route_start(state: State) -> str:
+    """Skip Agent 1 when the analysis is supplied (resumed session).
+
+    An incremental re-evaluation with nothing changed skips to Agent 5.
+    """
+    incremental = plan(state)
+    if incremental is not None and not incremental.changed:
+        return "json_output_controller"
+    if state.analysis:
+        return _route_after_agent1(state)
+    return "skill_context_analyzer"
+
+
 def _route_after_agent1(state: State) -> str:
     """Route after Agent 1 based on execution mode."""
     if state.mode == "evaluate":
@@ -50,13 +74,22 @@ def _route_after_agent2(state: State) -> str:
 graph = (
     StateGraph(State)
     # ── nodes ──────────────────────────────────────────────────────────────
-    .add_node("skill_context_analyzer", skill_context_analyzer)
-    .add_node("test_generation_agent", test_generation_agent)
-    .add_node("evaluation_scoring_agent", evaluation_scoring_agent)
-    .add_node("consistency_gap_validator", consistency_gap_validator)
-    .add_node("json_output_controller", json_output_controller)
+    .add_node("skill_context_analyzer", instrument_node("skill_context_analyzer", skill_context_analyzer))
+    .add_node("test_generation_agent", instrument_node("test_generation_agent", test_generation_agent))
+    .add_node("evaluation_scoring_agent", instrument_node("evaluation_scoring_agent", evaluation_scoring_agent))
+    .add_node("consistency_gap_validator", instrument_node("consistency_gap_validator", consistency_gap_validator))
+    .add_node("json_output_controller", instrument_node("json_output_controller", json_output_controller))
     # ── entry ──────────────────────────────────────────────────────────────
-    .add_edge("__start__", "skill_context_analyzer")
+    .add_conditional_edges(
+        "__start__",
+        _route_start,
+        {
+            "skill_context_analyzer": "skill_context_analyzer",
+            "test_generation_agent": "test_generation_agent",
+            "evaluation_scoring_agent": "evaluation_scoring_agent",
+            "json_output_controller": "json_output_controller",
+        },
+    )
     # ── Agent 1 → route by mode ────────────────────────────────────────────
     .add_conditional_edges(
         "skill_context_analyzer",
@@ -0,0 +1,127 @@
+"""SkillBridge – incremental re-evaluation against a previous output.
+
+When an employee retakes the test for a few competences, the caller passes
+the previous run's ``final_output`` as ``state.previous_output``. A
+competence is *unchanged* — and is merged back verbatim from the previous
+output instead of being re-scored — when all of the following hold:
+
+- it exists in the previous output with its ``_metadata_evaluation``;
+- none of its fields other than niveau_estime / _metadata_evaluation was
+  edited;
+- its starting level is the one the previous run started from: the input
+  niveau_estime equals the previous ``niveau_avant_test``, or the input is
+  the previous evaluated record itself;
+- it has no new test score (absent from ``test_scores``, or equal to the
+  previous ``score_test``).
+
+Everything else (new competences, edited ones, new scores) is *changed* and
+is the only part of the profile Agents 1, 3 and 4 see. Profile-level fields
+(poste, projets, ...) are context for the LLM and do not by themselves mark
+competences as changed.
+
+Only ``evaluate`` mode runs incrementally; a previous output that cannot be
+parsed falls back to a full run.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Tuple
+
+from agent.projections import load_profile
+from agent.rules import competence_id, parse_json
+from agent.state import State
+
+_MUTABLE_FIELDS = ("niveau_estime", "_metadata_evaluation")
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Which competences a re-evaluation must re-score."""
+
+    # Ids of the competences that go through Agents 1, 3 and 4
+    changed: FrozenSet[str]
+    # Previous evaluated records of the others, merged back by Agent 5
+    carried: Tuple[Dict[str, Any], ...]
+
+
+def _fixed_fields(comp: Mapping[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in comp.items() if k not in _MUTABLE_FIELDS}
+
+
+def is_unchanged(
+    comp: Mapping[str, Any],
+    previous: Mapping[str, Any] | None,
+    test_scores: Mapping[str, int],
+) -> bool:
+    """Return True if ``comp`` can reuse its ``previous`` evaluated record."""
+    if previous is None:
+        return False
+    meta = previous.get("_metadata_evaluation")
+    if not isinstance(meta, dict) or _fixed_fields(comp) != _fixed_fields(previous):
+        return False
+    same_start = comp.get("niveau_estime") == meta.get("niveau_avant_test") or (
+        comp.get("_metadata_evaluation") == meta
+        and comp.get("niveau_estime") == previous.get("niveau_estime")
+    )
+    cid = competence_id(comp)
+    same_score = cid not in test_scores or test_scores[cid] == meta.get("score_test")
+    return same_start and same_score
+
+
+@functools.lru_cache(maxsize=128)
+def _plan(
+    employee_json: str,
+    previous_output: str,
+    test_scores: Tuple[Tuple[str, int], ...],
+) -> Plan | None:
+    profile = load_profile(employee_json)
+    previous = parse_json(previous_output)
+    if profile is None or not isinstance(previous, dict):
+        return None
+    competences = profile.get("competences")
+    previous_competences = previous.get("competences")
+    if not isinstance(competences, list) or not isinstance(previous_competences, list):
+        return None
+
+    by_id = {competence_id(c): c for c in previous_competences if isinstance(c, dict)}
+    scores = dict(test_scores)
+    changed = set()
+    carried = []
+    for comp in competences:
+        if not isinstance(comp, dict):
+            continue
+        cid = competence_id(comp)
+        if is_unchanged(comp, by_id.get(cid), scores):
+            carried.append(by_id[cid])
+        else:
+            changed.add(cid)
+    return Plan(frozenset(changed), tuple(carried))
+
+
+def plan(state: State) -> Plan | None:
+    """Return the incremental plan for ``state``, or None for a full run."""
+    if state.mode != "evaluate" or not state.previous_output:
+        return None
+    return _plan(
+        state.employee_json,
+        state.previous_output,
+        tuple(sorted(state.test_scores.items())),
+    )
+
+
+def scope(state: State, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Return ``profile`` restricted to the competences ``state`` must re-score."""
+    current = plan(state)
+    competences = profile.get("competences")
+    if current is None or not isinstance(competences, list):
+        return profile
+    return {
+        **profile,
+        "competences": [
+            c
+            for c in competences
+            if isinstance(c, dict) and competence_id(c) in current.changed
+        ],
+    }
@@ -0,0 +1,297 @@
+"""SkillBridge – persistent job queue for asynchronous evaluations.
+
+``/api/evaluate`` with ``"enqueue": true`` stores the request as a job and
+answers ``202`` with its id right away; clients poll ``/api/jobs/{job_id}``
+for the status and, once done, the usual evaluate response. A fixed pool of
+in-process async workers drains the queue in arrival order, so under a burst
+requests wait in the queue instead of piling up as open connections.
+
+Admission control: once ``SKILLBRIDGE_JOB_MAX_DEPTH`` jobs are waiting, new
+ones are refused (the server answers ``429``). Jobs live in a small SQLite
+table next to the other local stores, so queued jobs survive a restart; jobs
+that were running when the process stopped are queued again on startup
+(so the file belongs to one server process). Finished jobs are kept for a
+TTL so their result can still be fetched.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_JOBS          : "0" disables the job queue (default "1").
+SKILLBRIDGE_JOB_PATH      : SQLite file (default .skillbridge_cache/jobs.sqlite).
+SKILLBRIDGE_JOB_WORKERS   : Jobs run concurrently by the worker pool (default 4).
+SKILLBRIDGE_JOB_MAX_DEPTH : Max queued (not yet running) jobs (default 100).
+SKILLBRIDGE_JOB_TTL       : Retention of finished jobs in seconds (default 86400).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agent.cache import connect
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Idle workers re-check the store this often, in case a job was added by
+# another process sharing the file.
+_POLL_SECONDS = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id     TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    request    TEXT NOT NULL,
+    result     TEXT,
+    error      TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    """One queued evaluation and, once finished, its outcome."""
+
+    job_id: str
+    status: str
+    request: Dict[str, Any]
+    result: Dict[str, Any] | None = None
+    error: str | None = None
+    # Jobs ahead of this one in the queue (queued jobs only)
+    position: int | None = None
+
+
+class QueueFull(Exception):
+    """Raised by ``JobStore.enqueue`` when the queue is at its maximum depth."""
+
+
+class JobStore:
+    """SQLite-backed FIFO of jobs with bounded depth and TTL retention."""
+
+    def __init__(self, path: str | Path, max_depth: int, ttl_seconds: float) -> None:
+        """Open (or create) the store at ``path``."""
+        self.max_depth = max_depth
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, request: Dict[str, Any]) -> str:
+        """Queue ``request`` and return the new job id.
+
+        Raises:
+            QueueFull: ``max_depth`` jobs are already waiting.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            if self._depth() >= self.max_depth:
+                raise QueueFull(f"{self.max_depth} jobs already queued")
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, request, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request, ensure_ascii=False), now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - self.ttl_seconds),
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self) -> Job | None:
+        """Mark the oldest queued job as running and return it, if any."""
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT job_id, request FROM jobs WHERE status = ?"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is None:
+                    return None
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ?"
+                    " WHERE job_id = ? AND status = ?",
+                    (RUNNING, time.time(), row[0], QUEUED),
+                )
+                self._conn.commit()
+                # Another process sharing the file may have claimed it first.
+                if cursor.rowcount == 1:
+                    return Job(row[0], RUNNING, json.loads(row[1]))
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Store the result of a finished job."""
+        self._finish(job_id, DONE, json.dumps(result, ensure_ascii=False), None)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Record why a job failed."""
+        self._finish(job_id, FAILED, None, error)
+
+    def _finish(
+        self, job_id: str, status: str, result: str | None, error: str | None
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?"
+                " WHERE job_id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Job | None:
+        """Return the job, or None if it is unknown or its retention expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, request, result, error, created_at, updated_at"
+                " FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            status, request, result, error, created_at, updated_at = row
+            position = None
+            if status == QUEUED:
+                (position,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?",
+                    (QUEUED, created_at),
+                ).fetchone()
+        finished = status in (DONE, FAILED)
+        if finished and time.time() - updated_at >= self.ttl_seconds:
+            return None
+        return Job(
+            job_id,
+            status,
+            json.loads(request),
+            json.loads(result) if result is not None else None,
+            error,
+            position,
+        )
+
+    def requeue_running(self) -> int:
+        """Queue again the jobs left running by a stopped process."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING),
+            )
+            self._conn.commit()
+        return max(cursor.rowcount, 0)
+
+    def _depth(self) -> int:
+        (depth,) = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return int(depth)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        counts.update({status: int(n) for status, n in rows})
+        return counts
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkers:
+    """Pool of async workers running queued jobs through ``handler``."""
+
+    def __init__(self, store: JobStore, handler: Handler, workers: int) -> None:
+        """Create a pool of ``workers`` tasks; call ``start`` to run it."""
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._tasks: List[asyncio.Task[None]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker tasks.
+
+        A no-op while the workers are running on the current event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and any(not t.done() for t in self._tasks):
+            return
+        self._loop = loop
+        self.store.requeue_running()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running are requeued on restart."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _work(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), _POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                result = await self.handler(job.request)
+            except Exception as exc:
+                # HTTPException keeps its message in ``detail``
+                detail = str(getattr(exc, "detail", exc))
+                await asyncio.to_thread(self.store.fail, job.job_id, detail)
+            else:
+                await asyncio.to_thread(self.store.complete, job.job_id, result)
+
+
+_store: JobStore | None = None
+_store_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """Return the configured worker pool size."""
+    return int(os.getenv("SKILLBRIDGE_JOB_WORKERS", "4"))
+
+
+def get_job_store() -> JobStore | None:
+    """Return the process-wide job store, or None when the queue is disabled."""
+    global _store
+    if os.getenv("SKILLBRIDGE_JOBS", "1") == "0":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = JobStore(
+                os.getenv("SKILLBRIDGE_JOB_PATH", ".skillbridge_cache/jobs.sqlite"),
+                max_depth=int(os.getenv("SKILLBRIDGE_JOB_MAX_DEPTH", "100")),
+                ttl_seconds=float(os.getenv("SKILLBRIDGE_JOB_TTL", "86400")),
+            )
+        return _store
@@ -1,43 +1,380 @@
-"""SkillBridge – LLM instantiation and async invocation helper."""
+"""SkillBridge – LLM instantiation and async invocation helper.
+
+Tail-latency policy
+-------------------
+Every call made through ``invoke`` runs under the ``LatencyPolicy`` of the
+calling agent (``agent.metrics.current_agent``):
+
+- each attempt is abandoned after ``timeout`` seconds, and the call as a whole
+  (attempts plus backoff) after ``deadline`` seconds;
+- timeouts, transport errors and retryable HTTP statuses (408, 429, 5xx) are
+  retried up to ``retries`` times with full-jitter exponential backoff;
+- with ``hedge`` enabled, an attempt still running after the agent's recent
+  p95 latency gets a duplicate request, and the first reply wins (the other
+  is cancelled). Hedging starts once enough latencies have been observed.
+
+Retries and hedges are counted in ``skillbridge_llm_retries_total``,
+``skillbridge_llm_hedges_total`` and ``skillbridge_llm_hedge_wins_total``.
+``invoke_stream`` applies the timeout between chunks and retries only
+before the first chunk; it is never hedged. Both also stop at the request
+deadline (agent.deadlines), and cancelling the caller cancels the request.
+
+Configuration (environment variables)
+-------------------------------------
+Each setting can be overridden per agent by appending the node name in upper
+case, e.g. ``SKILLBRIDGE_LLM_TIMEOUT_TEST_GENERATION_AGENT=30``.
+
+SKILLBRIDGE_LLM_TIMEOUT  : Per-attempt timeout in seconds (default 60).
+SKILLBRIDGE_LLM_DEADLINE : Overall budget per call in seconds (default 180).
+SKILLBRIDGE_LLM_RETRIES  : Retries after the first attempt (default 2).
+SKILLBRIDGE_LLM_BACKOFF  : Base backoff in seconds, doubled per retry (default 0.5).
+SKILLBRIDGE_LLM_HEDGE    : "1" enables hedged requests (default "0").
+"""
 
 from __future__ import annotations
 
+import asyncio
+import collections
+import contextlib
 import os
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, TypeVar
 
+import httpx
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from agent import deadlines
+from agent.cache import cache_key, get_llm_cache
+from agent.clients import get_registry
+from agent.metrics import (
+    LLM_ERRORS,
+    LLM_HEDGE_WINS,
+    LLM_HEDGES,
+    LLM_RETRIES,
+    current_agent,
+    record_llm_call,
+)
+
 load_dotenv()
 
+T = TypeVar("T")
+
+# Backoff never sleeps longer than this between two attempts.
+_MAX_BACKOFF = 8.0
+# Latencies kept per agent for the hedging quantile, and how many are needed
+# before hedging starts.
+_LATENCY_WINDOW = 200
+_HEDGE_MIN_SAMPLES = 20
+_HEDGE_QUANTILE = 0.95
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+_latencies: Dict[str, Deque[float]] = {}
+
+
+@dataclass(frozen=True)
+class LatencyPolicy:
+    """Timeout, retry and hedging settings for one agent's LLM calls."""
+
+    timeout: float = 60.0
+    deadline: float = 180.0
+    retries: int = 2
+    backoff: float = 0.5
+    hedge: bool = False
+
+    @classmethod
+    def for_agent(cls, agent: str) -> LatencyPolicy:
+        """Build the policy for ``agent`` from the environment."""
+
+        def env(name: str, default: str) -> str:
+            key = f"SKILLBRIDGE_LLM_{name}"
+            return os.getenv(f"{key}_{agent.upper()}", os.getenv(key, default))
+
+        return cls(
+            timeout=float(env("TIMEOUT", "60")),
+            deadline=float(env("DEADLINE", "180")),
+            retries=int(env("RETRIES", "2")),
+            backoff=float(env("BACKOFF", "0.5")),
+            hedge=env("HEDGE", "0") == "1",
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return the full-jitter sleep before retry number ``attempt + 1``."""
+        return random.uniform(0, min(_MAX_BACKOFF, self.backoff * 2**attempt))
+
+
+def observe_latency(agent: str, elapsed: float) -> None:
+    """Add a successful call's latency to ``agent``'s hedging window."""
+    window = _latencies.get(agent)
+    if window is None:
+        window = _latencies[agent] = collections.deque(maxlen=_LATENCY_WINDOW)
+    window.append(elapsed)
+
+
+def hedge_delay(agent: str) -> float | None:
+    """Return ``agent``'s recent p95 latency, or None with too few samples."""
+    window = _latencies.get(agent)
+    if window is None or len(window) < _HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(window)
+    return ordered[min(len(ordered) - 1, int(_HEDGE_QUANTILE * len(ordered)))]
+
+
+def _retryable(exc: BaseException | None) -> bool:
+    if isinstance(exc, deadlines.DeadlineExceeded):
+        return False
+    # Walk the cause chain: LangChain wraps the SDK / transport errors.
+    seen = 0
+    while exc is not None and seen < 5:
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError, httpx.TransportError)):
+            return True
+        code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+        if isinstance(code, int) and code in _RETRYABLE_STATUS:
+            return True
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return False
+
+
+async def _hedged(agent: str, attempt: Callable[[], Awaitable[T]]) -> T:
+    """Run ``attempt``; past the p95 delay, race it against a duplicate."""
+    delay = hedge_delay(agent)
+    first = asyncio.ensure_future(attempt())
+    if delay is None:
+        return await first
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            LLM_HEDGES.inc(agent=agent)
+            tasks.append(asyncio.ensure_future(attempt()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        LLM_HEDGE_WINS.inc(agent=agent)
+                    return task.result()
+        # Both failed: report the original request's error.
+        return first.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_with_policy(attempt: Callable[[], Awaitable[T]]) -> T:
+    """Await ``attempt()`` under the current agent's ``LatencyPolicy``."""
+    agent = current_agent.get()
+    policy = LatencyPolicy.for_agent(agent)
+    deadline = time.monotonic() + policy.deadline
+    retry = 0
+    while True:
+        deadlines.check(f"{agent} LLM call")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"LLM deadline of {policy.deadline}s exceeded")
+        try:
+            call = _hedged(agent, attempt) if policy.hedge else attempt()
+            return await deadlines.wait_for(
+                call, min(policy.timeout, remaining), f"{agent} LLM call"
+            )
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                # The abandoned attempt was cancelled, not failed.
+                LLM_ERRORS.inc(agent=agent)
+            if retry >= policy.retries or not _retryable(exc):
+                raise
+            LLM_RETRIES.inc(agent=agent)
+            pause = policy.backoff_delay(retry)
+            await asyncio.sleep(min(pause, max(0.0, deadline - time.monotonic())))
+            retry += 1
+
 
 def get_llm() -> ChatGoogleGenerativeAI:
-    """Return a Gemini 3 Pro Preview LLM instance."""
-    api_key = os.getenv("GOOGLE_API_KEY", "")
-    return ChatGoogleGenerativeAI(
-        model="gemini-3-pro-preview",
-        google_api_key=api_key,
-        temperature=0.2,
-    )
+    """Return the shared Gemini 3 Pro Preview LLM instance.
 
+    The instance (and its HTTP connection pool) lives in the process-wide
+    client registry; see agent.clients.
+    """
+    return get_registry().chat()
 
-async def invoke(llm: ChatGoogleGenerativeAI, system: str, human: str) -> str:
+
+async def invoke(
+    llm: ChatGoogleGenerativeAI,
+    system: str,
+    human: str,
+    *,
+    cache: bool = False,
+    cache_if: Callable[[str], bool] | None = None,
+    json_schema: Dict[str, Any] | None = None,
+) -> str:
     """Call the LLM asynchronously and return plain text content.
 
     Handles both plain-string content (older models) and list content
     (Gemini 3 thinking models which return a list of content blocks).
+
+    With ``cache=True`` the reply is looked up in (and stored to) the on-disk
+    response cache, keyed by model, temperature and both prompts. Nodes whose
+    output is safe to reuse for an identical profile opt in explicitly. A
+    non-empty reply is stored only if ``cache_if`` (when given) accepts it, so
+    a reply the caller will reject is not served again on the next call.
+
+    With ``json_schema`` the model is asked for ``application/json`` output
+    constrained to that schema (structured output); the reply is still
+    returned as text.
     """
-    response = await llm.ainvoke(
-        [SystemMessage(content=system), HumanMessage(content=human)]
+    store = get_llm_cache() if cache else None
+    key = cache_key(llm.model, llm.temperature, system, human, json_schema)
+    if store is not None:
+        cached = await asyncio.to_thread(store.get, key)
+        if cached is not None:
+            return cached
+    text = await call_with_policy(
+        lambda: _ainvoke_text(llm, system, human, json_schema)
     )
-    content = response.content
+    if store is not None and text and (cache_if is None or cache_if(text)):
+        await asyncio.to_thread(store.set, key, text)
+    return text
+
+
+async def invoke_stream(
+    llm: ChatGoogleGenerativeAI,
+    system: str,
+    human: str,
+    *,
+    cache: bool = False,
+    cache_if: Callable[[str], bool] | None = None,
+    json_schema: Dict[str, Any] | None = None,
+) -> AsyncIterator[str]:
+    """Stream the LLM reply as text chunks.
+
+    Same caching and structured-output options as ``invoke``. A cache hit
+    is yielded as one chunk; a miss is streamed and stored when complete.
+    """
+    store = get_llm_cache() if cache else None
+    key = cache_key(llm.model, llm.temperature, system, human, json_schema)
+    if store is not None:
+        cached = await asyncio.to_thread(store.get, key)
+        if cached is not None:
+            yield cached
+            return
+    agent = current_agent.get()
+    policy = LatencyPolicy.for_agent(agent)
+    deadline = time.monotonic() + policy.deadline
+    retry = 0
+    while True:
+        deadlines.check(f"{agent} LLM call")
+        parts: List[str] = []
+        prompt_tokens = completion_tokens = 0
+        start = time.perf_counter()
+        try:
+            # astream is an async generator, though typed as an AsyncIterator.
+            async with contextlib.aclosing(  # type: ignore[type-var]
+                llm.astream(
+                    [SystemMessage(content=system), HumanMessage(content=human)],
+                    **_response_kwargs(json_schema),
+                )
+            ) as stream:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"LLM deadline of {policy.deadline}s exceeded"
+                        )
+                    try:
+                        chunk = await deadlines.wait_for(
+                            stream.__anext__(),
+                            min(policy.timeout, remaining),
+                            f"{agent} LLM stream",
+                        )
+                    except StopAsyncIteration:
+                        break
+                    usage = getattr(chunk, "usage_metadata", None) or {}
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+                    text = _content_text(chunk.content, sep="")
+                    if text:
+                        parts.append(text)
+                        yield text
+        except Exception as exc:
+            LLM_ERRORS.inc(agent=agent)
+            # Once text has been yielded the stream cannot be restarted.
+            if parts or retry >= policy.retries or not _retryable(exc):
+                raise
+            LLM_RETRIES.inc(agent=agent)
+            await asyncio.sleep(policy.backoff_delay(retry))
+            retry += 1
+            continue
+        break
+    text = "".join(parts).strip()
+    elapsed = time.perf_counter() - start
+    observe_latency(agent, elapsed)
+    record_llm_call(
+        agent,
+        elapsed,
+        prompt_chars=len(system) + len(human),
+        completion_chars=len(text),
+        prompt_tokens=prompt_tokens or None,
+        completion_tokens=completion_tokens or None,
+    )
+    if store is not None and text and (cache_if is None or cache_if(text)):
+        await asyncio.to_thread(store.set, key, text)
+
+
+def _response_kwargs(json_schema: Dict[str, Any] | None) -> Dict[str, Any]:
+    if json_schema is None:
+        return {}
+    return {
+        "response_mime_type": "application/json",
+        "response_json_schema": json_schema,
+    }
+
+
+def _content_text(content: Any, sep: str = "\n") -> str:
     if isinstance(content, list):
         # Thinking models: extract text blocks only
-        parts = [
+        return sep.join(
             block.get("text", "") if isinstance(block, dict) else str(block)
             for block in content
             if (isinstance(block, dict) and block.get("type") == "text")
             or not isinstance(block, dict)
-        ]
-        return "\n".join(parts).strip()
-    return content.strip()
+        )
+    return str(content)
+
+
+async def _ainvoke_text(
+    llm: ChatGoogleGenerativeAI,
+    system: str,
+    human: str,
+    json_schema: Dict[str, Any] | None = None,
+) -> str:
+    agent = current_agent.get()
+    start = time.perf_counter()
+    try:
+        response = await llm.ainvoke(
+            [SystemMessage(content=system), HumanMessage(content=human)],
+            **_response_kwargs(json_schema),
+        )
+    except Exception:
+        LLM_ERRORS.inc(agent=agent)
+        raise
+    text = _content_text(response.content).strip()
+    usage = getattr(response, "usage_metadata", None) or {}
+    elapsed = time.perf_counter() - start
+    observe_latency(agent, elapsed)
+    record_llm_call(
+        agent,
+        elapsed,
+        prompt_chars=len(system) + len(human),
+        completion_chars=len(text),
+        prompt_tokens=usage.get("input_tokens"),
+        completion_tokens=usage.get("output_tokens"),
+    )
+    return text
@@ -0,0 +1,384 @@
+"""SkillBridge – in-process metrics in the Prometheus text format.
+
+A deliberately small implementation (counters, gauges, histograms with
+labels) so the server can expose ``/metrics`` without an extra dependency.
+
+Instrumentation points
+----------------------
+- ``instrument_node`` wraps every graph node (agent.graph): latency, errors
+  and in-flight gauge per agent. It also sets ``current_agent`` so that LLM
+  calls made inside the node are attributed to it.
+- ``agent.llm.invoke`` records per-agent LLM latency, prompt / completion
+  characters and tokens, errors, retries and hedged requests.
+- Agent 6 records the same for its ``generate_content`` call.
+- The server tracks in-flight HTTP requests per endpoint.
+- ``agent.singleflight`` counts calls served by an identical in-flight call.
+- Agent 3 counts LLM levels it had to replace with the rules' default.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple, TypeVar
+
+from agent import deadlines
+
+T = TypeVar("T")
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+current_agent: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_agent", default="unknown"
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        """Create a counter."""
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter for ``labels`` by ``amount``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for ``labels``."""
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        """Return the exposition lines for this counter."""
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """Decrease the gauge for ``labels`` by ``amount``."""
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Increment the gauge for the duration of the block."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """Create a histogram with the given upper bucket bounds."""
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            # [bucket counts..., sum, count]
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        """Return the number of observations for ``labels``."""
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        """Return the exposition lines for this histogram."""
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{_format_value(bound)}"'
+                    labels = _format_labels(self.labels, key, le)
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(count)}")
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics plus on-scrape collectors."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: Any) -> Any:
+        """Add ``metric`` to the registry and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Register a callable returning extra exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return the full exposition text."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+AGENT_DURATION = REGISTRY.register(
+    Histogram("skillbridge_agent_duration_seconds", "Graph node latency.", ("agent",))
+)
+AGENT_ERRORS = REGISTRY.register(
+    Counter("skillbridge_agent_errors_total", "Graph node failures.", ("agent",))
+)
+AGENT_INFLIGHT = REGISTRY.register(
+    Gauge("skillbridge_agent_inflight", "Graph nodes currently running.", ("agent",))
+)
+LLM_DURATION = REGISTRY.register(
+    Histogram("skillbridge_llm_duration_seconds", "LLM call latency.", ("agent",))
+)
+LLM_ERRORS = REGISTRY.register(
+    Counter("skillbridge_llm_errors_total", "Failed LLM calls.", ("agent",))
+)
+LLM_RETRIES = REGISTRY.register(
+    Counter("skillbridge_llm_retries_total", "Retried LLM attempts.", ("agent",))
+)
+LLM_HEDGES = REGISTRY.register(
+    Counter(
+        "skillbridge_llm_hedges_total",
+        "Duplicate LLM requests fired past the p95 latency.",
+        ("agent",),
+    )
+)
+LLM_HEDGE_WINS = REGISTRY.register(
+    Counter(
+        "skillbridge_llm_hedge_wins_total",
+        "Hedged LLM requests that answered first.",
+        ("agent",),
+    )
+)
+LLM_PROMPT_CHARS = REGISTRY.register(
+    Counter("skillbridge_llm_prompt_chars_total", "Prompt characters sent.", ("agent",))
+)
+LLM_COMPLETION_CHARS = REGISTRY.register(
+    Counter(
+        "skillbridge_llm_completion_chars_total",
+        "Completion characters received.",
+        ("agent",),
+    )
+)
+LLM_PROMPT_TOKENS = REGISTRY.register(
+    Counter(
+        "skillbridge_llm_prompt_tokens_total",
+        "Prompt tokens reported by the model.",
+        ("agent",),
+    )
+)
+LLM_COMPLETION_TOKENS = REGISTRY.register(
+    Counter(
+        "skillbridge_llm_completion_tokens_total",
+        "Completion tokens reported by the model.",
+        ("agent",),
+    )
+)
+COALESCED_CALLS = REGISTRY.register(
+    Counter(
+        "skillbridge_coalesced_calls_total",
+        "Calls served by an identical call already in flight.",
+        ("group",),
+    )
+)
+HTTP_CANCELLED = REGISTRY.register(
+    Counter(
+        "skillbridge_http_cancelled_requests_total",
+        "Requests abandoned before completion (client disconnect or deadline).",
+        ("endpoint", "reason"),
+    )
+)
+SCORING_FALLBACKS = REGISTRY.register(
+    Counter(
+        "skillbridge_scoring_fallbacks_total",
+        "Agent 3 edge cases scored with the base level instead of the LLM's.",
+        ("reason",),
+    )
+)
+HTTP_INFLIGHT = REGISTRY.register(
+    Gauge(
+        "skillbridge_http_inflight_requests",
+        "HTTP requests currently being served.",
+        ("endpoint",),
+    )
+)
+
+
+def _cache_lines(prefix: str, label: str, cache: Any) -> List[str]:
+    if cache is None:
+        return []
+    stats = cache.stats()
+    lines = []
+    for event in ("hits", "misses", "evictions"):
+        name = f"skillbridge_{prefix}_{event}_total"
+        lines += [
+            f"# HELP {name} {label} {event}.",
+            f"# TYPE {name} counter",
+            f"{name} {stats[event]}",
+        ]
+    return lines
+
+
+def _llm_cache_lines() -> List[str]:
+    from agent.cache import get_llm_cache
+
+    return _cache_lines("llm_cache", "LLM response cache", get_llm_cache())
+
+
+def _formation_cache_lines() -> List[str]:
+    from agent.cache import get_formation_cache
+
+    return _cache_lines(
+        "formation_cache", "Agent 6 recommendation cache", get_formation_cache()
+    )
+
+
+def _job_lines() -> List[str]:
+    from agent.jobs import get_job_store
+
+    store = get_job_store()
+    if store is None:
+        return []
+    name = "skillbridge_jobs"
+    lines = [
+        f"# HELP {name} Evaluation jobs per status.",
+        f"# TYPE {name} gauge",
+    ]
+    for status, count in store.stats().items():
+        lines.append(f'{name}{{status="{status}"}} {count}')
+    return lines
+
+
+REGISTRY.add_collector(_llm_cache_lines)
+REGISTRY.add_collector(_formation_cache_lines)
+REGISTRY.add_collector(_job_lines)
+
+
+def record_llm_call(
+    agent: str,
+    elapsed: float,
+    prompt_chars: int,
+    completion_chars: int,
+    prompt_tokens: int | None = None,
+    completion_tokens: int | None = None,
+) -> None:
+    """Record one successful LLM call for ``agent``."""
+    LLM_DURATION.observe(elapsed, agent=agent)
+    LLM_PROMPT_CHARS.inc(prompt_chars, agent=agent)
+    LLM_COMPLETION_CHARS.inc(completion_chars, agent=agent)
+    if prompt_tokens is not None:
+        LLM_PROMPT_TOKENS.inc(prompt_tokens, agent=agent)
+    if completion_tokens is not None:
+        LLM_COMPLETION_TOKENS.inc(completion_tokens, agent=agent)
+
+
+def instrument_node(
+    name: str, fn: Callable[..., Awaitable[T]]
+) -> Callable[..., Awaitable[T]]:
+    """Wrap a graph node with latency / error / in-flight metrics.
+
+    The node is not started once the request deadline (agent.deadlines) has
+    passed.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        deadlines.check(f"node {name}")
+        token = current_agent.set(name)
+        start = time.perf_counter()
+        try:
+            with AGENT_INFLIGHT.track(agent=name):
+                return await fn(*args, **kwargs)
+        except Exception:
+            AGENT_ERRORS.inc(agent=name)
+            raise
+        finally:
+            AGENT_DURATION.observe(time.perf_counter() - start, agent=name)
+            current_agent.reset(token)
+
+    return wrapper
@@ -13,7 +13,9 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from agent.incremental import scope
 from agent.llm import get_llm, invoke
+from agent.projections import for_analyzer, load_profile
 from agent.state import State
 
 SYSTEM_PROMPT = """You are Agent 1 – Skill Context Analyzer of the SkillBridge system.
@@ -36,9 +38,13 @@ Output plain text analysis only. Do NOT modify any JSON fields.
 async def skill_context_analyzer(state: State) -> Dict[str, Any]:
     """Agent 1: analyze employee profile and identify risk areas."""
     llm = get_llm()
+    profile = load_profile(state.employee_json)
+    if profile:
+        profile = scope(state, profile)
     analysis = await invoke(
         llm,
         SYSTEM_PROMPT,
-        f"Employee profile:\n{state.employee_json}",
+        f"Employee profile:\n{for_analyzer(profile) if profile else state.employee_json}",
+        cache=True,
     )
     return {"analysis": analysis}
@@ -9,15 +9,60 @@ Allowed question types:
   Technical MCQ | Practical scenario | Code reasoning |
   Architecture design | Conceptual explanation | Case study
 
+Competences are fanned out into small batches (one competence per call by
+default) generated concurrently, so wall-clock time follows the slowest
+batch rather than the sum of all questions. The per-batch blocks are joined
+back, in profile order, into the single COMPETENCE_ID blueprint format.
+
+Competences the question bank (agent.question_bank) can serve are answered
+from it without an LLM call; only the remaining ones are generated, and the
+new questions are stored in the bank for later runs.
+
+By default the model answers in structured JSON (a response schema, see
+agent.blueprint.QUESTIONS_SCHEMA); the COMPETENCE_ID text format remains
+available as a fallback. Either reply goes through one validating parse that
+reports the competences without a usable question, and only those are
+regenerated (up to SKILLBRIDGE_TESTGEN_RETRIES more rounds).
+
+Replies are streamed and parsed incrementally: each question is pushed to
+LangGraph's custom stream (``{"event": "question", "data": ...}``, without
+its answer) as soon as its block completes, so /api/evaluate/stream can show
+the first question long before the last one is written.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_TESTGEN_BATCH_SIZE  : Competences per LLM call (default 1).
+SKILLBRIDGE_TESTGEN_CONCURRENCY : Max concurrent LLM calls (default 8).
+SKILLBRIDGE_TESTGEN_FORMAT      : "json" (default) or "text" reply format.
+SKILLBRIDGE_TESTGEN_RETRIES     : Regeneration rounds for missing questions (default 1).
+
 Output: structured plain-text test blueprint stored in state.test_blueprint.
 No JSON fields are modified.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import os
+from collections.abc import Callable
+from typing import Any, Dict, List, Tuple
+
+from langgraph.config import get_stream_writer
 
-from agent.llm import get_llm, invoke
+from agent.blueprint import (
+    QUESTIONS_SCHEMA,
+    QuestionStreamParser,
+    format_block,
+    parse_questions,
+    public_question,
+    to_blueprint,
+    valid_question,
+)
+from agent.concurrency import gather_limited
+from agent.llm import get_llm, invoke, invoke_stream
+from agent.projections import analysis_excerpt, for_test_generation, load_profile
+from agent.question_bank import QuestionBank, get_question_bank
+from agent.rules import competence_id
 from agent.state import State
 
 SYSTEM_PROMPT = """You are Agent 2 – Test Generation Agent of the SkillBridge system.
@@ -45,13 +90,212 @@ DIFFICULTY: <1-5>
 """
 
 
+SYSTEM_PROMPT_JSON = """You are Agent 2 – Test Generation Agent of the SkillBridge system.
+
+For EACH competence in the employee profile, generate one Multiple-Choice Question (MCQ).
+
+STRICT RULES:
+- ALL questions MUST be MCQ format with exactly 4 options (A, B, C, D).
+- Tailor difficulty to the competence's expected level and the employee's experience.
+- For coding/technical competences, embed a real code snippet inside "question" using triple backticks with the language tag (e.g. ```cpp ... ``` or ```python ... ```). The code must be relevant and non-trivial.
+- Return ONLY a JSON array with one object per competence:
+  {"competence_id": "<competence_id>", "question": "<question text>",
+   "options": ["<A>", "<B>", "<C>", "<D>"], "correct_answer": "<A|B|C|D>",
+   "difficulty": <1-5>}
+"""
+
+# Upper bound on already-used questions quoted back in a top-up prompt.
+_MAX_AVOID = 20
+
+
+def _batches(items: List[Any], size: int) -> List[List[Any]]:
+    size = max(1, size)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _json_mode() -> bool:
+    return os.getenv("SKILLBRIDGE_TESTGEN_FORMAT", "json") != "text"
+
+
+def _prompt(
+    employee_json: str, analysis: str, avoid: List[str] | None
+) -> Tuple[str, str, Dict[str, Any] | None]:
+    """Return ``(system, human, json_schema)`` for one Agent 2 call."""
+    human = f"Employee profile:\n{employee_json}\n\nContext analysis:\n{analysis}"
+    if avoid:
+        human += "\n\nQuestions already in use (write different ones):\n" + "\n".join(
+            f"- {q}" for q in avoid
+        )
+    if _json_mode():
+        return SYSTEM_PROMPT_JSON, human, QUESTIONS_SCHEMA
+    return SYSTEM_PROMPT, human, None
+
+
+async def _generate(employee_json: str, analysis: str) -> str:
+    system, human, schema = _prompt(employee_json, analysis, None)
+    blueprint = await invoke(get_llm(), system, human, cache=True, json_schema=schema)
+    blueprint = to_blueprint(blueprint.strip())
+    if blueprint and not blueprint.endswith("---"):
+        blueprint += "\n---"
+    return blueprint
+
+
+async def _generate_batch(
+    profile: Dict[str, Any],
+    competences: List[Dict[str, Any]],
+    analysis: str,
+    avoid: List[str] | None = None,
+    on_question: Callable[[str, Dict[str, Any]], None] | None = None,
+    cache: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """Generate and validate questions for ``competences`` (one LLM call).
+
+    The reply is streamed through an incremental parser: each valid question
+    is passed to ``on_question`` as soon as its block completes. It is cached
+    only when it holds a valid question for every competence; regeneration
+    rounds pass ``cache=False`` so they really ask the model again.
+    """
+    system, human, schema = _prompt(
+        for_test_generation(profile, competences),
+        analysis_excerpt(analysis, competences),
+        avoid,
+    )
+    wanted = {competence_id(c) for c in competences}
+    questions: Dict[str, Dict[str, Any]] = {}
+
+    def take(parsed: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for cid, question in parsed:
+            if cid in wanted and cid not in questions and valid_question(question):
+                questions[cid] = question
+                if on_question is not None:
+                    on_question(cid, question)
+
+    def complete(reply: str) -> bool:
+        return not parse_questions(reply, wanted)[1]
+
+    parser = QuestionStreamParser()
+    async for chunk in invoke_stream(
+        get_llm(), system, human, cache=cache, cache_if=complete, json_schema=schema
+    ):
+        take(parser.feed(chunk))
+    take(parser.close())
+    return questions
+
+
+def _stream_writer() -> Callable[[Any], None]:
+    """Return LangGraph's custom stream writer (a no-op outside a graph run)."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _chunk: None
+
+
+async def generate_questions(
+    profile: Dict[str, Any],
+    competences: List[Dict[str, Any]],
+    avoid: List[str] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Generate validated questions for ``competences`` without analysis context.
+
+    Used to pre-warm the question bank offline; ``avoid`` lists questions the
+    new ones must differ from. Competences without a valid question are
+    absent from the result.
+    """
+    return await _generate_batch(profile, competences, "", avoid)
+
+
+def _known_questions(
+    bank: QuestionBank | None, competences: List[Dict[str, Any]]
+) -> List[str]:
+    if bank is None:
+        return []
+    return [q for comp in competences for q in bank.questions(comp)][-_MAX_AVOID:]
+
+
 async def test_generation_agent(state: State) -> Dict[str, Any]:
     """Agent 2: generate tailored tests for each competence."""
-    llm = get_llm()
-    blueprint = await invoke(
-        llm,
-        SYSTEM_PROMPT,
-        f"Employee profile:\n{state.employee_json}\n\n"
-        f"Context analysis:\n{state.analysis}",
-    )
-    return {"test_blueprint": blueprint}
+    profile = load_profile(state.employee_json)
+    competences = profile.get("competences") if profile else None
+    if profile is None or not isinstance(competences, list) or not competences:
+        return {"test_blueprint": await _generate(state.employee_json, state.analysis)}
+
+    bank = get_question_bank()
+    employee_id = str(profile.get("employee_id") or "") or None
+    writer = _stream_writer()
+
+    def emit(index: int, question: Dict[str, Any]) -> None:
+        # Stream each question (without its answer) as soon as it is ready.
+        cid = competence_id(competences[index])
+        writer(
+            {
+                "event": "question",
+                "data": {
+                    "index": index,
+                    "competence_id": cid,
+                    **public_question(question),
+                },
+            }
+        )
+
+    index_of = {competence_id(c): i for i, c in enumerate(competences)}
+    # Position in the profile -> blueprint block to emit there.
+    slots: Dict[int, str] = {}
+    missing: List[int] = []
+    drawn: List[Dict[str, Any] | None] = [None] * len(competences)
+    if bank is not None:
+        # SQLite work runs off the event loop (see agent.cache.connect).
+        drawn = await asyncio.to_thread(
+            lambda: [bank.draw(comp, employee_id) for comp in competences]
+        )
+    for index, (comp, question) in enumerate(zip(competences, drawn)):
+        if question is None:
+            missing.append(index)
+        else:
+            slots[index] = format_block(competence_id(comp), question)
+            emit(index, question)
+
+    batch_size = int(os.getenv("SKILLBRIDGE_TESTGEN_BATCH_SIZE", "1"))
+    concurrency = int(os.getenv("SKILLBRIDGE_TESTGEN_CONCURRENCY", "8"))
+    retries = int(os.getenv("SKILLBRIDGE_TESTGEN_RETRIES", "1"))
+    for round_ in range(1 + max(0, retries)):
+        if not missing:
+            break
+        batches = _batches(missing, batch_size)
+        known = await asyncio.to_thread(
+            lambda: [
+                _known_questions(bank, [competences[i] for i in batch])
+                for batch in batches
+            ]
+        )
+        results = await gather_limited(
+            (
+                _generate_batch(
+                    profile,
+                    [competences[i] for i in batch],
+                    state.analysis,
+                    # Slots this employee has exhausted: ask for a new question
+                    # rather than getting the cached one back.
+                    avoid,
+                    lambda cid, q: emit(index_of[cid], q),
+                    cache=round_ == 0,
+                )
+                for batch, avoid in zip(batches, known)
+            ),
+            concurrency,
+        )
+        generated = []
+        for batch, questions in zip(batches, results):
+            for index in batch:
+                comp = competences[index]
+                question = questions.get(competence_id(comp))
+                if question is None:
+                    continue
+                slots[index] = format_block(competence_id(comp), question)
+                generated.append((comp, question))
+        if bank is not None and generated:
+            await asyncio.to_thread(
+                lambda: [bank.add(c, q, served_to=employee_id) for c, q in generated]
+            )
+        # Only competences still without a valid question are regenerated.
+        missing = [i for i in missing if i not in slots]
+    return {"test_blueprint": "\n".join(slots[i] for i in sorted(slots))}
@@ -7,6 +7,23 @@ Evaluate test results and convert raw scores into updated skill levels.
 Two internal modes:
   - simulate : scores are derived from the test blueprint and employee profile.
   - real     : scores come from state.test_scores (provided by the frontend).
+               The score table, experience uplift and jump clamp are applied
+               locally (see agent.rules); only competences the rules cannot
+               decide (strong-experience edge cases, missing scores) are sent
+               to the LLM, as a reduced competences array, together with the
+               blueprint questions the employee answered when available and
+               the levels the rules allow for each edge case. A reply outside
+               those levels falls back to the base level, logged and counted
+               in skillbridge_scoring_fallbacks_total.
+
+Every LLM call covers one shard of competences (see agent.sharding): the
+competences are packed into token-bounded shards, each sent with only the
+context, analysis paragraphs and blueprint questions of its own competences,
+and the shards run concurrently. Replies are merged back by competence_id in
+profile order, so a large profile never needs one oversized array.
+
+With a ``previous_output`` (incremental re-evaluation, see
+agent.incremental) only the competences whose inputs changed are scored.
 
 Scoring scale (score_test 0–20 → niveau_estime 0–5):
   0–4   → 0
@@ -23,11 +40,33 @@ stored in state.evaluation_results.
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import logging
+from typing import Any, Dict, List, Tuple
 
+from agent import sharding
+from agent.blueprint import blueprint_excerpt
+from agent.concurrency import gather_limited
+from agent.incremental import scope
 from agent.llm import get_llm, invoke
+from agent.metrics import SCORING_FALLBACKS
+from agent.projections import (
+    analysis_excerpt,
+    for_scoring,
+    load_profile,
+    scoring_tokens,
+)
+from agent.rules import (
+    ScoringDecision,
+    apply_evaluation,
+    as_level,
+    competence_id,
+    parse_json,
+    score_competence,
+)
 from agent.state import State
 
+logger = logging.getLogger(__name__)
+
 _SYSTEM_SIMULATE = """You are Agent 3 – Evaluation & Scoring Agent of the SkillBridge system.
 
 Simulate a realistic evaluation of the employee based on their profile and test blueprint.
@@ -70,6 +109,8 @@ Rules:
 - niveau_avant_test must be the original niveau_estime from the input JSON
 - date_test must be the evaluation_date from the input JSON
 - Do NOT invent unrealistic level jumps (max ±2 from niveau_avant_test)
+- When allowed levels are listed for a competence, niveau_estime MUST be one
+  of them: pick the higher one only if the experience is strong
 
 Return ONLY a valid JSON array of competences — same structure as the input
 competences array, with:
@@ -81,15 +122,183 @@ No markdown. No explanation. Only the JSON array.
 """
 
 
+async def _score_with_llm(system: str, human: str) -> str:
+    """Run one scoring completion and strip markdown fences from the reply."""
+    llm = get_llm()
+    result = await invoke(llm, system, human)
+    return (
+        result.strip()
+        .removeprefix("```json")
+        .removeprefix("```")
+        .removesuffix("```")
+        .strip()
+    )
+
+
+async def _score_real(state: State, profile: Dict[str, Any]) -> str:
+    """Score real test results with the rules engine, escalating edge cases only."""
+    competences: List[Dict[str, Any]] = profile["competences"]
+    date_test = str(profile.get("evaluation_date", ""))
+
+    scored: Dict[int, Dict[str, Any]] = {}
+    decisions: Dict[int, ScoringDecision] = {}
+    pending: List[int] = []
+    for idx, comp in enumerate(competences):
+        cid = competence_id(comp)
+        if cid not in state.test_scores:
+            pending.append(idx)
+            continue
+        decision = score_competence(comp, state.test_scores[cid])
+        decisions[idx] = decision
+        if decision.level is None:
+            pending.append(idx)
+        else:
+            scored[idx] = apply_evaluation(
+                comp,
+                decision.level,
+                decision.score,
+                date_test,
+                decision.niveau_avant_test,
+            )
+
+    if pending:
+        allowed = {
+            competence_id(competences[idx]): decision.candidates
+            for idx, decision in decisions.items()
+            if decision.level is None
+        }
+        llm_results = await _score_sharded(
+            _SYSTEM_REAL, state, profile, [competences[i] for i in pending], allowed
+        )
+        for idx in pending:
+            comp = competences[idx]
+            llm_comp = llm_results.get(competence_id(comp))
+            escalated = decisions.get(idx)
+            if escalated is not None:
+                # Keep the LLM inside the admissible candidates (listed in its
+                # prompt); default to the table's base level otherwise.
+                level = escalated.candidates[0]
+                proposed = (
+                    None
+                    if llm_comp is None
+                    else as_level(llm_comp.get("niveau_estime"))
+                )
+                if proposed in escalated.candidates:
+                    level = proposed
+                else:
+                    reason = "missing" if proposed is None else "out_of_range"
+                    SCORING_FALLBACKS.inc(reason=reason)
+                    logger.warning(
+                        "%s: LLM level %s not in %s (%s), using %d",
+                        competence_id(comp),
+                        proposed,
+                        list(escalated.candidates),
+                        reason,
+                        level,
+                    )
+                scored[idx] = apply_evaluation(
+                    comp,
+                    level,
+                    escalated.score,
+                    date_test,
+                    escalated.niveau_avant_test,
+                )
+            elif llm_comp is not None:
+                scored[idx] = llm_comp
+            else:
+                scored[idx] = comp
+
+    return json.dumps([scored[i] for i in range(len(competences))], ensure_ascii=False)
+
+
+async def _score_shard(
+    system: str,
+    state: State,
+    profile: Dict[str, Any],
+    competences: List[Dict[str, Any]],
+    allowed: Dict[str, Tuple[int, ...]],
+) -> Dict[str, Dict[str, Any]]:
+    """Score one shard with the LLM; return its replies by competence_id."""
+    ids = [competence_id(c) for c in competences]
+    human = (
+        f"Employee profile:\n{for_scoring(profile, competences)}\n\n"
+        f"Context analysis:\n{analysis_excerpt(state.analysis, competences)}\n\n"
+    )
+    answered = blueprint_excerpt(state.test_blueprint, ids)
+    if state.test_scores:
+        scores = {cid: s for cid, s in state.test_scores.items() if cid in ids}
+        if answered:
+            human += f"Test questions answered:\n{answered}\n\n"
+        levels = {cid: list(allowed[cid]) for cid in ids if cid in allowed}
+        if levels:
+            human += (
+                f"Allowed niveau_estime per competence_id:\n"
+                f"{json.dumps(levels, ensure_ascii=False)}\n\n"
+            )
+        human += (
+            f"Real test scores (competence_id → score_test):\n"
+            f"{json.dumps(scores, ensure_ascii=False)}"
+        )
+    else:
+        # A blueprint that cannot be split is passed whole rather than dropped.
+        human += f"Test blueprint:\n{answered or state.test_blueprint}"
+    parsed = parse_json(await _score_with_llm(system, human))
+    if not isinstance(parsed, list):
+        return {}
+    return {
+        competence_id(c): c
+        for c in parsed
+        if isinstance(c, dict) and competence_id(c) in ids
+    }
+
+
+async def _score_sharded(
+    system: str,
+    state: State,
+    profile: Dict[str, Any],
+    competences: List[Dict[str, Any]],
+    allowed: Dict[str, Tuple[int, ...]] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Score ``competences`` with one concurrent LLM call per shard.
+
+    ``allowed`` lists, per competence_id, the levels the rules admit; they
+    are shown to the model so it chooses among them.
+    """
+    shards = sharding.shard(competences, scoring_tokens, sharding.token_budget())
+    results = await gather_limited(
+        (_score_shard(system, state, profile, s, allowed or {}) for s in shards),
+        sharding.concurrency(),
+    )
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        merged.update(result)
+    return merged
+
+
 async def evaluation_scoring_agent(state: State) -> Dict[str, Any]:
     """Agent 3: score tests and derive updated niveau_estime."""
-    llm = get_llm()
+    profile = load_profile(state.employee_json)
+    if profile:
+        profile = scope(state, profile)
+    competences = profile.get("competences") if profile else None
+    if profile and isinstance(competences, list):
+        if state.test_scores:
+            return {"evaluation_results": await _score_real(state, profile)}
+        scored = await _score_sharded(_SYSTEM_SIMULATE, state, profile, competences)
+        # Competences the LLM left out keep their input values.
+        evaluated = [scored.get(competence_id(c), c) for c in competences]
+        return {"evaluation_results": json.dumps(evaluated, ensure_ascii=False)}
 
+    # Unparseable profile: hand the raw input to a single call.
     if state.test_scores:
         system = _SYSTEM_REAL
         human = (
             f"Employee profile:\n{state.employee_json}\n\n"
             f"Context analysis:\n{state.analysis}\n\n"
+        )
+        if state.test_blueprint:
+            human += f"Test questions answered:\n{state.test_blueprint}\n\n"
+        human += (
             f"Real test scores (competence_id → score_test):\n"
             f"{json.dumps(state.test_scores, ensure_ascii=False)}"
         )
@@ -101,12 +310,5 @@ async def evaluation_scoring_agent(state: State) -> Dict[str, Any]:
             f"Test blueprint:\n{state.test_blueprint}"
         )
 
-    result = await invoke(llm, system, human)
-    result = (
-        result.strip()
-        .removeprefix("```json")
-        .removeprefix("```")
-        .removesuffix("```")
-        .strip()
-    )
+    result = await _score_with_llm(system, human)
     return {"evaluation_results": result}
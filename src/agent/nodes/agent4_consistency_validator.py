@@ -14,14 +14,35 @@ Validation rules:
 - _metadata_evaluation fields (score_test, date_test) must NOT be changed.
 - If a level is illogical, correct niveau_estime only.
 
+The mechanical rules (24m ceiling, ±2 jump clamp, metadata preservation) are
+checked and corrected locally (see agent.rules). Only competences that need a
+judgement call are sent to the LLM, as a reduced array; when none are flagged
+the node makes no LLM call at all. Large reviews are split into token-bounded
+shards (see agent.sharding) reviewed concurrently, each with only its own
+competences, and merged back by competence_id.
+
 Output: validated JSON array stored in state.validated_results.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+from typing import Any, Dict, List
 
+from agent import sharding
+from agent.concurrency import gather_limited
+from agent.incremental import scope
 from agent.llm import get_llm, invoke
+from agent.projections import for_validation, load_profile, validation_tokens
+from agent.rules import (
+    ConsistencyCheck,
+    as_level,
+    check_consistency,
+    competence_id,
+    enforce_bounds,
+    level_cap,
+    parse_json,
+)
 from agent.state import State
 
 SYSTEM_PROMPT = """You are Agent 4 – Consistency & Gap Validator of the SkillBridge system.
@@ -42,20 +63,110 @@ No markdown. No explanation. Only the JSON array.
 """
 
 
-async def consistency_gap_validator(state: State) -> Dict[str, Any]:
-    """Agent 4: validate and correct levels for logical coherence."""
+async def _validate_with_llm(human: str) -> str:
+    """Run one validation completion and strip markdown fences from the reply."""
     llm = get_llm()
-    result = await invoke(
-        llm,
-        SYSTEM_PROMPT,
-        f"Original employee profile:\n{state.employee_json}\n\n"
-        f"Evaluated competences JSON array:\n{state.evaluation_results}",
-    )
-    result = (
+    result = await invoke(llm, SYSTEM_PROMPT, human)
+    return (
         result.strip()
         .removeprefix("```json")
         .removeprefix("```")
         .removesuffix("```")
         .strip()
     )
-    return {"validated_results": result}
+
+
+async def _review_shard(
+    profile: Dict[str, Any], flagged: List[ConsistencyCheck]
+) -> Dict[str, Dict[str, Any]]:
+    """Ask the LLM to review one shard of flagged competences."""
+    context, competences = for_validation(
+        profile, [check.competence for check in flagged]
+    )
+    reasons = {
+        competence_id(check.competence): list(check.reasons) for check in flagged
+    }
+    human = (
+        f"Employee context:\n{context}\n\n"
+        f"Flagged issues per competence_id:\n"
+        f"{json.dumps(reasons, ensure_ascii=False)}\n\n"
+        f"Evaluated competences JSON array:\n{competences}"
+    )
+    parsed = parse_json(await _validate_with_llm(human))
+    if not isinstance(parsed, list):
+        return {}
+    return {
+        competence_id(c): c
+        for c in parsed
+        if isinstance(c, dict) and competence_id(c) in reasons
+    }
+
+
+async def _review_flagged(
+    profile: Dict[str, Any], flagged: List[ConsistencyCheck]
+) -> Dict[str, Dict[str, Any]]:
+    """Ask the LLM to review only the competences the rules flagged."""
+    shards = sharding.shard(
+        flagged,
+        lambda check: validation_tokens(check.competence),
+        sharding.token_budget(),
+    )
+    results = await gather_limited(
+        (_review_shard(profile, s) for s in shards), sharding.concurrency()
+    )
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        merged.update(result)
+    return merged
+
+
+async def consistency_gap_validator(state: State) -> Dict[str, Any]:
+    """Agent 4: validate and correct levels for logical coherence."""
+    profile = scope(state, load_profile(state.employee_json) or {})
+    evaluated = parse_json(state.evaluation_results)
+    if not isinstance(evaluated, list):
+        original = state.employee_json
+        if profile:
+            context, competences = for_validation(
+                profile, list(profile.get("competences", []))
+            )
+            original = f"{context}\n{competences}"
+        result = await _validate_with_llm(
+            f"Original employee profile:\n{original}\n\n"
+            f"Evaluated competences JSON array:\n{state.evaluation_results}"
+        )
+        return {"validated_results": result}
+
+    originals = {
+        competence_id(c): c
+        for c in profile.get("competences", [])
+        if isinstance(c, dict)
+    }
+
+    validated: List[Any] = []
+    checks: Dict[int, ConsistencyCheck] = {}
+    for idx, comp in enumerate(evaluated):
+        if not isinstance(comp, dict):
+            validated.append(comp)
+            continue
+        # Fall back to the original record for fields Agent 3 may have dropped.
+        check = check_consistency({**originals.get(competence_id(comp), {}), **comp})
+        checks[idx] = check
+        validated.append({**comp, "niveau_estime": check.competence["niveau_estime"]})
+
+    flagged = {idx: c for idx, c in checks.items() if c.needs_review}
+    if flagged:
+        reviewed = await _review_flagged(profile, list(flagged.values()))
+        for idx, check in flagged.items():
+            reply = reviewed.get(competence_id(check.competence))
+            if reply is None:
+                continue
+            level = enforce_bounds(
+                as_level(reply.get("niveau_estime")),
+                check.niveau_avant_test,
+                level_cap(check.competence),
+            )
+            # Only niveau_estime may change; _metadata_evaluation stays as-is.
+            validated[idx] = {**validated[idx], "niveau_estime": level}
+
+    return {"validated_results": json.dumps(validated, ensure_ascii=False)}
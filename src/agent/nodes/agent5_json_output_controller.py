@@ -15,16 +15,34 @@ Absolute constraints:
 - No comments or markdown fences.
 - Output is ONLY the raw JSON string.
 
+The merge is done in Python: the original record is copied key by key and
+only niveau_estime / _metadata_evaluation are taken from the validated array,
+then the result is checked against the input structure; a merge that fails
+the check is logged and the original record is returned unchanged rather
+than failing the run. The LLM is only used as a fallback when the inputs
+cannot be parsed. In an incremental
+re-evaluation the validated array only holds the re-scored competences; the
+others are merged back verbatim from ``previous_output``.
+
 Output: final valid JSON string stored in state.final_output.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import json
+import logging
+from typing import Any, Dict, List
 
+from agent.incremental import plan
 from agent.llm import get_llm, invoke
+from agent.projections import load_profile
+from agent.rules import LEVEL_MAX, LEVEL_MIN, competence_id, parse_json
 from agent.state import State
 
+logger = logging.getLogger(__name__)
+
+_MUTABLE_FIELDS = ("niveau_estime", "_metadata_evaluation")
+
 SYSTEM_PROMPT = """You are Agent 5 – JSON Output Controller of the SkillBridge system.
 
 Your only task: reconstruct the complete, final output JSON.
@@ -44,8 +62,68 @@ Rules (ABSOLUTE):
 """
 
 
-async def json_output_controller(state: State) -> Dict[str, Any]:
-    """Agent 5: reconstruct and return the final valid JSON output."""
+def _valid_level(value: Any) -> bool:
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and (LEVEL_MIN <= value <= LEVEL_MAX)
+    )
+
+
+def merge_validated(original: Dict[str, Any], validated: List[Any]) -> Dict[str, Any]:
+    """Return ``original`` with niveau_estime / _metadata_evaluation merged in.
+
+    Key order is preserved. A competence missing from ``validated``, or whose
+    validated level is missing or out of range, keeps its original values:
+    its metadata is not merged without the level it describes.
+    """
+    updates = {competence_id(c): c for c in validated if isinstance(c, dict)}
+    merged: Dict[str, Any] = {}
+    for key, value in original.items():
+        if key != "competences" or not isinstance(value, list):
+            merged[key] = value
+            continue
+        competences = []
+        for comp in value:
+            update = (
+                updates.get(competence_id(comp)) if isinstance(comp, dict) else None
+            )
+            if update is None or not _valid_level(update.get("niveau_estime")):
+                competences.append(comp)
+                continue
+            comp = dict(comp)
+            comp["niveau_estime"] = update["niveau_estime"]
+            if isinstance(update.get("_metadata_evaluation"), dict):
+                comp["_metadata_evaluation"] = update["_metadata_evaluation"]
+            competences.append(comp)
+        merged[key] = competences
+    return merged
+
+
+def check_structure(original: Dict[str, Any], merged: Dict[str, Any]) -> None:
+    """Raise ValueError if ``merged`` changed anything but the mutable fields."""
+    if list(original) != list(merged):
+        raise ValueError("top-level keys differ from the input JSON")
+    for key, value in original.items():
+        if key != "competences":
+            if merged[key] != value:
+                raise ValueError(f"field {key!r} was modified")
+            continue
+        if not isinstance(value, list) or len(value) != len(merged[key]):
+            raise ValueError("competences array length changed")
+        for before, after in zip(value, merged[key]):
+            if not isinstance(before, dict):
+                if before != after:
+                    raise ValueError("non-object competence was modified")
+                continue
+            fixed = [k for k in before if k not in _MUTABLE_FIELDS]
+            if [k for k in after if k not in _MUTABLE_FIELDS] != fixed:
+                raise ValueError(f"keys of {competence_id(before)!r} differ")
+            if any(before[k] != after[k] for k in fixed):
+                raise ValueError(f"fields of {competence_id(before)!r} were modified")
+
+
+async def _reconstruct_with_llm(state: State) -> str:
     llm = get_llm()
     result = await invoke(
         llm,
@@ -53,11 +131,33 @@ async def json_output_controller(state: State) -> Dict[str, Any]:
         f"Original employee JSON:\n{state.employee_json}\n\n"
         f"Validated competences JSON array (use these values):\n{state.validated_results}",
     )
-    result = (
+    return (
         result.strip()
         .removeprefix("```json")
         .removeprefix("```")
         .removesuffix("```")
         .strip()
     )
-    return {"final_output": result}
+
+
+async def json_output_controller(state: State) -> Dict[str, Any]:
+    """Agent 5: reconstruct and return the final valid JSON output."""
+    original = load_profile(state.employee_json)
+    validated = parse_json(state.validated_results)
+    incremental = plan(state)
+    if incremental is not None:
+        # Unchanged competences come back verbatim from the previous output;
+        # with nothing to re-score, Agents 3 and 4 did not run at all.
+        rescored = [] if not state.validated_results else validated
+        if isinstance(rescored, list):
+            validated = list(incremental.carried) + rescored
+    if original is None or not isinstance(validated, list):
+        return {"final_output": await _reconstruct_with_llm(state)}
+
+    merged = merge_validated(original, validated)
+    try:
+        check_structure(original, merged)
+    except ValueError as exc:
+        logger.warning("Agent 5 merge rejected, keeping the input record: %s", exc)
+        merged = original
+    return {"final_output": json.dumps(merged, ensure_ascii=False, indent=2)}
@@ -16,6 +16,16 @@ Returns a list of course dicts:
     "competences_cibles": list[str],
     "importance":         int    # 1-10
   }
+
+The search goes through the SDK's async client (``client.aio``), so waiting on
+grounding holds no executor thread. At most SKILLBRIDGE_RECOMMEND_CONCURRENCY
+searches run at once and each is abandoned after SKILLBRIDGE_RECOMMEND_TIMEOUT
+or at the request deadline (agent.deadlines), whichever comes first.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_RECOMMEND_CONCURRENCY : Max concurrent grounded searches (default 8).
+SKILLBRIDGE_RECOMMEND_TIMEOUT     : Per-search timeout in seconds (default 60).
 """
 
 from __future__ import annotations
@@ -24,13 +34,20 @@ import asyncio
 import json
 import os
 import re
+import time
+import weakref
 from typing import Any
 
-from google import genai
 from google.genai import types
-from dotenv import load_dotenv
 
-load_dotenv()
+from agent import deadlines
+from agent.cache import cache_key, get_formation_cache
+from agent.clients import MODEL, get_registry
+from agent.metrics import LLM_ERRORS, record_llm_call
+from agent.rules import competence_id
+from agent.singleflight import SingleFlight
+
+_AGENT = "formation_recommender"
 
 SYSTEM_PROMPT = """You are Agent 6 – Formation Recommender of the SkillBridge system.
 
@@ -54,40 +71,90 @@ Rules:
 """
 
 
-def _build_prompt(final_output_json: str) -> str:
-    """Build a focused search prompt from the evaluated employee JSON."""
+# Number of largest gaps the search prompt (and the cache key) covers.
+_TOP_GAPS = 6
+
+# Concurrent requests with the same gap signature share one search.
+_flights: SingleFlight[str] = SingleFlight(_AGENT)
+
+# One limiter per event loop (a semaphore cannot be shared across loops).
+_limiters: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limiter() -> asyncio.Semaphore:
+    """Return this loop's cap on concurrent grounded searches."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limit = int(os.getenv("SKILLBRIDGE_RECOMMEND_CONCURRENCY", "8"))
+        limiter = _limiters[loop] = asyncio.Semaphore(max(1, limit))
+    return limiter
+
+
+def _timeout() -> float:
+    return float(os.getenv("SKILLBRIDGE_RECOMMEND_TIMEOUT", "60"))
+
+
+def _gap_signature(final_output_json: str) -> tuple[str, list[dict[str, Any]]] | None:
+    """Reduce an evaluated employee to ``(role, top gaps)``, or None if unparseable.
+
+    Gaps are ordered by size, then competence id, so that employees with the
+    same gaps get the same signature whatever their profile order.
+    """
     try:
         data = json.loads(final_output_json)
-        employee_name = data.get("employee_name", "employé")
         poste = data.get("poste", "développeur")
         gaps = []
         for c in data.get("competences", []):
             niveau = c.get("niveau_estime", 0)
             attendu = c.get("niveau_attendu_12m", 0)
             if niveau < attendu:
-                gaps.append({
-                    "id": c.get("competence_id", ""),
-                    "titre": c.get("titre", ""),
-                    "gap": attendu - niveau,
-                    "niveau_actuel": niveau,
-                    "niveau_cible": attendu,
-                })
-        gaps.sort(key=lambda x: x["gap"], reverse=True)
-        gap_text = "\n".join(
-            f"- {g['titre']} (ID: {g['id']}) — niveau actuel {g['niveau_actuel']}/5, cible {g['niveau_cible']}/5, gap={g['gap']}"
-            for g in gaps[:6]
-        )
-        return (
-            f"Employee: {employee_name}, role: {poste}\n\n"
-            f"Priority skill gaps to fill:\n{gap_text}\n\n"
-            "Search for the best online courses (Udemy, Coursera, Pluralsight, YouTube, LinkedIn Learning) "
-            "that would fill these gaps. Return the JSON array as instructed."
-        )
+                gaps.append(
+                    {
+                        "id": competence_id(c),
+                        "titre": c.get("titre", ""),
+                        "gap": attendu - niveau,
+                        "niveau_actuel": niveau,
+                        "niveau_cible": attendu,
+                    }
+                )
+        gaps.sort(key=lambda x: (-x["gap"], x["id"]))
     except Exception:
-        return (
-            f"Employee profile:\n{final_output_json[:1000]}\n\n"
-            "Search for relevant online training courses for this employee. Return the JSON array as instructed."
-        )
+        return None
+    return str(poste), gaps[:_TOP_GAPS]
+
+
+def _signature_key(poste: str, gaps: list[dict[str, Any]]) -> str:
+    """Cache key: normalized role plus competence ids and gap sizes."""
+    role = " ".join(poste.lower().split())
+    return cache_key(_AGENT, role, [(g["id"], g["gap"]) for g in gaps])
+
+
+def _build_prompt(poste: str, gaps: list[dict[str, Any]]) -> str:
+    """Build a focused search prompt from a gap signature.
+
+    The employee's name is deliberately left out: the reply is shared with
+    everyone who has the same signature.
+    """
+    gap_text = "\n".join(
+        f"- {g['titre']} (ID: {g['id']}) — niveau actuel {g['niveau_actuel']}/5, cible {g['niveau_cible']}/5, gap={g['gap']}"
+        for g in gaps
+    )
+    return (
+        f"Role: {poste}\n\n"
+        f"Priority skill gaps to fill:\n{gap_text}\n\n"
+        "Search for the best online courses (Udemy, Coursera, Pluralsight, YouTube, LinkedIn Learning) "
+        "that would fill these gaps. Return the JSON array as instructed."
+    )
+
+
+def _fallback_prompt(final_output_json: str) -> str:
+    return (
+        f"Employee profile:\n{final_output_json[:1000]}\n\n"
+        "Search for relevant online training courses for this employee. Return the JSON array as instructed."
+    )
 
 
 def _extract_grounding_urls(response: Any) -> dict[str, str]:
@@ -122,7 +189,9 @@ def _clean_text(raw: str) -> str:
     return match.group(0) if match else raw
 
 
-def _merge_grounding_urls(formations: list[dict], url_map: dict[str, str]) -> list[dict]:
+def _merge_grounding_urls(
+    formations: list[dict[str, Any]], url_map: dict[str, str]
+) -> list[dict[str, Any]]:
     """Best-effort: if a formation URL is missing or placeholder, try to fill from grounding."""
     if not url_map:
         return formations
@@ -131,20 +200,53 @@ def _merge_grounding_urls(formations: list[dict], url_map: dict[str, str]) -> li
     for f in formations:
         url = f.get("url", "")
         # Replace missing / obviously placeholder URLs with a grounding URL
-        if (not url or url in ("", "#", "https://", "http://")
-                or "placeholder" in url or "example.com" in url):
+        if (
+            not url
+            or url in ("", "#", "https://", "http://")
+            or "placeholder" in url
+            or "example.com" in url
+        ):
             if grounding_idx < len(url_list):
                 f["url"] = url_list[grounding_idx]
                 grounding_idx += 1
     return formations
 
 
-async def recommend_formations(final_output_json: str) -> list[dict]:
-    """Call Gemini with Google Search grounding and return formation list."""
-    api_key = os.getenv("GOOGLE_API_KEY", "")
-    client = genai.Client(api_key=api_key)
+async def recommend_formations(final_output_json: str) -> list[dict[str, Any]]:
+    """Return course recommendations for the employee's skill gaps.
+
+    Results are cached by gap signature (agent.cache.get_formation_cache), and
+    concurrent requests with the same signature share one upstream search.
+    Unparseable input is searched as-is, without caching.
+    """
+    signature = _gap_signature(final_output_json)
+    if signature is None:
+        return await _search(_fallback_prompt(final_output_json))
 
-    prompt = _build_prompt(final_output_json)
+    key = _signature_key(*signature)
+    cache = get_formation_cache()
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            hit: list[dict[str, Any]] = json.loads(cached)
+            return hit
+
+    async def fetch() -> str:
+        formations = await _search(_build_prompt(*signature))
+        text = json.dumps(formations, ensure_ascii=False)
+        # An empty list is most likely a failed parse; don't pin it.
+        if cache is not None and formations:
+            await asyncio.to_thread(cache.set, key, text)
+        return text
+
+    # Each caller decodes its own copy of the shared result.
+    shared: list[dict[str, Any]] = json.loads(await _flights.do(key, fetch))
+    return shared
+
+
+async def _search(prompt: str) -> list[dict[str, Any]]:
+    """Call Gemini with Google Search grounding and return formation list."""
+    client = get_registry().genai()
 
     config = types.GenerateContentConfig(
         system_instruction=SYSTEM_PROMPT,
@@ -152,22 +254,38 @@ async def recommend_formations(final_output_json: str) -> list[dict]:
         temperature=0.2,
     )
 
-    # Run the sync SDK call in a thread pool to keep FastAPI async
-    loop = asyncio.get_event_loop()
-    response = await loop.run_in_executor(
-        None,
-        lambda: client.models.generate_content(
-            model="gemini-3-pro-preview",
-            contents=prompt,
-            config=config,
-        ),
-    )
+    # Native async SDK call: no executor thread is held while grounding runs.
+    async with _limiter():
+        deadlines.check("course search")
+        start = time.perf_counter()
+        try:
+            response = await deadlines.wait_for(
+                client.aio.models.generate_content(
+                    model=MODEL,
+                    contents=prompt,
+                    config=config,
+                ),
+                _timeout(),
+                "course search",
+            )
+        except Exception:
+            LLM_ERRORS.inc(agent=_AGENT)
+            raise
 
     raw_text = response.text or ""
+    usage = getattr(response, "usage_metadata", None)
+    record_llm_call(
+        _AGENT,
+        time.perf_counter() - start,
+        prompt_chars=len(SYSTEM_PROMPT) + len(prompt),
+        completion_chars=len(raw_text),
+        prompt_tokens=getattr(usage, "prompt_token_count", None),
+        completion_tokens=getattr(usage, "candidates_token_count", None),
+    )
     url_map = _extract_grounding_urls(response)
 
     try:
-        formations: list[dict] = json.loads(_clean_text(raw_text))
+        formations: list[dict[str, Any]] = json.loads(_clean_text(raw_text))
     except json.JSONDecodeError:
         formations = []
 
@@ -0,0 +1,157 @@
+"""SkillBridge – per-agent input projections.
+
+Every agent used to receive the whole ``employee_json`` (and Agents 2–4 the
+whole ``analysis`` on top). This module parses the profile once per distinct
+input string and gives each agent only the fields it actually reads, in a
+compact (whitespace-free) JSON serialization.
+
+Agent 5 is the exception: its LLM fallback rebuilds the full document, so it
+still needs the original JSON verbatim.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from agent.rules import competence_id, parse_json
+from agent.sharding import estimate_tokens
+
+# Profile-level fields that give the LLM enough context about the employee.
+CONTEXT_FIELDS: Tuple[str, ...] = (
+    "employee_id",
+    "department",
+    "poste",
+    "anciennete_mois",
+    "evaluation_date",
+)
+
+TEST_GENERATION_FIELDS: Tuple[str, ...] = (
+    "competence_id",
+    "id",
+    "type",
+    "titre",
+    "detail",
+    "experience_employee",
+    "niveau_estime",
+    "niveau_attendu_6m",
+    "niveau_attendu_12m",
+)
+
+SCORING_FIELDS: Tuple[str, ...] = (
+    "competence_id",
+    "id",
+    "type",
+    "titre",
+    "experience_employee",
+    "niveau_estime",
+    "niveau_attendu_12m",
+    "niveau_attendu_24m",
+)
+
+VALIDATION_FIELDS: Tuple[str, ...] = (
+    "competence_id",
+    "id",
+    "titre",
+    "experience_employee",
+    "niveau_estime",
+    "niveau_attendu_6m",
+    "niveau_attendu_12m",
+    "niveau_attendu_24m",
+    "_metadata_evaluation",
+)
+
+
+def compact(value: Any) -> str:
+    """Serialize ``value`` as compact JSON (no insignificant whitespace)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+@functools.lru_cache(maxsize=128)
+def load_profile(employee_json: str) -> Dict[str, Any] | None:
+    """Parse an employee profile once; return None if it is not a JSON object.
+
+    The result is shared between callers and must be treated as read-only.
+    """
+    profile = parse_json(employee_json)
+    return profile if isinstance(profile, dict) else None
+
+
+def _pick(record: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    return {k: record[k] for k in fields if k in record}
+
+
+def context(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the profile-level context fields only."""
+    return _pick(profile, CONTEXT_FIELDS)
+
+
+def for_analyzer(profile: Dict[str, Any]) -> str:
+    """Agent 1 reads the whole profile except the employee's name."""
+    return compact({k: v for k, v in profile.items() if k != "employee_name"})
+
+
+def for_test_generation(
+    profile: Dict[str, Any], competences: List[Dict[str, Any]]
+) -> str:
+    """Agent 2 needs context plus the competences to write questions for."""
+    return compact(
+        {
+            **context(profile),
+            "competences": [_pick(c, TEST_GENERATION_FIELDS) for c in competences],
+        }
+    )
+
+
+def for_scoring(profile: Dict[str, Any], competences: List[Dict[str, Any]]) -> str:
+    """Agent 3 needs context plus current / expected levels and experience."""
+    return compact(
+        {
+            **context(profile),
+            "competences": [_pick(c, SCORING_FIELDS) for c in competences],
+        }
+    )
+
+
+def for_validation(
+    profile: Dict[str, Any], competences: List[Dict[str, Any]]
+) -> Tuple[str, str]:
+    """Agent 4 needs context plus experience, targets and evaluated levels.
+
+    Returns ``(context_json, competences_json)``.
+    """
+    return compact(context(profile)), compact(
+        [_pick(c, VALIDATION_FIELDS) for c in competences]
+    )
+
+
+def scoring_tokens(comp: Dict[str, Any]) -> int:
+    """Estimated tokens one competence adds to an Agent 3 prompt."""
+    return estimate_tokens(compact(_pick(comp, SCORING_FIELDS)))
+
+
+def validation_tokens(comp: Dict[str, Any]) -> int:
+    """Estimated tokens one competence adds to an Agent 4 prompt."""
+    return estimate_tokens(compact(_pick(comp, VALIDATION_FIELDS)))
+
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+
+
+def analysis_excerpt(analysis: str, competences: List[Dict[str, Any]]) -> str:
+    """Return the Agent 1 paragraphs that mention any of ``competences``.
+
+    Falls back to the full analysis when no paragraph mentions them, so the
+    downstream agent never loses context it might need.
+    """
+    needles = [competence_id(c) for c in competences]
+    needles += [str(c.get("titre", "")) for c in competences]
+    needles = [n for n in needles if n]
+    if not needles:
+        return analysis
+    paragraphs = [
+        p for p in _PARAGRAPH_SPLIT.split(analysis) if any(n in p for n in needles)
+    ]
+    return "\n\n".join(paragraphs) if paragraphs else analysis
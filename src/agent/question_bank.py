@@ -0,0 +1,213 @@
+"""SkillBridge – persistent question bank.
+
+Agent 2 used to invent brand-new MCQs on every ``generate_tests`` call, even
+for a competence it had already written questions for at the same target
+level. Every question it generates is now stored here, indexed by competence
+(id + title) and target level, and later calls draw from the bank first; the
+LLM is only asked to top up the competences the bank cannot serve.
+
+A question's difficulty is stored and served with it but is not part of the
+slot: callers ask for a competence at a level, never for a difficulty (the
+model picks one from the level and the employee's experience), so keying on
+it would only split each slot into parts no draw can address.
+
+Rotation: each draw picks the least-served question for the slot, and
+questions already served to the same employee are never drawn again for
+them, so a re-test always gets a question the employee has not seen (or a
+freshly generated one once the slot is exhausted for that employee).
+
+The bank can be filled ahead of time with ``skillbridge-questions prewarm``
+(see agent.question_bank_cli).
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_QUESTION_BANK      : "0" disables the bank (default "1").
+SKILLBRIDGE_QUESTION_BANK_PATH : SQLite file (default .skillbridge_cache/questions.sqlite).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agent.blueprint import valid_question
+from agent.cache import cache_key, connect
+from agent.rules import as_level, competence_id
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id             INTEGER PRIMARY KEY,
+    bank_key       TEXT NOT NULL,
+    level          INTEGER NOT NULL,
+    difficulty     INTEGER,
+    question       TEXT NOT NULL,
+    options        TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    fingerprint    TEXT NOT NULL UNIQUE,
+    served_count   INTEGER NOT NULL DEFAULT 0,
+    last_served_at REAL NOT NULL DEFAULT 0,
+    created_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_slot
+    ON questions (bank_key, level, served_count, last_served_at);
+CREATE TABLE IF NOT EXISTS served (
+    employee_id TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    served_at   REAL NOT NULL,
+    PRIMARY KEY (employee_id, question_id)
+);
+"""
+
+
+def bank_key(comp: Dict[str, Any]) -> str:
+    """Return the bank key of a competence: its id plus normalised title."""
+    title = " ".join(str(comp.get("titre", "")).split()).casefold()
+    return f"{competence_id(comp)}::{title}"
+
+
+def target_level(comp: Dict[str, Any]) -> int:
+    """Return the level a question for ``comp`` is written for."""
+    return as_level(comp.get("niveau_attendu_12m", comp.get("niveau_estime")))
+
+
+class QuestionBank:
+    """SQLite-backed store of generated MCQs with per-employee rotation."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open (or create) the bank at ``path``."""
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def _mark_served(self, question_id: int, employee_id: str | None) -> None:
+        now = time.time()
+        self._conn.execute(
+            "UPDATE questions SET served_count = served_count + 1,"
+            " last_served_at = ? WHERE id = ?",
+            (now, question_id),
+        )
+        if employee_id:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO served (employee_id, question_id, served_at)"
+                " VALUES (?, ?, ?)",
+                (employee_id, question_id, now),
+            )
+
+    def add(
+        self,
+        comp: Dict[str, Any],
+        question: Dict[str, Any],
+        *,
+        served_to: str | None = None,
+    ) -> bool:
+        """Store ``question`` for ``comp``; return False if invalid or known.
+
+        With ``served_to`` the question is also recorded as already seen by
+        that employee.
+        """
+        if not valid_question(question):
+            return False
+        key, level = bank_key(comp), target_level(comp)
+        fingerprint = cache_key(key, level, question["question"], question["options"])
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO questions (bank_key, level, difficulty,"
+                " question, options, correct_answer, fingerprint, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    level,
+                    question.get("difficulty"),
+                    question["question"],
+                    json.dumps(question["options"], ensure_ascii=False),
+                    question["correct_answer"],
+                    fingerprint,
+                    time.time(),
+                ),
+            )
+            added = cursor.rowcount > 0
+            if added and served_to:
+                self._mark_served(int(cursor.lastrowid or 0), served_to)
+            self._conn.commit()
+        return added
+
+    def draw(
+        self, comp: Dict[str, Any], employee_id: str | None = None
+    ) -> Dict[str, Any] | None:
+        """Draw the least-served question for ``comp`` unseen by ``employee_id``.
+
+        Returns None when the slot has no such question left.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, question, options, correct_answer, difficulty"
+                " FROM questions WHERE bank_key = ? AND level = ?"
+                " AND id NOT IN (SELECT question_id FROM served WHERE employee_id = ?)"
+                " ORDER BY served_count, last_served_at, id LIMIT 1",
+                (bank_key(comp), target_level(comp), employee_id or ""),
+            ).fetchone()
+            if row is None:
+                return None
+            question_id, text, options, correct_answer, difficulty = row
+            self._mark_served(question_id, employee_id)
+            self._conn.commit()
+        return {
+            "question": text,
+            "question_type": "mcq",
+            "options": json.loads(options),
+            "correct_answer": correct_answer,
+            "difficulty": difficulty,
+        }
+
+    def questions(self, comp: Dict[str, Any]) -> List[str]:
+        """Return the stored question texts for ``comp``'s slot."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT question FROM questions WHERE bank_key = ? AND level = ?"
+                " ORDER BY id",
+                (bank_key(comp), target_level(comp)),
+            ).fetchall()
+        return [text for (text,) in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Return question, slot and served-pair counts."""
+        with self._lock:
+            questions, slots = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT bank_key || '#' || level)"
+                " FROM questions"
+            ).fetchone()
+            (served,) = self._conn.execute("SELECT COUNT(*) FROM served").fetchone()
+        return {
+            "questions": int(questions),
+            "slots": int(slots),
+            "served": int(served),
+        }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_bank: QuestionBank | None = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank | None:
+    """Return the process-wide question bank, or None when disabled."""
+    global _bank
+    if os.getenv("SKILLBRIDGE_QUESTION_BANK", "1") == "0":
+        return None
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank(
+                os.getenv(
+                    "SKILLBRIDGE_QUESTION_BANK_PATH",
+                    ".skillbridge_cache/questions.sqlite",
+                )
+            )
+        return _bank
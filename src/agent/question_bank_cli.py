@@ -0,0 +1,122 @@
+"""SkillBridge – question bank maintenance commands.
+
+``prewarm`` fills the question bank (agent.question_bank) ahead of time from
+a set of employee profiles, so that ``generate_tests`` for common
+competences becomes a local lookup. For every distinct (competence, target
+level) slot it asks Agent 2 for new questions until the slot holds
+``--per-slot`` of them; slots that are already full cost nothing, so the
+command can be re-run safely.
+
+Profiles are read from JSON files (one profile or a list of profiles) or
+JSONL files (one profile per line).
+
+Usage
+-----
+    python -m agent.question_bank_cli prewarm profiles.jsonl --per-slot 3
+    python -m agent.question_bank_cli stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from agent.concurrency import gather_limited
+from agent.nodes.agent2_test_generation import generate_questions
+from agent.question_bank import QuestionBank, bank_key, get_question_bank, target_level
+from agent.rules import competence_id
+
+logger = logging.getLogger(__name__)
+
+
+def _read_profiles(path: Path) -> Iterator[Dict[str, Any]]:
+    text = path.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for record in data if isinstance(data, list) else [data]:
+        if isinstance(record, dict) and isinstance(record.get("competences"), list):
+            yield record
+
+
+def _slots(
+    paths: List[Path],
+) -> Dict[Tuple[str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Map each distinct slot to one (profile, competence) that needs it."""
+    slots: Dict[Tuple[str, int], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    for path in paths:
+        for profile in _read_profiles(path):
+            for comp in profile["competences"]:
+                slots.setdefault((bank_key(comp), target_level(comp)), (profile, comp))
+    return slots
+
+
+async def _fill_slot(
+    bank: QuestionBank, profile: Dict[str, Any], comp: Dict[str, Any], per_slot: int
+) -> int:
+    added = 0
+    while len(known := bank.questions(comp)) < per_slot:
+        question = (await generate_questions(profile, [comp], known)).get(
+            competence_id(comp)
+        )
+        if question is None or not bank.add(comp, question):
+            # The model repeated itself (or the reply did not parse): stop
+            # rather than loop on the same answer.
+            break
+        added += 1
+    return added
+
+
+async def prewarm(
+    paths: List[Path],
+    *,
+    per_slot: int = 3,
+    concurrency: int = 8,
+    bank: QuestionBank | None = None,
+) -> Dict[str, int]:
+    """Fill every slot found in ``paths`` up to ``per_slot`` questions."""
+    bank = bank or get_question_bank()
+    if bank is None:
+        raise RuntimeError(
+            "the question bank is disabled (SKILLBRIDGE_QUESTION_BANK=0)"
+        )
+    slots = _slots(paths)
+    added = await gather_limited(
+        (_fill_slot(bank, profile, comp, per_slot) for profile, comp in slots.values()),
+        concurrency,
+    )
+    return {"slots": len(slots), "added": sum(added)}
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Maintain the SkillBridge question bank."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm = commands.add_parser("prewarm", help="generate questions ahead of time")
+    warm.add_argument("profiles", type=Path, nargs="+", help="JSON / JSONL profiles")
+    warm.add_argument("--per-slot", type=int, default=3, help="questions per slot")
+    warm.add_argument("--concurrency", type=int, default=8, help="concurrent LLM calls")
+    commands.add_parser("stats", help="print bank statistics")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.command == "prewarm":
+        counts = asyncio.run(
+            prewarm(args.profiles, per_slot=args.per_slot, concurrency=args.concurrency)
+        )
+        logger.info("prewarm: %(added)d questions added over %(slots)d slots", counts)
+    else:
+        bank = get_question_bank()
+        logger.info("%s", json.dumps(bank.stats() if bank else {"disabled": True}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""SkillBridge – deterministic scoring and consistency rules.
+
+Pure-Python version of the rules spelled out in the Agent 3 and Agent 4
+prompts, so that the graph only pays for an LLM call when a rule genuinely
+cannot decide.
+
+Scoring scale (score_test 0–20 → niveau_estime 0–5):
+  0–4   → 0
+  5–8   → 1  (or 2 if strong experience)
+  9–11  → 2  (or 3 if strong experience)
+  12–14 → 3  (or 4 if strong experience)
+  15–17 → 4
+  18–20 → 5
+
+The resulting level never moves more than ±2 away from niveau_avant_test and
+never exceeds niveau_attendu_24m.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Tuple
+
+LEVEL_MIN = 0
+LEVEL_MAX = 5
+SCORE_MIN = 0
+SCORE_MAX = 20
+MAX_JUMP = 2
+
+# (score_low, score_high, level, level_with_strong_experience)
+SCORE_TABLE: Tuple[Tuple[int, int, int, int], ...] = (
+    (0, 4, 0, 0),
+    (5, 8, 1, 2),
+    (9, 11, 2, 3),
+    (12, 14, 3, 4),
+    (15, 17, 4, 4),
+    (18, 20, 5, 5),
+)
+
+
+# Below this prior level, experience is not considered "significant" enough
+# to make a 0 suspicious.
+SIGNIFICANT_EXPERIENCE_LEVEL = 2
+
+
+@dataclass(frozen=True)
+class ScoringDecision:
+    """Outcome of the rules engine for one competence.
+
+    ``level`` is ``None`` when the rules cannot decide on their own; in that
+    case ``candidates`` lists the admissible levels the LLM may choose from.
+    """
+
+    competence_id: str
+    score: int
+    niveau_avant_test: int
+    level: int | None
+    candidates: Tuple[int, ...]
+
+
+def parse_json(text: str) -> Any:
+    """Parse a JSON document, tolerating markdown fences. Return None on failure."""
+    cleaned = (
+        text.strip()
+        .removeprefix("```json")
+        .removeprefix("```")
+        .removesuffix("```")
+        .strip()
+    )
+    try:
+        return json.loads(cleaned)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def competence_id(comp: Mapping[str, Any]) -> str:
+    """Return the competence identifier (supports both key conventions)."""
+    return str(comp.get("competence_id") or comp.get("id") or "")
+
+
+def as_level(value: Any) -> int:
+    """Coerce a niveau value to an int in [LEVEL_MIN, LEVEL_MAX]."""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        level = LEVEL_MIN
+    return max(LEVEL_MIN, min(LEVEL_MAX, level))
+
+
+def has_experience(comp: Dict[str, Any]) -> bool:
+    """Return True if the competence carries an experience description."""
+    return bool(str(comp.get("experience_employee") or "").strip())
+
+
+def score_to_levels(score: int) -> Tuple[int, int]:
+    """Map a 0–20 score to (level, level_with_strong_experience)."""
+    score = max(SCORE_MIN, min(SCORE_MAX, score))
+    for low, high, level, uplifted in SCORE_TABLE:
+        if low <= score <= high:
+            return level, uplifted
+    return LEVEL_MIN, LEVEL_MIN  # pragma: no cover - table covers 0..20
+
+
+def clamp_jump(level: int, niveau_avant_test: int) -> int:
+    """Clamp ``level`` to at most ±MAX_JUMP away from ``niveau_avant_test``."""
+    low = max(LEVEL_MIN, niveau_avant_test - MAX_JUMP)
+    high = min(LEVEL_MAX, niveau_avant_test + MAX_JUMP)
+    return max(low, min(high, level))
+
+
+def score_competence(comp: Dict[str, Any], score: int) -> ScoringDecision:
+    """Apply the score table, experience uplift and jump clamp to one competence.
+
+    The only case left undecided is a score in an uplift band when the
+    employee describes some experience and the two candidate levels are
+    still distinct after the jump clamp — whether that experience is
+    "strong" is a judgement call.
+    """
+    before = as_level(comp.get("niveau_estime"))
+    base, uplifted = score_to_levels(score)
+    candidates = tuple(sorted({clamp_jump(base, before), clamp_jump(uplifted, before)}))
+    if len(candidates) == 1:
+        level: int | None = candidates[0]
+    elif not has_experience(comp):
+        level = clamp_jump(base, before)
+    else:
+        level = None
+    return ScoringDecision(
+        competence_id=competence_id(comp),
+        score=score,
+        niveau_avant_test=before,
+        level=level,
+        candidates=candidates,
+    )
+
+
+def apply_evaluation(
+    comp: Dict[str, Any],
+    level: int,
+    score: int,
+    date_test: str,
+    niveau_avant_test: int,
+) -> Dict[str, Any]:
+    """Return a copy of ``comp`` with niveau_estime and _metadata_evaluation set.
+
+    Existing key order is kept; _metadata_evaluation is appended when absent.
+    """
+    updated = dict(comp)
+    updated["niveau_estime"] = level
+    updated["_metadata_evaluation"] = {
+        "score_test": score,
+        "date_test": date_test,
+        "niveau_avant_test": niveau_avant_test,
+    }
+    return updated
+
+
+@dataclass(frozen=True)
+class ConsistencyCheck:
+    """Outcome of the consistency rule pass for one evaluated competence.
+
+    ``competence`` already carries every mechanical correction; ``reasons``
+    is non-empty when the competence still needs an LLM judgement.
+    """
+
+    competence: Dict[str, Any]
+    niveau_avant_test: int
+    reasons: Tuple[str, ...]
+
+    @property
+    def needs_review(self) -> bool:
+        """Return True if the rules flagged this competence for the LLM."""
+        return bool(self.reasons)
+
+
+def enforce_bounds(level: int, niveau_avant_test: int, cap: int | None) -> int:
+    """Apply the jump clamp, then the niveau_attendu_24m ceiling."""
+    level = clamp_jump(level, niveau_avant_test)
+    if cap is not None:
+        level = min(level, cap)
+    return level
+
+
+def level_cap(comp: Dict[str, Any]) -> int | None:
+    """Return niveau_attendu_24m as a level, or None when absent."""
+    value = comp.get("niveau_attendu_24m")
+    return None if value is None else as_level(value)
+
+
+def check_consistency(comp: Dict[str, Any]) -> ConsistencyCheck:
+    """Check and correct the mechanical Agent 4 rules for one competence.
+
+    Corrected locally:
+      - niveau_estime must not exceed niveau_attendu_24m.
+      - niveau_estime must stay within ±2 of niveau_avant_test.
+      - when both cannot hold (the ceiling is more than 2 below
+        niveau_avant_test) the ceiling wins; no reply could change that.
+
+    Flagged for review (judgement calls):
+      - niveau_estime of 0 despite significant prior experience.
+
+    _metadata_evaluation is never touched.
+    """
+    meta = comp.get("_metadata_evaluation")
+    meta = meta if isinstance(meta, dict) else {}
+    before = as_level(meta.get("niveau_avant_test", comp.get("niveau_estime")))
+    level = enforce_bounds(as_level(comp.get("niveau_estime")), before, level_cap(comp))
+
+    reasons = []
+    if (
+        level == LEVEL_MIN
+        and before >= SIGNIFICANT_EXPERIENCE_LEVEL
+        and has_experience(comp)
+    ):
+        reasons.append("niveau_estime is 0 despite significant experience")
+
+    corrected = dict(comp)
+    corrected["niveau_estime"] = level
+    return ConsistencyCheck(
+        competence=corrected, niveau_avant_test=before, reasons=tuple(reasons)
+    )
@@ -1,17 +1,58 @@
 """FastAPI server exposing the SkillBridge LangGraph as a REST API."""
 
+import asyncio
 import json
-import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from agent import deadlines
+from agent.batch import BatchRunner
+from agent.blueprint import answer_key, grade, parse_blueprint, redact_answers
+from agent.cache import cache_key, get_llm_cache
+from agent.clients import close_registry, get_registry
+from agent.deadlines import DeadlineExceeded
 from agent.graph import graph
+from agent.jobs import (
+    QUEUED,
+    Job,
+    JobWorkers,
+    QueueFull,
+    default_workers,
+    get_job_store,
+)
+from agent.metrics import HTTP_CANCELLED, HTTP_INFLIGHT, REGISTRY
 from agent.nodes.agent6_formation_recommender import recommend_formations
+from agent.projections import load_profile
+from agent.rules import competence_id
+from agent.sessions import get_session_store
+from agent.singleflight import SingleFlight
+
+T = TypeVar("T")
+
 
-app = FastAPI(title="SkillBridge API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the shared Gemini client registry on startup, close it on shutdown."""
+    get_registry()
+    app.state.batch_runner = BatchRunner()
+    workers = _job_workers(app)
+    yield
+    if workers is not None:
+        await workers.stop()
+    await close_registry()
+
+
+app = FastAPI(title="SkillBridge API", version="1.0.0", lifespan=lifespan)
 
 # Allow Vite dev server, production preview, and common local ports
 app.add_middleware(
@@ -23,14 +64,69 @@ app.add_middleware(
 )
 
 
+# Metric label for requests that match no route (keeps label values bounded).
+_UNMATCHED_ENDPOINT = "unmatched"
+
+
+def _endpoint(request: Request) -> str:
+    """Return the route template serving ``request``, e.g. /api/jobs/{job_id}.
+
+    Raw paths would create a metric series per job id; templates do not.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        # Middleware runs before routing has resolved the route.
+        for candidate in request.app.router.routes:
+            match, _ = candidate.matches(request.scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return str(getattr(route, "path", _UNMATCHED_ENDPOINT))
+
+
+class InflightMiddleware:
+    """Count in-flight requests per endpoint for /metrics.
+
+    A plain ASGI middleware rather than ``@app.middleware("http")``: that one
+    wraps ``receive`` (so endpoints never see ``http.disconnect``) and
+    returns once the response headers are sent, which would drop streaming
+    and NDJSON responses from the gauge while they are still running.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the ASGI ``app``."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve one ASGI connection, counted while it runs."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with HTTP_INFLIGHT.track(endpoint=_endpoint(Request(scope))):
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(InflightMiddleware)
+
+
 # --------------------------------------------------------------------------- #
 # Pydantic models                                                              #
 # --------------------------------------------------------------------------- #
 
+
 class EvaluateRequest(BaseModel):
     employee_json: str
     mode: str = "simulate"
     test_scores: dict[str, int] = {}
+    # Resume the analysis / blueprint stored by an earlier call (agent.sessions)
+    session_id: str | None = None
+    # evaluate mode: final_output of an earlier run; only the competences whose
+    # inputs changed since are re-scored (agent.incremental)
+    previous_output: str | None = None
+    # /api/evaluate only: queue the run and answer 202 with a job id (agent.jobs)
+    enqueue: bool = False
+    # Time budget for the run in milliseconds; 504 once exceeded (agent.deadlines)
+    deadline_ms: int | None = None
 
 
 class EvaluateResponse(BaseModel):
@@ -38,78 +134,62 @@ class EvaluateResponse(BaseModel):
     test_blueprint: str = ""
     analysis: str = ""
     enriched_employee_json: str = ""
+    session_id: str = ""
 
 
-class RecommendRequest(BaseModel):
-    final_output_json: str
+class JobStatus(BaseModel):
+    """Status of an enqueued evaluation (GET /api/jobs/{job_id})."""
 
+    job_id: str
+    # queued | running | done | failed
+    status: str
+    # Jobs ahead of this one while queued
+    position: int | None = None
+    result: EvaluateResponse | None = None
+    error: str | None = None
 
-class RecommendResponse(BaseModel):
-    formations: list = []
 
+class GradeRequest(BaseModel):
+    """Answers to grade against a generate_tests session's answer key."""
 
-# --------------------------------------------------------------------------- #
-# Blueprint parser                                                             #
-# --------------------------------------------------------------------------- #
+    employee_json: str
+    # Session returned by the generate_tests call that produced the questions
+    session_id: str
+    # Selected option letter per competence_id ("A" – "D")
+    answers: dict[str, str] = {}
+    deadline_ms: int | None = None
 
-def _parse_blueprint_questions(blueprint: str) -> dict[str, dict]:
-    """Parse agent-2 QCM blueprint into {competence_id: {question, options, correct_answer}}."""
-    questions: dict[str, dict] = {}
-    # Blocks are separated by --- or by a new COMPETENCE_ID: line
-    blocks = re.split(r"\n---\n?|\n(?=COMPETENCE_ID:)", blueprint.strip())
-    for block in blocks:
-        block = block.strip()
-        if not block:
-            continue
-
-        # Extract key: value pairs BUT preserve multi-line QUESTION (may contain code blocks)
-        entry: dict[str, str] = {}
-        current_key = None
-        buffer: list[str] = []
-
-        for line in block.splitlines():
-            # A new recognised key resets the buffer
-            matched = re.match(
-                r"^(COMPETENCE_ID|TYPE|QUESTION|OPTION_A|OPTION_B|OPTION_C|OPTION_D|CORRECT_ANSWER|DIFFICULTY)\s*:\s*(.*)",
-                line,
-            )
-            if matched:
-                if current_key and buffer:
-                    entry[current_key] = "\n".join(buffer).strip()
-                current_key = matched.group(1)
-                buffer = [matched.group(2)]
-            else:
-                if current_key:
-                    buffer.append(line)
-
-        if current_key and buffer:
-            entry[current_key] = "\n".join(buffer).strip()
-
-        cid = entry.get("COMPETENCE_ID")
-        if not cid:
-            continue
-
-        options = [
-            entry[k]
-            for k in ("OPTION_A", "OPTION_B", "OPTION_C", "OPTION_D")
-            if entry.get(k)
-        ]
-
-        questions[cid] = {
-            "question": entry.get("QUESTION", ""),
-            "question_type": "mcq",
-            "options": options,
-            "correct_answer": entry.get("CORRECT_ANSWER", "").strip().upper(),
-        }
-
-    return questions
+
+class GradeResponse(EvaluateResponse):
+    """Evaluation result plus the scores computed from the answers."""
+
+    test_scores: dict[str, int] = {}
+
+
+class BatchEvaluateRequest(BaseModel):
+    """Several evaluate requests answered as one NDJSON stream."""
+
+    items: list[EvaluateRequest]
+
+
+class RecommendRequest(BaseModel):
+    final_output_json: str
+    deadline_ms: int | None = None
+
+
+class RecommendResponse(BaseModel):
+    formations: list[dict[str, Any]] = []
 
 
 def _enrich_employee_json(employee_json: str, blueprint: str) -> str:
-    """Return employee JSON with question/options/correct_answer injected per competence."""
+    """Return employee JSON with question/options injected per competence.
+
+    The correct answers are not injected: the answer key stays on the server
+    (see /api/grade).
+    """
     try:
         data = json.loads(employee_json)
-        q_map = _parse_blueprint_questions(blueprint)
+        q_map = parse_blueprint(blueprint)
         for comp in data.get("competences", []):
             # Support both key conventions used in input.json
             cid = comp.get("competence_id") or comp.get("id")
@@ -117,7 +197,6 @@ def _enrich_employee_json(employee_json: str, blueprint: str) -> str:
                 comp["question"] = q_map[cid]["question"]
                 comp["question_type"] = q_map[cid]["question_type"]
                 comp["options"] = q_map[cid]["options"]
-                comp["correct_answer"] = q_map[cid]["correct_answer"]
         return json.dumps(data, ensure_ascii=False)
     except Exception:
         return employee_json
@@ -127,44 +206,454 @@ def _enrich_employee_json(employee_json: str, blueprint: str) -> str:
 # Endpoints                                                                    #
 # --------------------------------------------------------------------------- #
 
-@app.post("/api/evaluate", response_model=EvaluateResponse)
-async def evaluate(req: EvaluateRequest) -> EvaluateResponse:
-    """Run the SkillBridge multi-agent graph and return structured results."""
-    try:
-        result = await graph.ainvoke(
-            {
-                "employee_json": req.employee_json,
-                "mode": req.mode,
-                "test_scores": req.test_scores,
-            }
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+def _employee_id(employee_json: str) -> str:
+    profile = load_profile(employee_json)
+    return str(profile.get("employee_id") or "") if profile else ""
+
+
+def _graph_input(req: EvaluateRequest) -> dict[str, Any]:
+    """Build the graph input state from an API request.
+
+    With a ``session_id`` the stored analysis and blueprint are injected so the
+    graph skips Agent 1 and Agent 3 sees the questions that were answered.
+    """
+    state = {
+        "employee_json": req.employee_json,
+        "mode": req.mode,
+        "test_scores": req.test_scores,
+    }
+    if req.previous_output:
+        state["previous_output"] = req.previous_output
+    store = get_session_store()
+    if req.session_id and store is not None:
+        session = store.get(req.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session")
+        if session.employee_id != _employee_id(req.employee_json):
+            raise HTTPException(
+                status_code=409, detail="Session belongs to another employee"
+            )
+        if req.test_scores and session.test_blueprint:
+            # Scores for a generated test come from /api/grade only.
+            raise HTTPException(
+                status_code=409,
+                detail="Scores for this session's test must be graded via /api/grade",
+            )
+        state["analysis"] = session.analysis
+        state["test_blueprint"] = session.test_blueprint
+    return state
+
+
+def _build_response(req: EvaluateRequest, result: dict[str, Any]) -> EvaluateResponse:
+    """Shape a final graph state into the public API response."""
     blueprint = result.get("test_blueprint", "")
     enriched = _enrich_employee_json(req.employee_json, blueprint) if blueprint else ""
+    store = get_session_store()
+    session_id = (
+        store.save(
+            _employee_id(req.employee_json),
+            result.get("analysis", ""),
+            blueprint,
+            req.session_id,
+        )
+        if store is not None
+        else ""
+    )
 
     return EvaluateResponse(
         final_output=result.get("final_output", ""),
-        test_blueprint=blueprint,
+        test_blueprint=redact_answers(blueprint),
         analysis=result.get("analysis", ""),
         enriched_employee_json=enriched,
+        session_id=session_id,
+    )
+
+
+# How often a running request checks whether its client is still connected.
+_DISCONNECT_POLL_SECONDS = 0.5
+
+
+def _seconds(deadline_ms: int | None) -> float | None:
+    return None if deadline_ms is None else deadline_ms / 1000
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_graph(
+    request: Request, req: EvaluateRequest, inputs: dict[str, Any]
+) -> AsyncIterator[str]:
+    """Yield SSE frames for node start / end (with timings and state deltas).
+
+    The run is bounded by the request's ``deadline_ms``; running out of time
+    ends the stream with an ``error`` event. The graph runs in its own task,
+    so a client that goes away (polled as in ``_run_request``, or the
+    response closing this generator) cancels the node that is running
+    instead of letting it finish before the next write fails.
+    """
+    events: asyncio.Queue[tuple[str, Any] | None] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for event in graph.astream(  # type: ignore[call-overload]
+                inputs, stream_mode=["tasks", "values", "custom"]
+            ):
+                events.put_nowait(event)
+        finally:
+            events.put_nowait(None)
+
+    with deadlines.deadline(_seconds(req.deadline_ms)):
+        task = asyncio.ensure_future(pump())
+    started: dict[str, float] = {}
+    final: dict[str, Any] = {}
+    run_start = time.perf_counter()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), _DISCONNECT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    HTTP_CANCELLED.inc(endpoint=_endpoint(request), reason="disconnect")
+                    return
+                continue
+            if event is None:
+                break
+            mode, chunk = event
+            if mode == "values":
+                final = chunk
+                continue
+            if mode == "custom":
+                # Events written by the nodes themselves (e.g. Agent 2 questions)
+                yield _sse(chunk["event"], chunk["data"])
+                continue
+            name = chunk["name"]
+            if "input" in chunk:
+                started[chunk["id"]] = time.perf_counter()
+                yield _sse("node_start", {"node": name})
+                continue
+            elapsed = time.perf_counter() - started.pop(chunk["id"], run_start)
+            delta = dict(chunk["result"] or {})
+            if "test_blueprint" in delta:
+                delta["test_blueprint"] = redact_answers(delta["test_blueprint"])
+            yield _sse(
+                "node_end",
+                {
+                    "node": name,
+                    "elapsed_ms": round(elapsed * 1000, 1),
+                    "error": str(chunk["error"]) if chunk["error"] else None,
+                    "delta": delta,
+                },
+            )
+        await task
+    except Exception as exc:
+        yield _sse("error", {"detail": str(exc)})
+        return
+    finally:
+        task.cancel()
+
+    response = _build_response(req, final)
+    yield _sse(
+        "result",
+        {
+            **response.model_dump(),
+            "elapsed_ms": round((time.perf_counter() - run_start) * 1000, 1),
+        },
+    )
+
+
+# Identical /api/evaluate requests that overlap share one graph run.
+_evaluate_flights: SingleFlight[dict[str, Any]] = SingleFlight("evaluate")
+
+
+def _request_key(req: EvaluateRequest) -> str:
+    """Canonical hash of an evaluate request (profile key order is ignored)."""
+    profile = load_profile(req.employee_json)
+    return cache_key(
+        "evaluate",
+        req.employee_json if profile is None else profile,
+        req.mode,
+        req.test_scores,
+        req.session_id,
+        req.previous_output,
+    )
+
+
+async def _run_request(
+    request: Request, deadline_ms: int | None, work: Callable[[], Awaitable[T]]
+) -> T:
+    """Run an endpoint's ``work`` under its deadline, cancelled on disconnect.
+
+    The work runs as a task started inside the deadline scope, so every node
+    and LLM call inherits the deadline. If the client goes away first the
+    task is cancelled, which aborts the pending LLM / search calls. Errors are
+    mapped to HTTP: 504 on deadline or model timeout, 500 otherwise.
+    """
+    with deadlines.deadline(_seconds(deadline_ms)):
+        task = asyncio.ensure_future(work())
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=_DISCONNECT_POLL_SECONDS)
+            if not task.done() and await request.is_disconnected():
+                HTTP_CANCELLED.inc(endpoint=_endpoint(request), reason="disconnect")
+                # 499: nginx's "client closed request"; nobody reads it.
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        task.cancel()
+    try:
+        return task.result()
+    except HTTPException:
+        raise
+    except DeadlineExceeded as exc:
+        HTTP_CANCELLED.inc(endpoint=_endpoint(request), reason="deadline")
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except (TimeoutError, asyncio.TimeoutError) as exc:
+        raise HTTPException(
+            status_code=504, detail="Timed out waiting for the model"
+        ) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+async def _run_evaluation(req: EvaluateRequest) -> EvaluateResponse:
+    inputs = _graph_input(req)
+    result = await _evaluate_flights.do(
+        _request_key(req),
+        lambda: graph.ainvoke(inputs),  # type: ignore[call-overload]
+    )
+    return _build_response(req, result)
+
+
+async def _run_job(request: dict[str, Any]) -> dict[str, Any]:
+    """Job queue handler: run one enqueued evaluate request.
+
+    A ``deadline_ms`` counts from the start of the run, not from enqueueing.
+    """
+    req = EvaluateRequest(**request)
+    with deadlines.deadline(_seconds(req.deadline_ms)):
+        response = await _run_evaluation(req)
+    return response.model_dump()
+
+
+def _job_workers(app: FastAPI) -> JobWorkers | None:
+    """Return the app's job worker pool, starting it on first use."""
+    store = get_job_store()
+    if store is None:
+        return None
+    workers: JobWorkers | None = getattr(app.state, "job_workers", None)
+    if workers is None or workers.store is not store:
+        workers = app.state.job_workers = JobWorkers(store, _run_job, default_workers())
+    workers.start()
+    return workers
+
+
+def _job_status(job: Job) -> JobStatus:
+    return JobStatus(
+        job_id=job.job_id,
+        status=job.status,
+        position=job.position,
+        result=EvaluateResponse(**job.result) if job.result is not None else None,
+        error=job.error,
+    )
+
+
+@app.post("/api/evaluate", response_model=EvaluateResponse)
+async def evaluate(
+    req: EvaluateRequest, request: Request
+) -> EvaluateResponse | JSONResponse:
+    """Run the SkillBridge multi-agent graph and return structured results.
+
+    A request identical to one still running awaits that run's result instead
+    of starting another (counted in ``skillbridge_coalesced_calls_total``).
+
+    With ``enqueue`` the request is validated, stored in the job queue
+    (agent.jobs) and answered at once with ``202`` and a job to poll at
+    ``/api/jobs/{job_id}``; ``429`` when the queue is full.
+    """
+    if req.enqueue:
+        workers = _job_workers(request.app)
+        if workers is None:
+            raise HTTPException(status_code=400, detail="Job queue is disabled")
+        _graph_input(req)  # fail fast on an unknown / foreign session
+        try:
+            job_id = await asyncio.to_thread(
+                workers.store.enqueue, req.model_dump(exclude={"enqueue"})
+            )
+        except QueueFull as exc:
+            raise HTTPException(
+                status_code=429,
+                detail="Job queue is full, retry later",
+                headers={"Retry-After": "5"},
+            ) from exc
+        workers.notify()
+        status = JobStatus(job_id=job_id, status=QUEUED)
+        return JSONResponse(
+            status.model_dump(),
+            status_code=202,
+            headers={"Location": f"/api/jobs/{job_id}"},
+        )
+    return await _run_request(request, req.deadline_ms, lambda: _run_evaluation(req))
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str) -> JobStatus:
+    """Return the status of an enqueued evaluation and, once done, its result."""
+    store = get_job_store()
+    job = await asyncio.to_thread(store.get, job_id) if store is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return _job_status(job)
+
+
+@app.post("/api/grade", response_model=GradeResponse)
+async def grade_answers(req: GradeRequest, request: Request) -> GradeResponse:
+    """Grade the selected options against the session's answer key, then evaluate.
+
+    Each MCQ is worth 20 points if correct and 0 otherwise; the resulting
+    scores go straight into the ``evaluate`` path of the resumed session.
+    A session is graded once: later attempts get ``409``, so the returned
+    scores cannot be used to probe the answer key.
+    """
+    if get_session_store() is None:
+        raise HTTPException(status_code=400, detail="Grading requires sessions")
+    profile = load_profile(req.employee_json)
+    if profile is None:
+        raise HTTPException(status_code=422, detail="employee_json is not an object")
+    eval_req = EvaluateRequest(
+        employee_json=req.employee_json, mode="evaluate", session_id=req.session_id
+    )
+    inputs = _graph_input(eval_req)
+    if not inputs.get("test_blueprint"):
+        raise HTTPException(status_code=409, detail="Session has no generated test")
+    store = get_session_store()
+    assert store is not None
+    if not await asyncio.to_thread(store.claim_grading, req.session_id):
+        raise HTTPException(status_code=409, detail="Session was already graded")
+    scores = grade(
+        answer_key(inputs["test_blueprint"]),
+        req.answers,
+        [competence_id(c) for c in profile.get("competences", [])],
+    )
+    eval_req.test_scores = inputs["test_scores"] = scores
+    try:
+        result = await _run_request(
+            request,
+            req.deadline_ms,
+            lambda: graph.ainvoke(inputs),  # type: ignore[call-overload]
+        )
+    except BaseException:
+        # No scores left the server: the employee may submit again.
+        store.release_grading(req.session_id)
+        raise
+
+    return GradeResponse(
+        **_build_response(eval_req, result).model_dump(), test_scores=scores
+    )
+
+
+@app.post("/api/evaluate/stream")
+async def evaluate_stream(req: EvaluateRequest, request: Request) -> StreamingResponse:
+    """Run the graph and stream progress as Server-Sent Events.
+
+    Events: ``node_start`` / ``node_end`` per agent (with ``elapsed_ms`` and the
+    node's state ``delta``), ``question`` for each MCQ as soon as Agent 2 has
+    written it (without its answer), then a final ``result`` carrying the same
+    fields as ``/api/evaluate`` — or ``error`` if the run fails.
+    """
+    return StreamingResponse(
+        _stream_graph(request, req, _graph_input(req)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+@app.post("/api/evaluate/batch")
+async def evaluate_batch(
+    req: BatchEvaluateRequest, request: Request
+) -> StreamingResponse:
+    """Run many evaluations under the server-wide concurrency cap.
+
+    Streams one NDJSON line per item as it completes:
+    ``{"index", "employee_id", "ok", "response", "error"}``. An item whose
+    session is unknown or foreign, or that runs out of its ``deadline_ms``
+    (counted from when it starts), is reported failed on its own line.
+    """
+    runner: BatchRunner | None = getattr(request.app.state, "batch_runner", None)
+    if runner is None:
+        runner = request.app.state.batch_runner = BatchRunner()
+
+    # Items whose session cannot be resumed fail alone, not the whole batch.
+    positions: list[int] = []
+    inputs: list[dict[str, Any]] = []
+    rejected: list[dict[str, Any]] = []
+    for index, item in enumerate(req.items):
+        try:
+            inputs.append(_graph_input(item))
+        except HTTPException as exc:
+            rejected.append(
+                {
+                    "index": index,
+                    "employee_id": _employee_id(item.employee_json),
+                    "ok": False,
+                    "response": None,
+                    "error": exc.detail,
+                }
+            )
+        else:
+            positions.append(index)
+    timeouts = [_seconds(req.items[i].deadline_ms) for i in positions]
+
+    async def _lines() -> AsyncIterator[str]:
+        for line in rejected:
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        async for item in runner.run(inputs, timeouts):
+            index = positions[item.index]
+            response = (
+                _build_response(req.items[index], item.result).model_dump()
+                if item.result is not None
+                else None
+            )
+            line = {
+                "index": index,
+                "employee_id": item.employee_id,
+                "ok": item.ok,
+                "response": response,
+                "error": item.error,
+            }
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose per-agent timing, token, payload and error metrics (Prometheus format)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
-async def health() -> dict:
+async def health() -> dict[str, Any]:
     """Simple health-check used by the frontend to verify the server is up."""
     return {"status": "ok", "service": "SkillBridge"}
 
 
+@app.get("/api/cache/stats")
+async def cache_stats() -> dict[str, Any]:
+    """Return LLM response cache hit / miss / eviction counters."""
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
 @app.post("/api/recommend", response_model=RecommendResponse)
-async def recommend(req: RecommendRequest) -> RecommendResponse:
+async def recommend(req: RecommendRequest, request: Request) -> RecommendResponse:
     """Run Agent 6 — search for real training courses matching the employee's skill gaps."""
-    try:
-        formations = await recommend_formations(req.final_output_json)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    formations = await _run_request(
+        request, req.deadline_ms, lambda: recommend_formations(req.final_output_json)
+    )
     return RecommendResponse(formations=formations)
 
 
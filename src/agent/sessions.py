@@ -0,0 +1,168 @@
+"""SkillBridge – evaluation sessions.
+
+The frontend flow is ``generate_tests`` → the employee answers → ``evaluate``.
+Every ``/api/evaluate`` response carries a ``session_id`` under which the
+Agent 1 ``analysis`` and the Agent 2 ``test_blueprint`` of that run are
+stored. A later call passing the same ``session_id`` resumes from them: the
+graph skips Agent 1 when ``analysis`` is already in the input state, and
+Agent 3 scores against the questions the employee actually saw.
+
+Sessions are bound to the employee they were created for and expire after a
+TTL. Storage is a small SQLite table next to the LLM cache.
+
+A session's generated test is graded once: ``/api/grade`` claims the session
+(``claim_grading``) before scoring, so its per-competence scores cannot be
+used to probe the answer key by grading the same questions again.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_SESSIONS     : "0" disables sessions (default "1").
+SKILLBRIDGE_SESSION_PATH : SQLite file (default .skillbridge_cache/sessions.sqlite).
+SKILLBRIDGE_SESSION_TTL  : Session lifetime in seconds (default 86400).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from agent.cache import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id     TEXT PRIMARY KEY,
+    employee_id    TEXT NOT NULL,
+    analysis       TEXT NOT NULL,
+    test_blueprint TEXT NOT NULL,
+    updated_at     REAL NOT NULL,
+    graded_at      REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+@dataclass(frozen=True)
+class Session:
+    """Stored intermediate results of one employee's evaluation flow."""
+
+    session_id: str
+    employee_id: str
+    analysis: str
+    test_blueprint: str
+    # The generated test was graded (agent.server /api/grade)
+    graded: bool = False
+
+
+class SessionStore:
+    """SQLite-backed session store with TTL expiry."""
+
+    def __init__(self, path: str | Path, ttl_seconds: float) -> None:
+        """Open (or create) the store at ``path``."""
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "graded_at" not in columns:
+            # Stores created before one-shot grading.
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN graded_at REAL")
+            self._conn.commit()
+
+    def get(self, session_id: str) -> Session | None:
+        """Return the session, or None if it is unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT employee_id, analysis, test_blueprint, updated_at, graded_at"
+                " FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        employee_id, analysis, test_blueprint, updated_at, graded_at = row
+        if time.time() - updated_at >= self.ttl_seconds:
+            return None
+        return Session(
+            session_id, employee_id, analysis, test_blueprint, graded_at is not None
+        )
+
+    def claim_grading(self, session_id: str) -> bool:
+        """Mark the session's test as graded; False if it already was."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE sessions SET graded_at = ?"
+                " WHERE session_id = ? AND graded_at IS NULL",
+                (time.time(), session_id),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def release_grading(self, session_id: str) -> None:
+        """Allow grading again after a grading run that produced no result."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sessions SET graded_at = NULL WHERE session_id = ?",
+                (session_id,),
+            )
+            self._conn.commit()
+
+    def save(
+        self,
+        employee_id: str,
+        analysis: str,
+        test_blueprint: str,
+        session_id: str | None = None,
+    ) -> str:
+        """Create or update a session and return its id.
+
+        Empty ``analysis`` / ``test_blueprint`` values do not overwrite the
+        stored ones, so an ``evaluate`` run keeps the blueprint it resumed.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions"
+                " (session_id, employee_id, analysis, test_blueprint, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (session_id) DO UPDATE SET"
+                " analysis = COALESCE(NULLIF(excluded.analysis, ''), analysis),"
+                " test_blueprint ="
+                " COALESCE(NULLIF(excluded.test_blueprint, ''), test_blueprint),"
+                " updated_at = excluded.updated_at",
+                (session_id, employee_id, analysis, test_blueprint, now),
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            self._conn.commit()
+        return session_id
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_store: SessionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore | None:
+    """Return the process-wide session store, or None when disabled."""
+    global _store
+    if os.getenv("SKILLBRIDGE_SESSIONS", "1") == "0":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(
+                os.getenv(
+                    "SKILLBRIDGE_SESSION_PATH", ".skillbridge_cache/sessions.sqlite"
+                ),
+                ttl_seconds=float(os.getenv("SKILLBRIDGE_SESSION_TTL", "86400")),
+            )
+        return _store
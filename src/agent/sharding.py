@@ -0,0 +1,64 @@
+"""SkillBridge – token-bounded sharding of competence lists.
+
+Agents 3 and 4 used to send every competence that needed the LLM in one
+call. Senior profiles (60+ competences with long experience texts) pushed
+those prompts — and the JSON arrays the model writes back — past
+comfortable sizes, and a truncated reply meant re-running the evaluation.
+The competences are now packed, in profile order, into shards whose
+estimated size stays under a token budget; each shard is its own LLM call
+carrying only the profile context its competences need, and the shards run
+concurrently (see agent.concurrency.gather_limited).
+
+Token counts are estimated from the compact JSON the agents send (about four
+characters per token), which is enough to bound a shard without a tokenizer.
+
+Configuration (environment variables)
+-------------------------------------
+SKILLBRIDGE_SHARD_TOKENS      : Estimated competence tokens per shard (default 2000).
+SKILLBRIDGE_SHARD_CONCURRENCY : Max concurrent shard calls per node (default 8).
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Sequence
+from typing import List, TypeVar
+
+T = TypeVar("T")
+
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a rough token count for ``text``."""
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
+
+def token_budget() -> int:
+    """Return the configured per-shard token budget."""
+    return int(os.getenv("SKILLBRIDGE_SHARD_TOKENS", "2000"))
+
+
+def concurrency() -> int:
+    """Return the configured number of concurrent shard calls."""
+    return int(os.getenv("SKILLBRIDGE_SHARD_CONCURRENCY", "8"))
+
+
+def shard(items: Sequence[T], size: Callable[[T], int], budget: int) -> List[List[T]]:
+    """Pack ``items``, in order, into shards of at most ``budget`` total size.
+
+    An item larger than the budget on its own gets a shard to itself.
+    """
+    shards: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item in items:
+        cost = size(item)
+        if current and used + cost > budget:
+            shards.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        shards.append(current)
+    return shards
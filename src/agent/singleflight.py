@@ -0,0 +1,75 @@
+"""SkillBridge – single-flight deduplication of concurrent identical calls.
+
+While a call for a given key is running, later callers with the same key
+await that call's result instead of starting their own. Once it finishes
+(successfully or not) the key is released, so the next caller starts afresh;
+results are not retained — pair this with a cache for that.
+
+The shared call runs as its own task: a caller that is cancelled stops
+waiting without cancelling the call for the others, and the call itself is
+cancelled only when its last waiter leaves (e.g. every client disconnected).
+
+Request deadlines (agent.deadlines) belong to callers, not to the call: the
+task is started without the first caller's deadline, and each caller waits
+only until its own deadline, so callers with different budgets can share a
+call without one cutting the others short.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Dict, Generic, TypeVar
+
+from agent import deadlines
+from agent.metrics import COALESCED_CALLS
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(self, name: str) -> None:
+        """Create a group; ``name`` labels its coalesced-call metric."""
+        self.name = name
+        self._inflight: Dict[str, _Flight[T]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of keys currently in flight."""
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await fn()``, sharing one execution per in-flight ``key``."""
+        flight = self._inflight.get(key)
+        if flight is None:
+            with deadlines.unbounded():
+                flight = _Flight(asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+        else:
+            COALESCED_CALLS.inc(group=self.name)
+        flight.waiters += 1
+        try:
+            return await deadlines.wait_until(
+                asyncio.shield(flight.task), f"{self.name} call"
+            )
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # The last waiter was cancelled or ran out of time.
+                flight.task.cancel()
+
+    def _release(self, key: str, flight: _Flight[T]) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            flight.task.exception()
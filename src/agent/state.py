@@ -21,6 +21,9 @@ class State:
     evaluation_results : Agent 3 JSON array of competences with _metadata_evaluation.
     validated_results  : Agent 4 validated JSON array.
     final_output       : Agent 5 final full JSON string (the answer).
+    previous_output    : final_output of an earlier run of the same profile; in
+                         evaluate mode only the competences whose inputs changed
+                         since are re-scored (see agent.incremental).
     """
 
     employee_json: str = ""
@@ -31,3 +34,4 @@ class State:
     evaluation_results: str = ""
     validated_results: str = ""
     final_output: str = ""
+    previous_output: str = ""
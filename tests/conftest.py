@@ -4,3 +4,33 @@ import pytest
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def local_stores(monkeypatch, tmp_path):
+    """Keep tests away from the on-disk bank, sessions, jobs and caches."""
+    from agent import cache, jobs, sessions
+
+    monkeypatch.setenv("SKILLBRIDGE_QUESTION_BANK", "0")
+    monkeypatch.setenv("SKILLBRIDGE_SESSION_PATH", str(tmp_path / "sessions.sqlite"))
+    monkeypatch.setenv(
+        "SKILLBRIDGE_FORMATION_CACHE_PATH", str(tmp_path / "formations.sqlite")
+    )
+    monkeypatch.setenv("SKILLBRIDGE_JOB_PATH", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SKILLBRIDGE_LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(sessions, "_store", None)
+    monkeypatch.setattr(jobs, "_store", None)
+    monkeypatch.setattr(cache, "_formation_cache", None)
+    monkeypatch.setattr(cache, "_llm_cache", None)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """Route every LLM call to the deterministic fake backend (no network)."""
+    from agent import clients
+
+    monkeypatch.setenv("SKILLBRIDGE_LLM_BACKEND", "fake")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_CACHE", "0")
+    monkeypatch.setattr(clients, "_registry", None)
+    yield clients.get_registry()
+    monkeypatch.setattr(clients, "_registry", None)
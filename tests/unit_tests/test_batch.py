@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+from agent import batch, batch_cli
+
+
+class _FakeGraph:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+    async def ainvoke(self, item: dict) -> dict:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if item["employee_json"] == "boom":
+                raise RuntimeError("boom")
+            return {"final_output": item["employee_json"]}
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.anyio
+async def test_run_batch_caps_concurrency_and_reports_errors(monkeypatch) -> None:
+    fake = _FakeGraph()
+    monkeypatch.setattr(batch, "graph", fake)
+    items = [
+        {"employee_json": json.dumps({"employee_id": f"E{i}"})} for i in range(7)
+    ] + [{"employee_json": "boom"}]
+
+    results = [r async for r in batch.run_batch(iter(items), concurrency=3)]
+
+    assert fake.peak == 3
+    assert sorted(r.index for r in results) == list(range(8))
+    failed = [r for r in results if not r.ok]
+    assert [(r.index, r.error) for r in failed] == [(7, "boom")]
+    assert {r.employee_id for r in results if r.ok} == {f"E{i}" for i in range(7)}
+
+
+@pytest.mark.anyio
+async def test_batch_cli_resumes_from_checkpoint(monkeypatch, tmp_path) -> None:
+    fake = _FakeGraph()
+    monkeypatch.setattr(batch, "graph", fake)
+    src = tmp_path / "in.jsonl"
+    out = tmp_path / "out.jsonl"
+    src.write_text(
+        "\n".join(json.dumps({"employee_id": f"E{i}"}) for i in range(3)) + "\n",
+        encoding="utf-8",
+    )
+
+    first = await batch_cli.run_file(src, out, workers=2)
+    assert first == {"ok": 3, "failed": 0, "skipped": 0}
+
+    second = await batch_cli.run_file(src, out, workers=2)
+    assert second == {"ok": 0, "failed": 0, "skipped": 3}
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["employee_id"] for r in lines) == ["E0", "E1", "E2"]
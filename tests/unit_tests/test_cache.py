@@ -0,0 +1,44 @@
+import sqlite3
+
+from agent.cache import ResponseCache, cache_key
+
+
+def test_cache_key_is_content_addressed() -> None:
+    assert cache_key("m", 0.2, "sys", "hi") == cache_key("m", 0.2, "sys", "hi")
+    assert cache_key("m", 0.2, "sys", "hi") != cache_key("m", 0.3, "sys", "hi")
+
+
+def test_hit_miss_and_lru_eviction(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "c.sqlite", ttl_seconds=60, max_entries=2)
+    assert cache.get("a") is None
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "a" is now the most recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 1, "entries": 2}
+    cache.close()
+
+
+def test_expired_entries_are_dropped(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "c.sqlite", ttl_seconds=0, max_entries=10)
+    cache.set("a", "1")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_hits_are_written_back_in_batches(tmp_path) -> None:
+    path = tmp_path / "c.sqlite"
+    cache = ResponseCache(path, ttl_seconds=60, max_entries=10)
+    cache.set("a", "1")
+    reader = sqlite3.connect(path)
+    query = "SELECT accessed_at FROM entries WHERE key = 'a'"
+    (stored,) = reader.execute(query).fetchone()
+
+    assert cache.get("a") == "1"
+    assert reader.execute(query).fetchone() == (stored,)  # no write per hit
+    cache.close()
+    assert reader.execute(query).fetchone()[0] > stored
+    assert reader.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    reader.close()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from agent.concurrency import gather_limited
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_results_keep_input_order_under_the_limit() -> None:
+    running = peak = 0
+
+    async def work(n: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (3 - n))
+        running -= 1
+        return n
+
+    assert await gather_limited((work(n) for n in range(3)), 2) == [0, 1, 2]
+    assert peak == 2
+
+
+async def test_first_failure_cancels_the_rest() -> None:
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def work(n: int) -> int:
+        started.append(n)
+        if n == 0:
+            raise ValueError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return n
+
+    with pytest.raises(ValueError):
+        await gather_limited((work(n) for n in range(4)), 2)
+    # Started siblings were cancelled; the last one never started.
+    assert sorted(cancelled) == sorted(started)[1:]
+    assert 3 not in started
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent import graph, server
+from agent.blueprint import parse_blueprint
+from agent.nodes import recommend_formations
+
+pytestmark = pytest.mark.anyio
+
+_PROFILE = {
+    "employee_id": "EMP_FAKE",
+    "poste": "Dev",
+    "evaluation_date": "2025-11-26",
+    "competences": [
+        {
+            "competence_id": f"C{i}",
+            "titre": f"T{i}",
+            "niveau_estime": 2,
+            "niveau_attendu_12m": 4,
+            "niveau_attendu_24m": 5,
+        }
+        for i in range(3)
+    ],
+}
+
+
+async def test_simulate_mode_offline(fake_backend) -> None:
+    res = await graph.ainvoke({"employee_json": json.dumps(_PROFILE)})
+    data = json.loads(res["final_output"])
+    assert data["employee_id"] == "EMP_FAKE"
+    for comp in data["competences"]:
+        assert set(comp["_metadata_evaluation"]) == {
+            "score_test",
+            "date_test",
+            "niveau_avant_test",
+        }
+
+
+async def test_generate_tests_mode_offline(fake_backend) -> None:
+    res = await graph.ainvoke(
+        {"employee_json": json.dumps(_PROFILE), "mode": "generate_tests"}
+    )
+    questions = parse_blueprint(res["test_blueprint"])
+    assert set(questions) == {"C0", "C1", "C2"}
+    assert all(len(q["options"]) == 4 for q in questions.values())
+
+
+async def test_recommend_formations_offline(fake_backend) -> None:
+    res = await graph.ainvoke(
+        {
+            "employee_json": json.dumps(_PROFILE),
+            "mode": "evaluate",
+            "test_scores": {"C0": 0, "C1": 20, "C2": 0},
+        }
+    )
+    formations = await recommend_formations(res["final_output"])
+    assert {f["competences_cibles"][0] for f in formations} == {"C0", "C2"}
+
+
+def test_server_evaluate_offline(fake_backend) -> None:
+    with TestClient(server.app) as client:
+        res = client.post(
+            "/api/evaluate",
+            json={"employee_json": json.dumps(_PROFILE), "mode": "generate_tests"},
+        )
+    assert res.status_code == 200
+    enriched = json.loads(res.json()["enriched_employee_json"])
+    assert all(c["question"] for c in enriched["competences"])
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent import server
+from agent.nodes import agent6_formation_recommender as agent6
+
+pytestmark = pytest.mark.anyio
+
+
+def _output(name: str, poste: str, gaps: dict[str, int]) -> str:
+    return json.dumps(
+        {
+            "employee_name": name,
+            "poste": poste,
+            "competences": [
+                {
+                    "competence_id": cid,
+                    "titre": cid,
+                    "niveau_estime": 1,
+                    "niveau_attendu_12m": 1 + gap,
+                }
+                for cid, gap in gaps.items()
+            ],
+        }
+    )
+
+
+def test_signature_ignores_name_order_and_role_spelling() -> None:
+    a = agent6._gap_signature(_output("Ann", "Dev C++", {"C1": 2, "C2": 1}))
+    b = agent6._gap_signature(_output("Bob", " dev  c++", {"C2": 1, "C1": 2}))
+    c = agent6._gap_signature(_output("Ann", "Dev C++", {"C1": 2, "C2": 2}))
+    assert agent6._signature_key(*a) == agent6._signature_key(*b)
+    assert agent6._signature_key(*a) != agent6._signature_key(*c)
+    assert "Ann" not in agent6._build_prompt(*a)
+    assert agent6._gap_signature("not json") is None
+
+
+async def test_identical_gaps_cost_one_search(fake_backend, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_FAKE_LATENCY_MS", "20")
+    models = fake_backend.genai().models
+    team = [_output(f"E{i}", "Dev", {"C1": 2, "C2": 1}) for i in range(5)]
+
+    results = await asyncio.gather(*(agent6.recommend_formations(t) for t in team))
+    assert models.calls == 1
+    assert all(r == results[0] and r is not results[0] for r in results[1:])
+
+    # Later requests are served from the cache; a new signature searches again.
+    assert await agent6.recommend_formations(team[0]) == results[0]
+    assert models.calls == 1
+    await agent6.recommend_formations(_output("X", "Dev", {"C3": 1}))
+    assert models.calls == 2
+
+
+async def test_searches_are_capped_and_time_out(fake_backend, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_RECOMMEND_CONCURRENCY", "2")
+    monkeypatch.setattr(agent6, "_limiters", agent6.weakref.WeakKeyDictionary())
+    running = peak = 0
+    generate = fake_backend.genai().aio.models.generate_content
+
+    async def tracked(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return await generate(**kwargs)
+
+    monkeypatch.setattr(fake_backend.genai().aio.models, "generate_content", tracked)
+    outputs = [_output("E", "Dev", {f"C{i}": 1}) for i in range(5)]
+    await asyncio.gather(*(agent6.recommend_formations(o) for o in outputs))
+    assert peak == 2
+
+    monkeypatch.setenv("SKILLBRIDGE_RECOMMEND_TIMEOUT", "0.001")
+    with pytest.raises(asyncio.TimeoutError):
+        await agent6.recommend_formations(_output("E", "Dev", {"C9": 1}))
+
+
+def test_recommend_endpoint_reports_timeout(fake_backend, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_FAKE_LATENCY_MS", "50")
+    monkeypatch.setenv("SKILLBRIDGE_RECOMMEND_TIMEOUT", "0.001")
+    res = TestClient(server.app).post(
+        "/api/recommend", json={"final_output_json": _output("E", "Dev", {"C1": 1})}
+    )
+    assert res.status_code == 504
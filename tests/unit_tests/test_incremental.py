@@ -0,0 +1,127 @@
+import copy
+import json
+
+import pytest
+
+from agent import graph
+from agent.incremental import is_unchanged, plan
+from agent.state import State
+
+pytestmark = pytest.mark.anyio
+
+_PROFILE = {
+    "employee_id": "EMP_INC",
+    "poste": "Dev",
+    "evaluation_date": "2025-11-26",
+    "competences": [
+        {
+            "competence_id": f"C{i}",
+            "titre": f"T{i}",
+            "niveau_estime": 2,
+            "niveau_attendu_12m": 4,
+            "niveau_attendu_24m": 5,
+        }
+        for i in range(4)
+    ],
+}
+_SCORES = {"C0": 10, "C1": 12, "C2": 16, "C3": 6}
+
+_PREVIOUS = {
+    "competence_id": "C0",
+    "titre": "T0",
+    "niveau_estime": 3,
+    "_metadata_evaluation": {
+        "score_test": 10,
+        "date_test": "2025-11-26",
+        "niveau_avant_test": 2,
+    },
+}
+
+
+def test_is_unchanged() -> None:
+    comp = {"competence_id": "C0", "titre": "T0", "niveau_estime": 2}
+    assert is_unchanged(comp, _PREVIOUS, {})
+    assert is_unchanged(comp, _PREVIOUS, {"C0": 10})
+    # Resubmitting the previous evaluated record is not a change either.
+    assert is_unchanged(dict(_PREVIOUS), _PREVIOUS, {"C0": 10})
+
+    assert not is_unchanged(comp, None, {})
+    assert not is_unchanged(comp, _PREVIOUS, {"C0": 14})
+    assert not is_unchanged({**comp, "niveau_estime": 1}, _PREVIOUS, {})
+    assert not is_unchanged({**comp, "titre": "Edited"}, _PREVIOUS, {})
+    assert not is_unchanged(comp, {**_PREVIOUS, "_metadata_evaluation": None}, {})
+
+
+def test_plan_only_applies_to_evaluate_with_a_valid_previous_output() -> None:
+    employee_json = json.dumps(_PROFILE)
+    assert plan(State(employee_json=employee_json, mode="evaluate")) is None
+    assert (
+        plan(
+            State(
+                employee_json=employee_json,
+                mode="simulate",
+                previous_output=employee_json,
+            )
+        )
+        is None
+    )
+    assert (
+        plan(
+            State(employee_json=employee_json, mode="evaluate", previous_output="oops")
+        )
+        is None
+    )
+
+
+async def _evaluate(fake_backend, scores, previous_output="", profile=_PROFILE):
+    res = await graph.ainvoke(
+        {
+            "employee_json": json.dumps(profile),
+            "mode": "evaluate",
+            "test_scores": scores,
+            "previous_output": previous_output,
+        }
+    )
+    return res, json.loads(res["final_output"])
+
+
+async def test_retake_rescores_only_changed_competences(fake_backend) -> None:
+    first, before = await _evaluate(fake_backend, _SCORES)
+
+    retake = {**_SCORES, "C1": 20}
+    res, after = await _evaluate(fake_backend, retake, first["final_output"])
+
+    assert [c["competence_id"] for c in json.loads(res["evaluation_results"])] == ["C1"]
+    assert after["competences"][1]["_metadata_evaluation"]["score_test"] == 20
+    assert after["competences"][1]["niveau_estime"] == 4
+    for idx in (0, 2, 3):
+        assert after["competences"][idx] == before["competences"][idx]
+
+    # Only the changed competence reaches Agent 1.
+    assert "C1" in res["analysis"] and "C0" not in res["analysis"]
+
+
+async def test_retake_with_nothing_changed_makes_no_llm_call(fake_backend) -> None:
+    first, before = await _evaluate(fake_backend, _SCORES)
+    chat = fake_backend.chat()
+    calls = chat.calls
+
+    res, after = await _evaluate(fake_backend, _SCORES, first["final_output"])
+
+    assert chat.calls == calls
+    assert after == before
+    assert not res.get("evaluation_results")
+
+
+async def test_edited_competence_is_rescored(fake_backend) -> None:
+    first, before = await _evaluate(fake_backend, _SCORES)
+    edited = copy.deepcopy(_PROFILE)
+    edited["competences"][2]["niveau_estime"] = 4
+
+    res, after = await _evaluate(
+        fake_backend, _SCORES, first["final_output"], profile=edited
+    )
+
+    assert [c["competence_id"] for c in json.loads(res["evaluation_results"])] == ["C2"]
+    assert after["competences"][2]["_metadata_evaluation"]["niveau_avant_test"] == 4
+    assert after["competences"][0] == before["competences"][0]
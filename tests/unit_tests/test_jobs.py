@@ -0,0 +1,80 @@
+import time
+from dataclasses import dataclass
+
+import pytest
+from fastapi.testclient import TestClient
+from langgraph.graph import StateGraph
+
+from agent import server
+from agent.jobs import DONE, FAILED, QUEUED, RUNNING, JobStore, QueueFull
+
+
+@dataclass
+class _State:
+    employee_json: str = ""
+    mode: str = "simulate"
+    test_scores: dict | None = None
+    final_output: str = ""
+
+
+async def _finish(state: _State) -> dict:
+    return {"final_output": state.employee_json}
+
+
+_GRAPH = (
+    StateGraph(_State)
+    .add_node("json_output_controller", _finish)
+    .add_edge("__start__", "json_output_controller")
+    .compile()
+)
+
+
+def test_store_is_fifo_bounded_and_recovers_running_jobs(tmp_path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite", max_depth=2, ttl_seconds=60)
+    first = store.enqueue({"n": 1})
+    second = store.enqueue({"n": 2})
+    with pytest.raises(QueueFull):
+        store.enqueue({"n": 3})
+    assert store.get(second).position == 1
+
+    job = store.claim()
+    assert (job.job_id, job.request) == (first, {"n": 1})
+    assert store.get(second).position == 0
+    store.complete(first, {"ok": True})
+    assert store.get(first).result == {"ok": True}
+
+    assert store.claim().job_id == second
+    assert store.requeue_running() == 1  # e.g. after a restart
+    assert store.claim().job_id == second
+    store.fail(second, "boom")
+    assert store.get(second).error == "boom"
+    assert store.claim() is None
+    assert store.stats() == {QUEUED: 0, RUNNING: 0, DONE: 1, FAILED: 1}
+    store.close()
+
+
+def test_enqueued_evaluation_is_polled_to_completion(monkeypatch) -> None:
+    monkeypatch.setattr(server, "graph", _GRAPH)
+    with TestClient(server.app) as client:
+        res = client.post(
+            "/api/evaluate", json={"employee_json": "{}", "enqueue": True}
+        )
+        assert res.status_code == 202
+        job_id = res.json()["job_id"]
+        assert res.headers["location"] == f"/api/jobs/{job_id}"
+        for _ in range(100):
+            status = client.get(f"/api/jobs/{job_id}").json()
+            if status["status"] == DONE:
+                break
+            time.sleep(0.01)
+        assert status["result"]["final_output"] == "{}"
+        assert client.get("/api/jobs/unknown").status_code == 404
+        assert 'skillbridge_jobs{status="done"} 1' in client.get("/metrics").text
+
+
+def test_full_queue_is_refused_with_429(monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_JOB_MAX_DEPTH", "0")
+    client = TestClient(server.app)
+    res = client.post("/api/evaluate", json={"employee_json": "{}", "enqueue": True})
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "5"
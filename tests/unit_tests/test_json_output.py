@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from agent.nodes import agent5_json_output_controller as agent5
+from agent.nodes.agent5_json_output_controller import (
+    check_structure,
+    json_output_controller,
+    merge_validated,
+)
+from agent.state import State
+
+_PROFILE = {
+    "employee_id": "EMP_1",
+    "poste": "Dev",
+    "competences": [
+        {"competence_id": "C1", "titre": "C++", "niveau_estime": 2},
+        {"competence_id": "C2", "titre": "SQL", "niveau_estime": 3},
+    ],
+    "projets_recents": ["A"],
+}
+_META = {"score_test": 15, "date_test": "2025-11-26", "niveau_avant_test": 2}
+
+
+def test_merge_only_touches_mutable_fields() -> None:
+    """Only niveau_estime and _metadata_evaluation may change."""
+    validated = [
+        {
+            "competence_id": "C1",
+            "titre": "renamed",
+            "niveau_estime": 4,
+            "_metadata_evaluation": _META,
+        },
+    ]
+    merged = merge_validated(_PROFILE, validated)
+    check_structure(_PROFILE, merged)
+    assert list(merged) == list(_PROFILE)
+    assert merged["competences"][0] == {
+        "competence_id": "C1",
+        "titre": "C++",
+        "niveau_estime": 4,
+        "_metadata_evaluation": _META,
+    }
+    assert merged["competences"][1] == _PROFILE["competences"][1]
+
+
+def test_merge_skips_metadata_when_the_level_is_rejected() -> None:
+    validated = [
+        {"competence_id": "C1", "niveau_estime": 9, "_metadata_evaluation": _META},
+        {"competence_id": "C2", "_metadata_evaluation": _META},
+    ]
+    assert merge_validated(_PROFILE, validated) == _PROFILE
+
+
+def test_check_structure_rejects_modified_fields() -> None:
+    tampered = json.loads(json.dumps(_PROFILE))
+    tampered["competences"][0]["titre"] = "other"
+    with pytest.raises(ValueError):
+        check_structure(_PROFILE, tampered)
+
+
+@pytest.mark.anyio
+async def test_json_output_controller_merges_locally() -> None:
+    state = State(
+        employee_json=json.dumps(_PROFILE),
+        validated_results=json.dumps(
+            [{"competence_id": "C2", "niveau_estime": 1, "_metadata_evaluation": _META}]
+        ),
+    )
+    out = json.loads((await json_output_controller(state))["final_output"])
+    assert out["competences"][1]["niveau_estime"] == 1
+    assert out["projets_recents"] == ["A"]
+
+
+@pytest.mark.anyio
+async def test_json_output_controller_keeps_the_input_on_a_bad_merge(
+    monkeypatch, caplog
+) -> None:
+    def tamper(original, validated):
+        merged = json.loads(json.dumps(original))
+        merged["poste"] = "other"
+        return merged
+
+    monkeypatch.setattr(agent5, "merge_validated", tamper)
+    state = State(employee_json=json.dumps(_PROFILE), validated_results="[]")
+    out = json.loads((await json_output_controller(state))["final_output"])
+    assert out == _PROFILE
+    assert "merge rejected" in caplog.text
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from agent import llm
+from agent.metrics import LLM_HEDGE_WINS, LLM_HEDGES, LLM_RETRIES, current_agent
+
+pytestmark = pytest.mark.anyio
+
+_HUMAN = 'Employee profile:\n{"employee_id": "E1", "competences": []}'
+
+
+@pytest.fixture
+def stalling(fake_backend, monkeypatch):
+    """Fake chat model whose 1st, 3rd, 5th… calls stall for 500 ms."""
+    monkeypatch.setenv("SKILLBRIDGE_FAKE_STALL_MS", "500")
+    monkeypatch.setenv("SKILLBRIDGE_FAKE_STALL_EVERY", "2")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_BACKOFF", "0")
+    return fake_backend.chat()
+
+
+async def _invoke(model, agent: str) -> str:
+    token = current_agent.set(agent)
+    try:
+        return await llm.invoke(model, "You are Agent 1", _HUMAN)
+    finally:
+        current_agent.reset(token)
+
+
+def test_policy_reads_per_agent_overrides(monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_LLM_TIMEOUT", "10")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_TIMEOUT_TEST_GENERATION_AGENT", "3")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_HEDGE", "1")
+    policy = llm.LatencyPolicy.for_agent("test_generation_agent")
+    assert (policy.timeout, policy.hedge) == (3.0, True)
+    assert llm.LatencyPolicy.for_agent("skill_context_analyzer").timeout == 10.0
+    assert 0 <= policy.backoff_delay(10) <= 8.0
+
+
+def test_only_transient_errors_are_retried() -> None:
+    class ApiError(Exception):
+        code = 503
+
+    wrapped = RuntimeError("wrapped")
+    wrapped.__cause__ = ApiError()
+    assert llm._retryable(asyncio.TimeoutError())
+    assert llm._retryable(wrapped)
+    assert not llm._retryable(ValueError("bad prompt"))
+
+
+async def test_stalled_attempt_times_out_and_is_retried(stalling, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_LLM_TIMEOUT", "0.05")
+    before = LLM_RETRIES.value(agent="policy_retry")
+    assert (await _invoke(stalling, "policy_retry")).startswith("Fake analysis")
+    assert stalling.calls == 2
+    assert LLM_RETRIES.value(agent="policy_retry") == before + 1
+
+
+async def test_stream_is_retried_before_its_first_chunk(stalling, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_LLM_TIMEOUT", "0.05")
+    token = current_agent.set("policy_stream")
+    try:
+        chunks = [
+            c async for c in llm.invoke_stream(stalling, "You are Agent 1", _HUMAN)
+        ]
+    finally:
+        current_agent.reset(token)
+    assert "".join(chunks).startswith("Fake analysis")
+    assert stalling.calls == 2
+
+
+async def test_deadline_bounds_the_whole_call(stalling, monkeypatch) -> None:
+    stalling.stall_every = 1
+    monkeypatch.setenv("SKILLBRIDGE_LLM_TIMEOUT", "0.05")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_DEADLINE", "0.12")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_RETRIES", "10")
+    start = time.perf_counter()
+    with pytest.raises((TimeoutError, asyncio.TimeoutError)):
+        await _invoke(stalling, "policy_deadline")
+    assert time.perf_counter() - start < 0.3
+    assert stalling.calls <= 3
+
+
+async def test_slow_request_is_hedged_past_p95(stalling, monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_LLM_HEDGE", "1")
+    for _ in range(llm._HEDGE_MIN_SAMPLES):
+        llm.observe_latency("policy_hedge", 0.01)
+    hedges = LLM_HEDGES.value(agent="policy_hedge")
+    wins = LLM_HEDGE_WINS.value(agent="policy_hedge")
+
+    start = time.perf_counter()
+    assert (await _invoke(stalling, "policy_hedge")).startswith("Fake analysis")
+    assert time.perf_counter() - start < 0.3
+    assert stalling.calls == 2
+    assert LLM_HEDGES.value(agent="policy_hedge") == hedges + 1
+    assert LLM_HEDGE_WINS.value(agent="policy_hedge") == wins + 1
@@ -0,0 +1,70 @@
+import json
+
+from fastapi.testclient import TestClient
+from langgraph.graph import StateGraph
+
+from agent import server
+from agent.metrics import HTTP_INFLIGHT, Counter, Histogram
+from agent.state import State
+
+
+def test_histogram_exposition() -> None:
+    hist = Histogram("h_seconds", "help", ("agent",), buckets=(0.1, 1))
+    hist.observe(0.5, agent="a1")
+    lines = hist.render()
+    assert 'h_seconds_bucket{agent="a1",le="0.1"} 0' in lines
+    assert 'h_seconds_bucket{agent="a1",le="1"} 1' in lines
+    assert 'h_seconds_bucket{agent="a1",le="+Inf"} 1' in lines
+    assert 'h_seconds_count{agent="a1"} 1' in lines
+
+
+def test_counter_labels_are_escaped() -> None:
+    counter = Counter("c_total", "help", ("agent",))
+    counter.inc(2, agent='a"b')
+    assert 'c_total{agent="a\\"b"} 2' in counter.render()
+
+
+def test_metrics_endpoint_reports_agents_and_tokens(fake_backend) -> None:
+    profile = {"employee_id": "E", "competences": [{"competence_id": "C1"}]}
+    with TestClient(server.app) as client:
+        client.post(
+            "/api/evaluate",
+            json={"employee_json": json.dumps(profile), "mode": "generate_tests"},
+        )
+        body = client.get("/metrics").text
+    assert (
+        'skillbridge_agent_duration_seconds_count{agent="test_generation_agent"}'
+        in body
+    )
+    assert 'skillbridge_llm_prompt_tokens_total{agent="skill_context_analyzer"}' in body
+    assert 'skillbridge_http_inflight_requests{endpoint="/metrics"} 1' in body
+
+
+def test_inflight_gauge_is_labelled_by_route_template() -> None:
+    with TestClient(server.app) as client:
+        client.get("/api/jobs/0123abcd")
+        client.get("/no/such/path")
+        body = client.get("/metrics").text
+    assert 'skillbridge_http_inflight_requests{endpoint="/api/jobs/{job_id}"}' in body
+    assert 'endpoint="unmatched"' in body
+    assert "0123abcd" not in body and "/no/such/path" not in body
+
+
+def test_inflight_gauge_covers_the_whole_stream(monkeypatch) -> None:
+    seen = []
+
+    async def node(state: State) -> dict:
+        # Headers and node_start are already out when the node runs.
+        seen.append(HTTP_INFLIGHT.value(endpoint="/api/evaluate/stream"))
+        return {"final_output": "{}"}
+
+    graph = StateGraph(State).add_node("json_output_controller", node)
+    graph = graph.add_edge("__start__", "json_output_controller").compile()
+    monkeypatch.setattr(server, "graph", graph)
+    before = HTTP_INFLIGHT.value(endpoint="/api/evaluate/stream")
+    res = TestClient(server.app).post(
+        "/api/evaluate/stream", json={"employee_json": "{}"}
+    )
+    assert "event: result" in res.text
+    assert seen == [before + 1]
+    assert HTTP_INFLIGHT.value(endpoint="/api/evaluate/stream") == before
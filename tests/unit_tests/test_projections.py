@@ -0,0 +1,65 @@
+import json
+
+from agent.projections import (
+    analysis_excerpt,
+    for_analyzer,
+    for_scoring,
+    for_test_generation,
+    for_validation,
+    load_profile,
+)
+
+_PROFILE = {
+    "employee_id": "EMP_1",
+    "employee_name": "Jane Doe",
+    "poste": "Dev",
+    "evaluation_date": "2025-11-26",
+    "competences": [
+        {
+            "competence_id": "C1",
+            "titre": "C++",
+            "detail": "Templates",
+            "experience_employee": "3 projects",
+            "niveau_estime": 2,
+            "niveau_attendu_24m": 4,
+        },
+    ],
+    "projets_recents": ["A"],
+    "formations_suivies": ["F"],
+}
+
+
+def test_load_profile_parses_once_and_rejects_non_objects() -> None:
+    text = json.dumps(_PROFILE)
+    assert load_profile(text) is load_profile(text)
+    assert load_profile("[1, 2]") is None
+    assert load_profile("not json") is None
+
+
+def test_projections_keep_only_needed_fields() -> None:
+    comps = _PROFILE["competences"]
+    assert "employee_name" not in json.loads(for_analyzer(_PROFILE))
+
+    gen = json.loads(for_test_generation(_PROFILE, comps))
+    assert "projets_recents" not in gen
+    assert gen["competences"][0]["detail"] == "Templates"
+
+    scoring = json.loads(for_scoring(_PROFILE, comps))
+    assert scoring["evaluation_date"] == "2025-11-26"
+    assert "detail" not in scoring["competences"][0]
+
+    context, competences = for_validation(_PROFILE, comps)
+    assert json.loads(context) == {
+        "employee_id": "EMP_1",
+        "poste": "Dev",
+        "evaluation_date": "2025-11-26",
+    }
+    assert json.loads(competences)[0]["niveau_attendu_24m"] == 4
+    assert " " not in context
+
+
+def test_analysis_excerpt_keeps_relevant_paragraphs() -> None:
+    analysis = "Overview.\n\nC1 is weak.\n\nSQL (C2) is fine."
+    comps = [{"competence_id": "C1", "titre": "C++"}]
+    assert analysis_excerpt(analysis, comps) == "C1 is weak."
+    assert analysis_excerpt(analysis, [{"competence_id": "C9"}]) == analysis
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from agent import question_bank
+from agent.blueprint import format_block, parse_blueprint
+from agent.fake_llm import fake_reply
+from agent.graph import graph
+from agent.question_bank import QuestionBank
+from agent.question_bank_cli import prewarm
+
+_COMP = {"competence_id": "C1", "titre": "C++", "niveau_attendu_12m": 3}
+_QUESTION = {
+    "question": "What does RAII stand for?",
+    "question_type": "mcq",
+    "options": ["a", "b", "c", "d"],
+    "correct_answer": "B",
+    "difficulty": 3,
+}
+
+
+def test_format_block_round_trips() -> None:
+    block = format_block("C1", _QUESTION)
+    assert parse_blueprint(block) == {"C1": _QUESTION}
+
+
+def test_draw_rotates_and_never_repeats_for_an_employee(tmp_path) -> None:
+    bank = QuestionBank(tmp_path / "q.sqlite")
+    other = {**_QUESTION, "question": "What is a move constructor?"}
+    assert bank.add(_COMP, _QUESTION)
+    assert not bank.add(_COMP, _QUESTION)  # duplicate
+    assert not bank.add(_COMP, {**_QUESTION, "options": ["a"]})  # invalid
+    assert bank.add(_COMP, other)
+
+    seen = {bank.draw(_COMP, "E1")["question"], bank.draw(_COMP, "E1")["question"]}
+    assert seen == {_QUESTION["question"], other["question"]}
+    assert bank.draw(_COMP, "E1") is None
+    # Another employee still gets questions; other levels are separate slots.
+    assert bank.draw(_COMP, "E2") is not None
+    assert bank.draw({**_COMP, "niveau_attendu_12m": 5}, "E2") is None
+    assert bank.stats() == {"questions": 2, "slots": 1, "served": 3}
+
+
+@pytest.mark.anyio
+async def test_generate_tests_uses_bank_before_llm(
+    fake_backend, tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_QUESTION_BANK", "1")
+    monkeypatch.setenv("SKILLBRIDGE_QUESTION_BANK_PATH", str(tmp_path / "q.sqlite"))
+    monkeypatch.setattr(question_bank, "_bank", None)
+    profile = {
+        "employee_id": "E1",
+        "competences": [_COMP, {**_COMP, "competence_id": "C2"}],
+    }
+    profiles = tmp_path / "profiles.json"
+    profiles.write_text(json.dumps(profile), encoding="utf-8")
+
+    assert await prewarm([profiles], per_slot=1) == {"slots": 2, "added": 2}
+    calls = fake_backend.chat().calls
+    res = await graph.ainvoke(
+        {
+            "employee_json": json.dumps({**profile, "employee_id": "E2"}),
+            "mode": "generate_tests",
+        }
+    )
+    # Only Agent 1 reached the LLM; both questions came from the bank.
+    assert fake_backend.chat().calls == calls + 1
+    expected = parse_blueprint(fake_reply("You are Agent 2", json.dumps(profile)))
+    assert parse_blueprint(res["test_blueprint"]) == expected
+    monkeypatch.setattr(question_bank, "_bank", None)
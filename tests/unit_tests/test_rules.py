@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+from agent.nodes.agent3_evaluation_scoring import evaluation_scoring_agent
+from agent.nodes.agent4_consistency_validator import consistency_gap_validator
+from agent.rules import (
+    check_consistency,
+    clamp_jump,
+    score_competence,
+    score_to_levels,
+)
+from agent.state import State
+
+
+@pytest.mark.parametrize(
+    ("score", "expected"),
+    [
+        (0, (0, 0)),
+        (4, (0, 0)),
+        (5, (1, 2)),
+        (11, (2, 3)),
+        (14, (3, 4)),
+        (17, (4, 4)),
+        (20, (5, 5)),
+    ],
+)
+def test_score_table(score: int, expected: tuple[int, int]) -> None:
+    """The 0–20 → 0–5 table must match the Agent 3 prompt."""
+    assert score_to_levels(score) == expected
+
+
+def test_clamp_jump() -> None:
+    """Levels must stay within ±2 of niveau_avant_test and inside 0..5."""
+    assert clamp_jump(5, 1) == 3
+    assert clamp_jump(0, 4) == 2
+    assert clamp_jump(3, 4) == 3
+
+
+def test_uplift_band_without_experience_is_decided() -> None:
+    decision = score_competence({"competence_id": "C1", "niveau_estime": 2}, 10)
+    assert decision.level == 2
+
+
+def test_uplift_band_with_experience_is_escalated() -> None:
+    comp = {
+        "competence_id": "C1",
+        "niveau_estime": 2,
+        "experience_employee": "3 ans en prod",
+    }
+    decision = score_competence(comp, 10)
+    assert decision.level is None
+    assert decision.candidates == (2, 3)
+
+
+def test_clamp_collapses_candidates() -> None:
+    comp = {"competence_id": "C1", "niveau_estime": 0, "experience_employee": "stage"}
+    decision = score_competence(comp, 13)
+    assert decision.level == 2
+
+
+@pytest.mark.anyio
+async def test_evaluate_mode_without_edge_cases_skips_llm() -> None:
+    profile = {
+        "employee_id": "EMP_1",
+        "evaluation_date": "2025-11-26",
+        "competences": [
+            {"competence_id": "C1", "niveau_estime": 3, "experience_employee": "x"},
+            {"competence_id": "C2", "niveau_estime": 1},
+        ],
+    }
+    state = State(
+        employee_json=json.dumps(profile),
+        mode="evaluate",
+        test_scores={"C1": 20, "C2": 0},
+    )
+    out = json.loads((await evaluation_scoring_agent(state))["evaluation_results"])
+    assert [c["niveau_estime"] for c in out] == [5, 0]
+    assert out[0]["_metadata_evaluation"] == {
+        "score_test": 20,
+        "date_test": "2025-11-26",
+        "niveau_avant_test": 3,
+    }
+
+
+def test_consistency_caps_and_clamps_locally() -> None:
+    comp = {
+        "competence_id": "C1",
+        "niveau_estime": 5,
+        "niveau_attendu_24m": 4,
+        "_metadata_evaluation": {"score_test": 20, "niveau_avant_test": 1},
+    }
+    check = check_consistency(comp)
+    assert check.competence["niveau_estime"] == 3
+    assert not check.needs_review
+    assert check.competence["_metadata_evaluation"] == comp["_metadata_evaluation"]
+
+
+def test_consistency_flags_zero_with_experience() -> None:
+    comp = {
+        "competence_id": "C1",
+        "niveau_estime": 0,
+        "experience_employee": "5 ans",
+        "_metadata_evaluation": {"score_test": 0, "niveau_avant_test": 3},
+    }
+    # The ±2 clamp lifts 0 to 1, so nothing is left to judge.
+    assert not check_consistency(comp).needs_review
+    comp["_metadata_evaluation"]["niveau_avant_test"] = 2
+    assert check_consistency(comp).needs_review
+
+
+@pytest.mark.anyio
+async def test_consistency_validator_without_flags_skips_llm() -> None:
+    evaluated = [
+        {
+            "competence_id": "C1",
+            "niveau_estime": 5,
+            "niveau_attendu_24m": 4,
+            "_metadata_evaluation": {"score_test": 20, "niveau_avant_test": 3},
+        }
+    ]
+    state = State(employee_json="{}", evaluation_results=json.dumps(evaluated))
+    out = json.loads((await consistency_gap_validator(state))["validated_results"])
+    assert out == [{**evaluated[0], "niveau_estime": 4}]
+
+
+def test_ceiling_below_the_jump_clamp_is_resolved_locally() -> None:
+    comp = {
+        "competence_id": "C1",
+        "niveau_estime": 5,
+        "niveau_attendu_24m": 1,
+        "_metadata_evaluation": {"score_test": 20, "niveau_avant_test": 5},
+    }
+    check = check_consistency(comp)
+    assert check.competence["niveau_estime"] == 1
+    assert not check.needs_review
+
+
+@pytest.mark.anyio
+async def test_edge_case_prompt_lists_allowed_levels(monkeypatch) -> None:
+    from agent.metrics import SCORING_FALLBACKS
+    from agent.nodes import agent3_evaluation_scoring as agent3
+
+    prompts = []
+
+    async def fake_score(system: str, human: str) -> str:
+        prompts.append(human)
+        return json.dumps([{"competence_id": "C1", "niveau_estime": 5}])
+
+    monkeypatch.setattr(agent3, "_score_with_llm", fake_score)
+    profile = {
+        "evaluation_date": "2025-11-26",
+        "competences": [
+            {"competence_id": "C1", "niveau_estime": 2, "experience_employee": "3 ans"}
+        ],
+    }
+    state = State(
+        employee_json=json.dumps(profile), mode="evaluate", test_scores={"C1": 10}
+    )
+    before = SCORING_FALLBACKS.value(reason="out_of_range")
+    out = json.loads((await evaluation_scoring_agent(state))["evaluation_results"])
+
+    (prompt,) = prompts
+    assert 'Allowed niveau_estime per competence_id:\n{"C1": [2, 3]}' in prompt
+    # 5 is not an allowed level: the base level is kept and the fallback counted.
+    assert out[0]["niveau_estime"] == 2
+    assert SCORING_FALLBACKS.value(reason="out_of_range") == before + 1
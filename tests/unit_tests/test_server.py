@@ -0,0 +1,433 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from langgraph.graph import StateGraph
+
+from agent import server
+from agent.metrics import COALESCED_CALLS, HTTP_CANCELLED
+
+
+@dataclass
+class _State:
+    employee_json: str = ""
+    mode: str = "simulate"
+    test_scores: dict | None = None
+    analysis: str = ""
+    final_output: str = ""
+
+
+async def _analyze(state: _State) -> dict:
+    return {"analysis": "ok"}
+
+
+async def _finish(state: _State) -> dict:
+    return {"final_output": state.employee_json}
+
+
+_FAKE_GRAPH = (
+    StateGraph(_State)
+    .add_node("skill_context_analyzer", _analyze)
+    .add_node("json_output_controller", _finish)
+    .add_edge("__start__", "skill_context_analyzer")
+    .add_edge("skill_context_analyzer", "json_output_controller")
+    .compile()
+)
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    frames = [f for f in body.split("\n\n") if f.strip()]
+    out = []
+    for frame in frames:
+        event, data = frame.split("\n", 1)
+        out.append(
+            (event.removeprefix("event: "), json.loads(data.removeprefix("data: ")))
+        )
+    return out
+
+
+def test_evaluate_stream_emits_node_events(monkeypatch) -> None:
+    """The SSE endpoint must report each node and finish with the result."""
+    monkeypatch.setattr(server, "graph", _FAKE_GRAPH)
+    client = TestClient(server.app)
+    res = client.post("/api/evaluate/stream", json={"employee_json": "{}"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = _events(res.text)
+    assert [(e, d.get("node")) for e, d in events] == [
+        ("node_start", "skill_context_analyzer"),
+        ("node_end", "skill_context_analyzer"),
+        ("node_start", "json_output_controller"),
+        ("node_end", "json_output_controller"),
+        ("result", None),
+    ]
+    assert events[1][1]["delta"] == {"analysis": "ok"}
+    assert events[-1][1]["final_output"] == "{}"
+
+
+def test_session_resumes_analysis_and_blueprint(fake_backend) -> None:
+    """evaluate with a session_id skips Agent 1 and reuses the blueprint."""
+    profile = {
+        "employee_id": "EMP_S",
+        "evaluation_date": "2025-11-26",
+        "competences": [
+            {"competence_id": "C1", "titre": "C++", "niveau_estime": 2},
+        ],
+    }
+    client = TestClient(server.app)
+    first = client.post(
+        "/api/evaluate",
+        json={"employee_json": json.dumps(profile), "mode": "generate_tests"},
+    ).json()
+    assert first["session_id"] and first["test_blueprint"]
+
+    # Scores for the session's generated test only come from /api/grade.
+    res = client.post(
+        "/api/evaluate",
+        json={
+            "employee_json": json.dumps(profile),
+            "mode": "evaluate",
+            "test_scores": {"C1": 20},
+            "session_id": first["session_id"],
+        },
+    )
+    assert res.status_code == 409
+
+    from agent.blueprint import answer_key
+    from agent.sessions import get_session_store
+
+    key = answer_key(get_session_store().get(first["session_id"]).test_blueprint)
+    calls = fake_backend.chat().calls
+    res = client.post(
+        "/api/grade",
+        json={
+            "employee_json": json.dumps(profile),
+            "answers": {"C1": key["C1"]},
+            "session_id": first["session_id"],
+        },
+    )
+    assert res.status_code == 200
+    body = res.json()
+    # Agents 3-5 decide locally; Agent 1 was not re-run.
+    assert fake_backend.chat().calls == calls
+    assert body["analysis"] == first["analysis"]
+    assert body["test_blueprint"] == first["test_blueprint"]
+    assert body["session_id"] == first["session_id"]
+    assert json.loads(body["final_output"])["competences"][0]["niveau_estime"] == 4
+
+    other = {**profile, "employee_id": "EMP_OTHER"}
+    res = client.post(
+        "/api/evaluate",
+        json={"employee_json": json.dumps(other), "session_id": first["session_id"]},
+    )
+    assert res.status_code == 409
+    res = client.post(
+        "/api/evaluate",
+        json={"employee_json": json.dumps(profile), "session_id": "missing"},
+    )
+    assert res.status_code == 404
+
+
+def test_grade_keeps_answer_key_on_server(fake_backend) -> None:
+    """generate_tests hides the answers; /api/grade scores and evaluates."""
+    from agent.blueprint import answer_key
+    from agent.sessions import get_session_store
+
+    profile = {
+        "employee_id": "EMP_G",
+        "evaluation_date": "2025-11-26",
+        "competences": [
+            {"competence_id": "C1", "titre": "C++", "niveau_estime": 2},
+            {"competence_id": "C2", "titre": "SQL", "niveau_estime": 2},
+        ],
+    }
+    client = TestClient(server.app)
+    generated = client.post(
+        "/api/evaluate",
+        json={"employee_json": json.dumps(profile), "mode": "generate_tests"},
+    ).json()
+    assert "CORRECT_ANSWER" not in generated["test_blueprint"]
+    enriched = json.loads(generated["enriched_employee_json"])
+    assert all("correct_answer" not in c for c in enriched["competences"])
+
+    key = answer_key(get_session_store().get(generated["session_id"]).test_blueprint)
+    wrong = next(o for o in "ABCD" if o != key["C2"])
+    res = client.post(
+        "/api/grade",
+        json={
+            "employee_json": generated["enriched_employee_json"],
+            "session_id": generated["session_id"],
+            "answers": {"C1": key["C1"].lower(), "C2": wrong},
+        },
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert body["test_scores"] == {"C1": 20, "C2": 0}
+    levels = [
+        c["niveau_estime"] for c in json.loads(body["final_output"])["competences"]
+    ]
+    assert levels == [4, 0]
+
+    # One-shot: the same session cannot be graded again to probe the key.
+    res = client.post(
+        "/api/grade",
+        json={
+            "employee_json": generated["enriched_employee_json"],
+            "session_id": generated["session_id"],
+            "answers": {"C1": key["C1"], "C2": key["C2"]},
+        },
+    )
+    assert res.status_code == 409
+
+
+def test_evaluate_stream_emits_questions_before_result(fake_backend) -> None:
+    """generate_tests over SSE streams each question without its answer."""
+    profile = {
+        "employee_id": "EMP_Q",
+        "competences": [{"competence_id": f"C{i}", "titre": f"T{i}"} for i in range(3)],
+    }
+    client = TestClient(server.app)
+    res = client.post(
+        "/api/evaluate/stream",
+        json={"employee_json": json.dumps(profile), "mode": "generate_tests"},
+    )
+    events = _events(res.text)
+    questions = [d for e, d in events if e == "question"]
+    assert sorted(q["competence_id"] for q in questions) == ["C0", "C1", "C2"]
+    assert all("correct_answer" not in q and len(q["options"]) == 4 for q in questions)
+    names = [e for e, _ in events]
+    assert names.index("question") < names.index("result")
+    assert "CORRECT_ANSWER" not in json.dumps(events)
+
+
+@pytest.mark.anyio
+async def test_identical_evaluate_requests_share_one_run(monkeypatch) -> None:
+    runs = 0
+
+    async def slow_analyze(state: _State) -> dict:
+        nonlocal runs
+        runs += 1
+        run = runs
+        await asyncio.sleep(0.05)
+        return {"analysis": f"run {run}"}
+
+    graph = (
+        StateGraph(_State)
+        .add_node("skill_context_analyzer", slow_analyze)
+        .add_edge("__start__", "skill_context_analyzer")
+        .compile()
+    )
+    monkeypatch.setattr(server, "graph", graph)
+    before = COALESCED_CALLS.value(group="evaluate")
+    bodies = [
+        {"employee_json": '{"employee_id": "E1", "poste": "Dev"}'},
+        {"employee_json": '{"poste":"Dev","employee_id":"E1"}'},
+        {"employee_json": '{"employee_id": "E1", "poste": "Dev"}'},
+        {"employee_json": '{"employee_id": "E2"}'},
+    ]
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        responses = await asyncio.gather(
+            *(client.post("/api/evaluate", json=b) for b in bodies)
+        )
+    analyses = [r.json()["analysis"] for r in responses]
+    assert runs == 2
+    assert analyses[0] == analyses[1] == analyses[2] != analyses[3]
+    assert COALESCED_CALLS.value(group="evaluate") - before == 2
+
+
+class _GoneRequest:
+    """Stand-in for a Request whose client disconnects after two polls."""
+
+    url = httpx.URL("http://t/api/evaluate")
+    scope = {"route": SimpleNamespace(path="/api/evaluate")}
+
+    def __init__(self) -> None:
+        self.polls = 0
+
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls > 2
+
+
+@pytest.mark.anyio
+async def test_disconnect_cancels_the_running_work(monkeypatch) -> None:
+    monkeypatch.setattr(server, "_DISCONNECT_POLL_SECONDS", 0.01)
+    cancelled = asyncio.Event()
+
+    async def work() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(server.HTTPException) as err:
+        await server._run_request(_GoneRequest(), None, work)
+    assert err.value.status_code == 499
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+async def _post_then_disconnect(path: str, payload: dict, after: float) -> list:
+    """Drive the full ASGI app; the client goes away ``after`` seconds in.
+
+    Like uvicorn, ``receive`` answers ``http.disconnect`` without suspending
+    once the client is gone, and the scope advertises ASGI spec 2.3.
+    """
+    loop = asyncio.get_running_loop()
+    gone_at = loop.time() + after
+    body = [{"type": "http.request", "body": json.dumps(payload).encode()}]
+    sent: list = []
+
+    async def receive() -> dict:
+        if body:
+            return body.pop()
+        if loop.time() < gone_at:
+            await asyncio.sleep(gone_at - loop.time())
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"t"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1),
+        "server": ("t", 80),
+    }
+    await asyncio.wait_for(server.app(scope, receive, send), 2)
+    return sent
+
+
+def _sleeping_graph(cancelled: asyncio.Event):
+    async def sleepy(state: _State) -> dict:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {"final_output": "late"}
+
+    graph = StateGraph(_State).add_node("json_output_controller", sleepy)
+    return graph.add_edge("__start__", "json_output_controller").compile()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", ["/api/evaluate", "/api/evaluate/stream"])
+async def test_client_disconnect_cancels_the_running_node(monkeypatch, path) -> None:
+    cancelled = asyncio.Event()
+    monkeypatch.setattr(server, "graph", _sleeping_graph(cancelled))
+    monkeypatch.setattr(server, "_DISCONNECT_POLL_SECONDS", 0.01)
+
+    sent = await _post_then_disconnect(path, {"employee_json": "{}"}, after=0.1)
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert b"late" not in b"".join(m.get("body", b"") for m in sent)
+
+
+def test_slow_request_is_not_mistaken_for_a_disconnect(monkeypatch) -> None:
+    async def slow(state: _State) -> dict:
+        await asyncio.sleep(0.1)
+        return {"final_output": "done"}
+
+    graph = StateGraph(_State).add_node("json_output_controller", slow)
+    graph = graph.add_edge("__start__", "json_output_controller").compile()
+    monkeypatch.setattr(server, "graph", graph)
+    monkeypatch.setattr(server, "_DISCONNECT_POLL_SECONDS", 0.01)
+    res = TestClient(server.app).post("/api/evaluate", json={"employee_json": "{}"})
+    assert res.status_code == 200
+    assert res.json()["final_output"] == "done"
+
+
+def test_deadline_stops_the_graph_before_later_agents(
+    fake_backend, monkeypatch
+) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_FAKE_LATENCY_MS", "100")
+    profile = {"employee_id": "E1", "competences": [{"competence_id": "C1"}]}
+    before = HTTP_CANCELLED.value(endpoint="/api/evaluate", reason="deadline")
+    res = TestClient(server.app).post(
+        "/api/evaluate",
+        json={"employee_json": json.dumps(profile), "deadline_ms": 150},
+    )
+    assert res.status_code == 504
+    # Agent 1 ran; Agent 3 was cut off at the deadline; Agents 4–5 never ran.
+    assert fake_backend.chat().calls <= 2
+    assert (
+        HTTP_CANCELLED.value(endpoint="/api/evaluate", reason="deadline") == before + 1
+    )
+
+
+def test_grading_claim_is_one_shot_until_released(tmp_path) -> None:
+    from agent.sessions import SessionStore
+
+    store = SessionStore(tmp_path / "s.sqlite", ttl_seconds=60)
+    sid = store.save("E1", "analysis", "blueprint")
+    assert not store.get(sid).graded
+    assert store.claim_grading(sid)
+    assert not store.claim_grading(sid)
+    assert store.get(sid).graded
+    store.release_grading(sid)
+    assert store.claim_grading(sid)
+    store.close()
+
+
+def test_batch_reports_session_errors_and_deadlines_per_item(monkeypatch) -> None:
+    from agent import batch
+
+    async def slow(state: _State) -> dict:
+        if "slow" in state.employee_json:
+            await asyncio.sleep(1)
+        return {"final_output": state.employee_json}
+
+    graph = StateGraph(_State).add_node("json_output_controller", slow)
+    graph = graph.add_edge("__start__", "json_output_controller").compile()
+    monkeypatch.setattr(batch, "graph", graph)
+    items = [
+        {"employee_json": '{"employee_id": "ok"}'},
+        {"employee_json": '{"employee_id": "lost"}', "session_id": "missing"},
+        {"employee_json": '{"employee_id": "slow"}', "deadline_ms": 50},
+    ]
+    res = TestClient(server.app).post("/api/evaluate/batch", json={"items": items})
+    assert res.status_code == 200
+    lines = {line["index"]: line for line in map(json.loads, res.text.splitlines())}
+    assert lines[0]["ok"] and lines[0]["response"]["final_output"]
+    assert not lines[1]["ok"] and "session" in lines[1]["error"]
+    assert lines[1]["employee_id"] == "lost"
+    assert not lines[2]["ok"] and "deadline" in lines[2]["error"]
+
+
+def test_evaluate_stream_honours_the_deadline(monkeypatch) -> None:
+    from agent.metrics import instrument_node
+
+    async def slow(state: _State) -> dict:
+        await asyncio.sleep(0.1)
+        return {"analysis": "ok"}
+
+    graph = (
+        StateGraph(_State)
+        .add_node("skill_context_analyzer", instrument_node("a1", slow))
+        .add_node("json_output_controller", instrument_node("a5", _finish))
+        .add_edge("__start__", "skill_context_analyzer")
+        .add_edge("skill_context_analyzer", "json_output_controller")
+        .compile()
+    )
+    monkeypatch.setattr(server, "graph", graph)
+    res = TestClient(server.app).post(
+        "/api/evaluate/stream", json={"employee_json": "{}", "deadline_ms": 50}
+    )
+    events = _events(res.text)
+    assert events[-1][0] == "error"
+    assert "deadline" in events[-1][1]["detail"]
+    assert "result" not in [e for e, _ in events]
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from agent.nodes import agent4_consistency_validator as agent4
+from agent.nodes.agent3_evaluation_scoring import evaluation_scoring_agent
+from agent.projections import scoring_tokens
+from agent.sharding import estimate_tokens, shard
+from agent.state import State
+
+pytestmark = pytest.mark.anyio
+
+_PROFILE = {
+    "employee_id": "EMP_BIG",
+    "evaluation_date": "2025-11-26",
+    "projets": ["A long project description that no shard needs"],
+    "competences": [
+        {
+            "competence_id": f"C{i}",
+            "titre": f"T{i}",
+            "niveau_estime": 2,
+            "experience_employee": "x" * 40 * (i % 3 + 1),
+            "niveau_attendu_24m": 5,
+        }
+        for i in range(12)
+    ],
+}
+
+
+def test_shard_packs_in_order_under_the_budget() -> None:
+    assert shard([3, 3, 3, 5, 1], size=lambda n: n, budget=6) == [
+        [3, 3],
+        [3],
+        [5, 1],
+    ]
+    # An item over the budget gets a shard of its own.
+    assert shard([2, 9, 2], size=lambda n: n, budget=4) == [[2], [9], [2]]
+    assert shard([], size=lambda n: n, budget=4) == []
+    assert estimate_tokens("abcde") == 2
+
+
+async def test_simulate_scoring_runs_one_call_per_shard(
+    fake_backend, monkeypatch
+) -> None:
+    budget = 2 * max(scoring_tokens(c) for c in _PROFILE["competences"])
+    monkeypatch.setenv("SKILLBRIDGE_SHARD_TOKENS", str(budget))
+    chat = fake_backend.chat()
+
+    state = State(employee_json=json.dumps(_PROFILE), mode="simulate")
+    out = json.loads((await evaluation_scoring_agent(state))["evaluation_results"])
+
+    assert [c["competence_id"] for c in out] == [f"C{i}" for i in range(12)]
+    assert all("_metadata_evaluation" in c for c in out)
+    assert chat.calls == len(shard(_PROFILE["competences"], scoring_tokens, budget))
+    assert chat.calls > 1
+
+
+async def test_review_is_sharded_and_merged_by_id(monkeypatch) -> None:
+    monkeypatch.setenv("SKILLBRIDGE_SHARD_TOKENS", "1")
+    prompts = []
+
+    async def fake_validate(human: str) -> str:
+        prompts.append(human)
+        array = json.loads(human.rsplit("Evaluated competences JSON array:\n", 1)[1])
+        return json.dumps([{**c, "niveau_estime": 2} for c in array])
+
+    monkeypatch.setattr(agent4, "_validate_with_llm", fake_validate)
+    evaluated = [
+        {
+            "competence_id": f"C{i}",
+            "niveau_estime": 0,
+            "experience_employee": "5 ans",
+            "_metadata_evaluation": {"score_test": 0, "niveau_avant_test": 2},
+        }
+        for i in range(3)
+    ]
+    state = State(employee_json="{}", evaluation_results=json.dumps(evaluated))
+    out = json.loads(
+        (await agent4.consistency_gap_validator(state))["validated_results"]
+    )
+
+    assert len(prompts) == 3
+    assert all(prompt.count('"competence_id"') == 1 for prompt in prompts)
+    assert [c["competence_id"] for c in out] == ["C0", "C1", "C2"]
+    assert [c["niveau_estime"] for c in out] == [2, 2, 2]
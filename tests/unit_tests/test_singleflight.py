@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+
+from agent import deadlines
+from agent.metrics import COALESCED_CALLS
+from agent.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution() -> None:
+    flights: SingleFlight[int] = SingleFlight("test_shared")
+    calls = 0
+
+    async def fn() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flights.do("k", fn) for _ in range(5)))
+    assert results == [1] * 5
+    assert COALESCED_CALLS.value(group="test_shared") == 4
+    assert len(flights) == 0
+    # Released once done: the next call runs again.
+    assert await flights.do("k", fn) == 2
+
+
+async def test_failure_reaches_every_waiter_and_cancel_is_isolated() -> None:
+    flights: SingleFlight[int] = SingleFlight("test_failure")
+
+    async def boom() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    results = await asyncio.gather(
+        *(flights.do("k", boom) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+    async def slow() -> int:
+        await asyncio.sleep(0.02)
+        return 7
+
+    first = asyncio.ensure_future(flights.do("k", slow))
+    second = asyncio.ensure_future(flights.do("k", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == 7
+
+
+async def test_last_waiter_cancelling_cancels_the_call() -> None:
+    flights: SingleFlight[int] = SingleFlight("test_cancel")
+    started = asyncio.Event()
+    cancelled = False
+
+    async def slow() -> int:
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 1
+
+    waiter = asyncio.ensure_future(flights.do("k", slow))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+    assert cancelled and len(flights) == 0
+
+
+async def test_each_waiter_keeps_its_own_deadline() -> None:
+    flights: SingleFlight[int] = SingleFlight("test_deadlines")
+
+    async def slow() -> int:
+        # The shared call does not inherit the first caller's deadline.
+        assert deadlines.remaining() is None
+        await asyncio.sleep(0.1)
+        return 3
+
+    async def call(seconds: float | None) -> int:
+        with deadlines.deadline(seconds):
+            return await flights.do("k", slow)
+
+    short_first = await asyncio.gather(call(0.02), call(None), return_exceptions=True)
+    assert isinstance(short_first[0], deadlines.DeadlineExceeded)
+    assert short_first[1] == 3
+
+    start = time.monotonic()
+    short_second = await asyncio.gather(call(None), call(0.02), return_exceptions=True)
+    assert short_second[0] == 3
+    assert isinstance(short_second[1], deadlines.DeadlineExceeded)
+    assert time.monotonic() - start >= 0.1
+
+
+async def test_last_waiter_running_out_of_time_cancels_the_call() -> None:
+    flights: SingleFlight[int] = SingleFlight("test_deadline_cancel")
+    cancelled = asyncio.Event()
+
+    async def slow() -> int:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 1
+
+    with deadlines.deadline(0.02), pytest.raises(deadlines.DeadlineExceeded):
+        await flights.do("k", slow)
+    await asyncio.wait_for(cancelled.wait(), 1)
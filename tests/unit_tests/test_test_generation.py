@@ -0,0 +1,179 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agent.blueprint import (
+    QuestionStreamParser,
+    answer_key,
+    format_block,
+    parse_blueprint,
+    parse_questions,
+    redact_answers,
+)
+from agent.nodes import agent2_test_generation
+from agent.state import State
+
+
+def _question(cid: str) -> dict:
+    return {
+        "competence_id": cid,
+        "question": f"Question for {cid}?",
+        "options": ["a", "b", "c", "d"],
+        "correct_answer": "C",
+        "difficulty": 2,
+    }
+
+
+def _competences(human: str) -> list[dict]:
+    profile = json.loads(human.split("\n", 1)[1].split("\n\nContext analysis:")[0])
+    return profile["competences"]
+
+
+@pytest.mark.anyio
+async def test_fan_out_keeps_profile_order(monkeypatch) -> None:
+    """One call per competence, run concurrently, merged in profile order."""
+    delays = {"C1": 0.03, "C2": 0.0, "C3": 0.01}
+
+    async def fake_stream(llm, system, human, **kwargs):
+        (comp,) = _competences(human)
+        await asyncio.sleep(delays[comp["competence_id"]])
+        yield json.dumps([_question(comp["competence_id"])])
+
+    monkeypatch.setattr(agent2_test_generation, "get_llm", lambda: None)
+    monkeypatch.setattr(agent2_test_generation, "invoke_stream", fake_stream)
+    profile = {"competences": [{"competence_id": cid} for cid in delays]}
+    out = await agent2_test_generation.test_generation_agent(
+        State(employee_json=json.dumps(profile), mode="generate_tests")
+    )
+    blocks = [b.strip() for b in out["test_blueprint"].split("---") if b.strip()]
+    assert [b.splitlines()[0] for b in blocks] == [
+        "COMPETENCE_ID: C1",
+        "COMPETENCE_ID: C2",
+        "COMPETENCE_ID: C3",
+    ]
+
+
+@pytest.mark.anyio
+async def test_only_missing_competences_are_regenerated(monkeypatch) -> None:
+    """A batch reply missing a question triggers a retry for that one only."""
+    monkeypatch.setenv("SKILLBRIDGE_TESTGEN_BATCH_SIZE", "2")
+    requested: list[list[str]] = []
+
+    async def fake_stream(llm, system, human, **kwargs):
+        assert kwargs["json_schema"]["type"] == "array"
+        ids = [c["competence_id"] for c in _competences(human)]
+        requested.append(ids)
+        if len(requested) == 1:
+            # Drop C2 and send C1 with three options only.
+            yield json.dumps([{**_question("C1"), "options": ["a", "b", "c"]}])
+            return
+        yield json.dumps([_question(cid) for cid in ids])
+
+    monkeypatch.setattr(agent2_test_generation, "get_llm", lambda: None)
+    monkeypatch.setattr(agent2_test_generation, "invoke_stream", fake_stream)
+    profile = {"competences": [{"competence_id": c} for c in ("C1", "C2", "C3")]}
+    out = await agent2_test_generation.test_generation_agent(
+        State(employee_json=json.dumps(profile), mode="generate_tests")
+    )
+    assert requested == [["C1", "C2"], ["C3"], ["C1", "C2"]]
+    assert list(parse_blueprint(out["test_blueprint"])) == ["C1", "C2", "C3"]
+
+
+class _ScriptedLlm:
+    """Streams the next scripted reply on each call."""
+
+    model = "scripted"
+    temperature = 0.0
+
+    def __init__(self, replies: list[str]) -> None:
+        self.replies = replies
+        self.calls = 0
+
+    async def astream(self, messages, **kwargs):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        yield SimpleNamespace(content=reply, usage_metadata=None)
+
+
+@pytest.mark.anyio
+async def test_invalid_replies_are_not_cached(monkeypatch, tmp_path) -> None:
+    from agent import cache
+
+    monkeypatch.setenv("SKILLBRIDGE_LLM_CACHE", "1")
+    monkeypatch.setenv("SKILLBRIDGE_LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setenv("SKILLBRIDGE_TESTGEN_RETRIES", "1")
+    monkeypatch.setattr(cache, "_llm_cache", None)
+    bad = json.dumps([{**_question("C1"), "options": ["a", "b"]}])
+    good = json.dumps([_question("C1")])
+    llm = _ScriptedLlm([bad, good])
+    monkeypatch.setattr(agent2_test_generation, "get_llm", lambda: llm)
+    state = State(
+        employee_json=json.dumps({"competences": [{"competence_id": "C1"}]}),
+        mode="generate_tests",
+    )
+
+    out = await agent2_test_generation.test_generation_agent(state)
+    # The regeneration round asks the model again instead of the cache.
+    assert llm.calls == 2
+    assert list(parse_blueprint(out["test_blueprint"])) == ["C1"]
+
+    # Neither the rejected reply nor the uncached retry was stored...
+    await agent2_test_generation.test_generation_agent(state)
+    assert llm.calls == 3
+    # ...but a valid first-round reply is.
+    await agent2_test_generation.test_generation_agent(state)
+    assert llm.calls == 3
+    cache.get_llm_cache().close()
+
+
+def test_parse_questions_reports_missing_in_both_formats() -> None:
+    text = (
+        "COMPETENCE_ID: C1\nTYPE: MCQ\nQUESTION: q\nOPTION_A: a\nOPTION_B: b\n"
+        "OPTION_C: c\nOPTION_D: d\nCORRECT_ANSWER: a\n---\n"
+        "COMPETENCE_ID: C2\nQUESTION: no options\n---"
+    )
+    questions, missing = parse_questions(text, ["C1", "C2", "C3"])
+    assert list(questions) == ["C1"] and questions["C1"]["correct_answer"] == "A"
+    assert missing == ["C2", "C3"]
+
+    reply = json.dumps([_question("C2"), {**_question("C3"), "correct_answer": "E"}])
+    questions, missing = parse_questions(reply, ["C1", "C2", "C3"])
+    assert list(questions) == ["C2"]
+    assert missing == ["C1", "C3"]
+
+
+def test_format_block_round_trips_separator_lines() -> None:
+    question = {
+        "question": "Fix this manifest:\n```yaml\n---\napiVersion: v1\n```",
+        "question_type": "mcq",
+        "options": ["a", "CORRECT_ANSWER: B", "\\---", "d"],
+        "correct_answer": "C",
+        "difficulty": 3,
+    }
+    blueprint = format_block("C1", question) + "\n" + format_block("C2", question)
+
+    assert parse_blueprint(blueprint) == {"C1": question, "C2": question}
+    assert answer_key(redact_answers(blueprint)) == {}
+    assert answer_key(blueprint) == {"C1": "C", "C2": "C"}
+    parser = QuestionStreamParser()
+    assert parser.feed(blueprint) + parser.close() == [
+        ("C1", question),
+        ("C2", question),
+    ]
+
+
+def test_stream_parser_emits_each_block_as_it_closes() -> None:
+    parser = QuestionStreamParser()
+    text = "COMPETENCE_ID: C1\nQUESTION: q\nOPTION_A: a\n"
+    assert parser.feed(text) == []
+    (first,) = parser.feed("CORRECT_ANSWER: B\n---\nCOMPETENCE_ID: C2\n")
+    assert first[0] == "C1" and first[1]["correct_answer"] == "B"
+    assert [cid for cid, _ in parser.feed("QUESTION: q2") + parser.close()] == ["C2"]
+
+    parser = QuestionStreamParser()
+    reply = json.dumps([_question("C1"), _question("C2")])
+    cut = reply.index("}") + 1
+    assert [cid for cid, _ in parser.feed(reply[:cut])] == ["C1"]
+    assert [cid for cid, _ in parser.feed(reply[cut:])] == ["C2"]